@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 import json
+import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(__file__), 'admin_dashboard'))
+
+from repository import file_repository
+
 def add_video():
-    # Load existing videos
-    try:
-        with open('public_archive/videos.json', 'r') as f:
-            videos = json.load(f)
-    except:
-        videos = []
-    
     # Get new video info
     title = input("Title: ")
     url = input("URL: ")
@@ -17,21 +16,15 @@ def add_video():
     tags = input("Tags (comma-separated): ").split(',')
     description = input("Description: ")
     
-    # Create new video
-    new_video = {
-        "id": max([v.get('id', 0) for v in videos], default=0) + 1,
+    # Add and save under the store lock so concurrent writers are not lost
+    file_repository().add({
         "title": title,
         "url": url,
         "speaker": speaker,
         "tags": [tag.strip() for tag in tags if tag.strip()],
         "date_added": datetime.now().isoformat(),
         "description": description
-    }
-    
-    # Add and save
-    videos.append(new_video)
-    with open('public_archive/videos.json', 'w') as f:
-        json.dump(videos, f, indent=2)
+    })
     
     print(f"✅ Added: {title}")
 
@@ -1,15 +1,15 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response, abort, send_file
 from flask_sqlalchemy import SQLAlchemy
 from flask import session
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
-import bcrypt
 from datetime import datetime, timedelta
 import json
 import csv
 import io
 import os
+import threading
 from dotenv import load_dotenv
 from functools import wraps
 from forms import VideoForm, BulkImportForm
@@ -17,6 +17,18 @@ from backup import BackupManager
 from bulk_operations import BulkOperations
 from video_metadata import VideoMetadataExtractor
 from webhooks import WebhookManager, initialize_default_webhooks
+from sqlite_tuning import configure_sqlite, database_dir
+from repository import SQLVideoRepository
+from changes import ChangeLog, changes_since
+from video_query import VideoQuery, QueryError, query_videos
+from columnar import columnar_engine
+from cache_version import CatalogVersion, VersionedCache
+from query_stats import install_query_instrumentation
+from metrics import install_metrics
+from profiler import RequestProfiler
+from memory_tracking import memory_tracker
+from bootstrap import bootstrap, ensure_admin_user
+from metadata_refresh import MetadataRefresher
 
 load_dotenv()
 
@@ -27,6 +39,8 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///ins
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
+configure_sqlite(app, db)
+install_query_instrumentation(app, db)
 CORS(app, origins=['*'])
 
 # Initialize rate limiting
@@ -36,18 +50,27 @@ limiter = Limiter(
 )
 limiter.init_app(app)
 
+# Request latency/size/status metrics on /metrics; scrapes must not eat into the rate limit
+limiter.exempt(install_metrics(app, admin=True))
+
 # Initialize backup system
 backup_manager = BackupManager('instance/videos.db')
 
+# Opt-in per-request profiling (PROFILING_ENABLED); only logged-in admins can trigger a capture
+request_profiler = RequestProfiler()
+request_profiler.install(app, is_admin=lambda: 'user_id' in session)
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     
     def set_password(self, password):
+        import bcrypt  # deferred: only login and account setup need it
         self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
     def check_password(self, password):
+        import bcrypt
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
 
 class Video(db.Model):
@@ -61,6 +84,27 @@ class Video(db.Model):
     video_metadata = db.Column(db.JSON)  # Store video metadata
     view_count = db.Column(db.Integer, default=0)  # Track views
 
+# Change sequence for delta sync (see changes.py), and the version every worker's caches check;
+# both live next to the database, so a process using a scratch database never touches the real ones
+video_repo = SQLVideoRepository(db, Video, changes=ChangeLog(
+    os.getenv('CHANGELOG_PATH', os.path.join(database_dir(app, db), 'changes.jsonl'))
+), version=CatalogVersion(
+    os.getenv('CATALOG_VERSION_PATH', os.path.join(database_dir(app, db), 'catalog.version'))
+))
+# Serialized /api/videos payloads, dropped when any worker writes to the catalog
+api_cache = VersionedCache(video_repo.catalog_version)
+# /api/videos queries; a NumPy snapshot when COLUMNAR_CATALOG=1 (see columnar.py)
+video_search = columnar_engine(video_repo)
+
+# Periodic stale-while-revalidate refresh of video_metadata (see metadata_refresh.py)
+metadata_refresher = MetadataRefresher(video_repo, Video)
+
+def get_video_or_404(video_id):
+    video = video_repo.get(video_id)
+    if video is None:
+        abort(404)
+    return video
+
 def login_required_jwt(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -103,9 +147,7 @@ def dashboard():
     per_page = 20
     
     # Get paginated videos
-    videos = Video.query.order_by(Video.date_added.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    videos = video_repo.page(page, per_page)
     
     return render_template('dashboard.html', 
                          videos=videos.items,
@@ -124,16 +166,14 @@ def add_video():
         except Exception as e:
             metadata = {'extraction_error': str(e)}
         
-        video = Video(
-            title=form.title.data,
-            url=form.url.data,
-            speaker=form.speaker.data,
-            tags=form.tags.data or '',
-            description=form.description.data or '',
-            video_metadata=metadata
-        )
-        db.session.add(video)
-        db.session.commit()
+        video = video_repo.add({
+            'title': form.title.data,
+            'url': form.url.data,
+            'speaker': form.speaker.data,
+            'tags': form.tags.data or '',
+            'description': form.description.data or '',
+            'video_metadata': metadata
+        })
         
         # Trigger webhook
         WebhookManager.trigger_webhook('video.created', {
@@ -152,22 +192,26 @@ def add_video():
 @app.route('/edit_video/<int:id>', methods=['GET', 'POST'])
 @login_required_jwt
 def edit_video(id):
-    video = Video.query.get_or_404(id)
+    video = get_video_or_404(id)
     form = VideoForm(obj=video)
     if form.validate_on_submit():
-        old_url = video.url
-        form.populate_obj(video)
+        fields = {
+            'title': form.title.data,
+            'url': form.url.data,
+            'speaker': form.speaker.data,
+            'tags': form.tags.data or '',
+            'description': form.description.data or ''
+        }
         
         # Re-extract metadata if URL changed
-        if old_url != video.url:
+        if video.url != fields['url']:
             try:
                 extractor = VideoMetadataExtractor()
-                video.video_metadata = extractor.extract(video.url)
+                fields['video_metadata'] = extractor.extract(fields['url'])
             except Exception as e:
-                video.video_metadata = getattr(video, 'video_metadata', {})
-                video.video_metadata['extraction_error'] = str(e)
+                fields['video_metadata'] = dict(video.video_metadata or {}, extraction_error=str(e))
         
-        db.session.commit()
+        video = video_repo.update(id, fields)
         
         # Trigger webhook
         WebhookManager.trigger_webhook('video.updated', {
@@ -184,7 +228,7 @@ def edit_video(id):
 @app.route('/delete_video/<int:id>')
 @login_required_jwt
 def delete_video(id):
-    video = Video.query.get_or_404(id)
+    video = get_video_or_404(id)
     
     # Store info for webhook
     video_info = {
@@ -194,8 +238,7 @@ def delete_video(id):
         'speaker': video.speaker
     }
     
-    db.session.delete(video)
-    db.session.commit()
+    video_repo.delete(id)
     
     # Trigger webhook
     WebhookManager.trigger_webhook('video.deleted', video_info)
@@ -206,7 +249,7 @@ def delete_video(id):
 @app.route('/export_data')
 @login_required_jwt
 def export_data():
-    json_data = BulkOperations.export_to_json(Video)
+    json_data = BulkOperations.export_to_json(video_repo)
     video_data = json.loads(json_data)
     
     # Write to a temporary file for download
@@ -222,17 +265,40 @@ def export_data():
 @app.route('/api/videos')
 @login_required_jwt
 def api_videos():
-    """API endpoint to get videos JSON for public site"""
-    json_data = BulkOperations.export_to_json(Video)
-    response = make_response(json_data)
+    """API endpoint to get videos JSON for public site; ?slim=1 for list views.
+
+    Filter, sort and pagination parameters (see video_query.py) return one
+    page, with the next page's cursor in X-Next-Cursor.
+    """
+    try:
+        query = VideoQuery.from_args(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    if query is None:
+        slim = request.args.get('slim') == '1'
+        response = make_response(api_cache.get(('videos', slim), lambda: BulkOperations.export_to_json(video_repo, slim=slim)))
+    else:
+        videos, next_cursor = query_videos(video_search, query)
+        response = make_response(json.dumps(videos, separators=(',', ':')))
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
     response.headers['Content-Type'] = 'application/json'
     response.headers['Access-Control-Allow-Origin'] = '*'
     return response
 
+@app.route('/api/videos/changes')
+@login_required_jwt
+def api_video_changes():
+    """Changes since ?since=<seq>; reset=true means reload /api/videos instead"""
+    since = request.args.get('since', type=int)
+    limit = min(request.args.get('limit', 500, type=int), 5000)
+    return jsonify(changes_since(video_repo, since, limit))
+
 @app.route('/export_json')
 @login_required_jwt
 def export_json():
-    json_data = BulkOperations.export_to_json(Video)
+    json_data = BulkOperations.export_to_json(video_repo)
     response = make_response(json_data)
     response.headers['Content-Type'] = 'application/json'
     response.headers['Content-Disposition'] = f'attachment; filename=videos_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
@@ -241,7 +307,7 @@ def export_json():
 @app.route('/export_csv')
 @login_required_jwt
 def export_csv():
-    csv_data = BulkOperations.export_to_csv(Video)
+    csv_data = BulkOperations.export_to_csv(video_repo)
     output = io.StringIO()
     writer = csv.writer(output)
     writer.writerows(csv_data)
@@ -260,7 +326,7 @@ def bulk_import():
         if file:
             try:
                 json_data = file.read().decode('utf-8')
-                results = BulkOperations.import_from_json(json_data, db, Video)
+                results = BulkOperations.import_from_json(json_data, video_repo)
                 
                 if results['success'] > 0:
                     flash(f'Successfully imported {results["success"]} videos!')
@@ -296,18 +362,46 @@ def manage_backups():
 @login_required_jwt
 def restore_backup(filename):
     if backup_manager.restore_backup(filename):
+        # The restored catalog is unrelated to any sequence clients hold
+        video_repo.changes.reset()
+        video_repo.invalidate()
         flash(f'Database restored from {filename}!')
     else:
         flash('Restore failed!', 'error')
     return redirect(url_for('manage_backups'))
 
+@app.route('/profiles')
+@login_required_jwt
+def manage_profiles():
+    captures = [request_profiler.describe(name) for name in request_profiler.list_captures()]
+    return render_template('profiles.html', captures=captures, enabled=request_profiler.enabled)
+
+@app.route('/profiles/<name>')
+@login_required_jwt
+def view_profile(name):
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        sort = 'cumulative'
+    summary = request_profiler.summary(name, sort=sort)
+    if summary is None:
+        abort(404)
+    return render_template('profiles.html', capture=request_profiler.describe(name), summary=summary, sort=sort)
+
+@app.route('/profiles/<name>/download')
+@login_required_jwt
+def download_profile(name):
+    path = request_profiler.path(name)
+    if path is None:
+        abort(404)
+    return send_file(path, as_attachment=True, download_name=name)
+
 @app.route('/bulk_delete', methods=['POST'])
 @login_required_jwt
 def bulk_delete():
     video_ids = request.form.getlist('video_ids')
     if video_ids:
         video_ids = [int(id) for id in video_ids]
-        result = BulkOperations.bulk_delete(video_ids, db, Video)
+        result = BulkOperations.bulk_delete(video_ids, video_repo)
         if result['success']:
             flash(f'Successfully deleted {result["deleted"]} videos!')
         else:
@@ -316,15 +410,7 @@ def bulk_delete():
 
 def create_admin_user():
     with app.app_context():
-        admin_username = os.getenv('ADMIN_USERNAME', 'admin')
-        admin_password = os.getenv('ADMIN_PASSWORD', 'admin123')
-        
-        if not User.query.filter_by(username=admin_username).first():
-            admin = User(username=admin_username)
-            admin.set_password(admin_password)
-            db.session.add(admin)
-            db.session.commit()
-            print(f"Admin user created: username={admin_username}")
+        ensure_admin_user(db, User)
 
 @app.context_processor
 def inject_auth_status():
@@ -345,28 +431,64 @@ def extract_metadata_endpoint():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/memory_tracking', methods=['GET', 'POST'])
+@login_required_jwt
+def memory_tracking():
+    """Show or toggle tracemalloc tracking of exports, imports and restores"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'enabled' not in data:
+            return jsonify({'error': 'enabled required'}), 400
+        memory_tracker.set_enabled(data['enabled'])
+    return jsonify({
+        'enabled': memory_tracker.enabled,
+        'last': {name: usage.to_dict() for name, usage in memory_tracker.last.items()}
+    })
+
 @app.route('/video/<int:video_id>/view')
 def view_video(video_id):
     """Track video view and show preview"""
-    video = Video.query.get_or_404(video_id)
-    
-    # Increment view count
-    if not video.view_count:
-        video.view_count = 0
-    video.view_count += 1
-    db.session.commit()
+    # Increment view count, atomically in the database
+    video = video_repo.increment_views(video_id)
+    if video is None:
+        abort(404)
     
     return render_template('video_preview.html', video=video)
 
-if __name__ == '__main__':
+_jobs_lock = threading.Lock()
+_jobs_pid = None
+
+def start_background_jobs():
+    """Start scheduled jobs in this process, once; leader election keeps them to one process at a time"""
+    global _jobs_pid
+    with _jobs_lock:
+        if _jobs_pid == os.getpid():
+            return
+        _jobs_pid = os.getpid()
     with app.app_context():
-        db.create_all()
-        create_admin_user()
-        
         # Start automated backups (every 24 hours)
-        backup_manager.start_scheduled_backups(24)
+        backup_manager.start_scheduled_backups(int(os.getenv('BACKUP_INTERVAL_HOURS', '24')))
+        
+        # Refresh drifting view counts and thumbnails in small, rate-limited rounds
+        refresh_minutes = int(os.getenv('METADATA_REFRESH_MINUTES', '60'))
+        if refresh_minutes > 0:
+            metadata_refresher.start_scheduled_refresh(app, refresh_minutes)
         
         # Initialize default webhooks
         initialize_default_webhooks()
+
+# Under gunicorn every worker imports the app, or with --preload the master imports it and forks.
+# START_SCHEDULER=1 starts the jobs on each worker's first request, so the election and the
+# scheduler threads always belong to the worker and never to the master that forked it
+scheduler_in_workers = os.getenv('START_SCHEDULER', '').lower() in ('1', 'true', 'yes')
+if scheduler_in_workers:
+    @app.before_request
+    def start_background_jobs_in_worker():
+        if _jobs_pid != os.getpid():
+            start_background_jobs()
+
+if __name__ == '__main__':
+    bootstrap(app, db, User)
+    start_background_jobs()
         
     app.run(debug=True)
\ No newline at end of file
@@ -1,15 +1,15 @@
 import os
-import shutil
 import sqlite3
 from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
 import atexit
+from metrics import timed
+from memory_tracking import track_memory
 
 class BackupManager:
     def __init__(self, db_path, backup_dir='backups'):
         self.db_path = db_path
         self.backup_dir = backup_dir
-        self.scheduler = BackgroundScheduler()
+        self.scheduler = None  # created on first start_scheduled_backups(); apscheduler is slow to import
         self.ensure_backup_dir()
         
     def ensure_backup_dir(self):
@@ -19,15 +19,16 @@ class BackupManager:
     def create_backup(self):
         """Create a backup of the database"""
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_filename = f'videos_backup_{timestamp}.db'
-            backup_path = os.path.join(self.backup_dir, backup_filename)
-            
-            # Copy database file
-            shutil.copy2(self.db_path, backup_path)
-            
-            # Keep only last 10 backups
-            self.cleanup_old_backups()
+            with timed('backup'):
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                backup_filename = f'videos_backup_{timestamp}.db'
+                backup_path = os.path.join(self.backup_dir, backup_filename)
+                
+                # Online backup: includes commits still in the -wal file
+                self._copy_database(self.db_path, backup_path, journal_mode='DELETE')
+                
+                # Keep only last 10 backups
+                self.cleanup_old_backups()
             
             print(f"[BACKUP] Database backed up to {backup_path}")
             return backup_path
@@ -47,25 +48,33 @@ class BackupManager:
         except Exception as e:
             print(f"[ERROR] Cleanup failed: {e}")
     
-    def start_scheduled_backups(self, interval_hours=24):
-        """Start automatic backups"""
+    def start_scheduled_backups(self, interval_hours=24, election=None):
+        """Start automatic backups; with several workers only the elected leader runs them"""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from leader import scheduler_election
+        election = election or scheduler_election()
+        if self.scheduler is None:
+            self.scheduler = BackgroundScheduler()
         self.scheduler.add_job(
-            func=self.create_backup,
+            func=election.only_leader(self.create_backup),
             trigger="interval",
             hours=interval_hours,
             id='backup_job'
         )
         self.scheduler.start()
         atexit.register(lambda: self.scheduler.shutdown())
-        print(f"[BACKUP] Scheduled backups every {interval_hours} hours")
+        role = 'leader' if election.is_leader else 'standby'
+        print(f"[BACKUP] Scheduled backups every {interval_hours} hours ({role})")
     
     def restore_backup(self, backup_filename):
         """Restore from a backup file"""
         try:
             backup_path = os.path.join(self.backup_dir, backup_filename)
             if os.path.exists(backup_path):
-                shutil.copy2(backup_path, self.db_path)
-                print(f"[RESTORE] Database restored from {backup_filename}")
+                with timed('restore'), track_memory('restore') as usage:
+                    # Written through the live database's own WAL, so its -wal/-shm stay consistent
+                    self._copy_database(backup_path, self.db_path)
+                print(f"[RESTORE] Database restored from {backup_filename}{usage.describe()}")
                 return True
             else:
                 print(f"[ERROR] Backup file not found: {backup_filename}")
@@ -74,6 +83,22 @@ class BackupManager:
             print(f"[ERROR] Restore failed: {e}")
             return False
     
+    @staticmethod
+    def _copy_database(source_path, target_path, journal_mode=None):
+        """Copy one SQLite database over another with the online backup API"""
+        source = sqlite3.connect(source_path)
+        try:
+            target = sqlite3.connect(target_path, timeout=30)
+            try:
+                source.backup(target)
+                if journal_mode:
+                    # A standalone single file, without -wal/-shm next to it
+                    target.execute(f"PRAGMA journal_mode={journal_mode}")
+            finally:
+                target.close()
+        finally:
+            source.close()
+    
     def list_backups(self):
         """List available backup files"""
         try:
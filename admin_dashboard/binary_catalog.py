@@ -0,0 +1,247 @@
+"""
+Compact binary snapshot of the published catalog, read through mmap.
+
+Every gunicorn worker that parses videos.json keeps its own copy of every
+record. publish_catalog() also writes this snapshot. Workers map it
+read-only, so the operating system shares its pages between all processes,
+and a page of /api/videos only touches the bytes of the records it returns.
+
+Layout (little-endian):
+    header    magic, format version, record count, heap offset, and the
+              (mtime_ns, size) of the videos.json it was built from
+    records   fixed-width, newest first: id, then an (offset, length)
+              reference into the heap for each of STRING_FIELDS and for
+              a JSON blob holding every other field; two reserved
+              lengths mark absent fields and None values
+    heap      UTF-8 strings; repeated values (speakers, platforms) stored once
+
+Records are decoded one field at a time when read, so a projected page
+never decodes descriptions.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping
+
+MAGIC = b'GTVB'
+FORMAT_VERSION = 1
+STRING_FIELDS = ('title', 'url', 'speaker', 'date_added', 'description', 'platform',
+                 'video_id', 'thumbnail', 'duration_string')
+EXTRA = len(STRING_FIELDS)  # slot of the JSON blob with the remaining fields
+ABSENT = 0xFFFFFFFF  # length marking a field the record does not have
+NULL = 0xFFFFFFFE  # length marking a None value
+
+HEADER = struct.Struct('<4sHxxIQqq')
+RECORD = struct.Struct('<q' + 'II' * (len(STRING_FIELDS) + 1))
+
+DEFAULT_BINARY_PATH = os.path.abspath(os.getenv('BINARY_CATALOG_PATH', os.path.join(
+    os.getenv('VIDEO_STORE_DIR', os.path.join(os.path.dirname(__file__), '..', 'instance')),
+    'videos.bin'
+)))
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def write_binary_catalog(videos, path=DEFAULT_BINARY_PATH, source_path=None):
+    """Write public records as a binary snapshot; `source_path` is the videos.json they came from"""
+    videos = sorted(videos, key=lambda v: (v.get('date_added') or '', v['id']), reverse=True)
+    heap, interned, records = bytearray(), {}, bytearray()
+
+    def ref(value):
+        if value is None:
+            return 0, NULL
+        if value is ABSENT:
+            return 0, ABSENT
+        data = value.encode('utf-8')
+        offset = interned.get(data)
+        if offset is None:
+            offset = interned[data] = len(heap)
+            heap.extend(data)
+        return offset, len(data)
+
+    for video in videos:
+        refs = []
+        for field in STRING_FIELDS:
+            value = video.get(field, ABSENT)
+            refs.extend(ref(value if value is None or value is ABSENT else str(value)))
+        extra = {key: value for key, value in video.items() if key != 'id' and key not in STRING_FIELDS}
+        refs.extend(ref(json.dumps(extra, separators=(',', ':')) if extra else ABSENT))
+        records += RECORD.pack(video['id'], *refs)
+
+    mtime_ns, size = _stamp(source_path) if source_path else (0, 0)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(videos), HEADER.size + len(records), mtime_ns, size)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(header)
+        f.write(records)
+        f.write(heap)
+    os.chmod(tmp_path, 0o644)
+    # Readers keep mapping the old inode until they notice the new file
+    os.replace(tmp_path, path)
+    return len(videos)
+
+class BinaryRecord(Mapping):
+    """Read-only view of one record; fields are decoded from the mapped file on first access"""
+
+    __slots__ = ('_catalog', '_refs', '_cache', '_extra')
+
+    def __init__(self, catalog, refs):
+        self._catalog = catalog
+        self._refs = refs
+        self._cache = {'id': refs[0]}
+        self._extra = None
+
+    def _string(self, slot):
+        offset, length = self._refs[1 + 2 * slot], self._refs[2 + 2 * slot]
+        if length == ABSENT:
+            raise KeyError(STRING_FIELDS[slot] if slot < EXTRA else 'extra')
+        if length == NULL:
+            return None
+        return self._catalog.string(offset, length)
+
+    def _extras(self):
+        if self._extra is None:
+            length = self._refs[2 + 2 * EXTRA]
+            self._extra = json.loads(self._string(EXTRA)) if length != ABSENT else {}
+        return self._extra
+
+    def __getitem__(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        if key in STRING_FIELDS:
+            value = self._cache[key] = self._string(STRING_FIELDS.index(key))
+            return value
+        return self._extras()[key]
+
+    def __iter__(self):
+        yield 'id'
+        for slot, field in enumerate(STRING_FIELDS):
+            if self._refs[2 + 2 * slot] != ABSENT:
+                yield field
+        yield from self._extras()
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class BinaryCatalog:
+    """A mapped snapshot file; pages are memoryview slices, records decode lazily"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.stamp = os.fstat(f.fileno()).st_ino, os.fstat(f.fileno()).st_mtime_ns
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, self.count, heap_offset, *source = HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} binary catalog")
+        self.source_stamp = tuple(source)
+        self._records = self._view[HEADER.size:heap_offset]
+        self._heap = self._view[heap_offset:]
+
+    def __len__(self):
+        return self.count
+
+    def string(self, offset, length):
+        return str(self._heap[offset:offset + length], 'utf-8')
+
+    def record(self, index):
+        return BinaryRecord(self, RECORD.unpack_from(self._records, index * RECORD.size))
+
+    def page(self, start, stop):
+        """Records [start, stop) in newest-first order, read from a slice of the mapping"""
+        stop = min(stop, self.count)
+        view = self._records[start * RECORD.size:max(stop, start) * RECORD.size]
+        return [BinaryRecord(self, refs) for refs in RECORD.iter_unpack(view)]
+
+    def position_after(self, key):
+        """Index of the first record ordered after the (date_added, id) key, newest first"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = self.record(middle)
+            if (record.get('date_added') or '', record['id']) < tuple(key):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+class BinaryCatalogEngine:
+    """Answers newest-first /api/videos pages from the binary snapshot.
+
+    Used only while the snapshot matches the videos.json the repository
+    reads, i.e. until the next write that is not yet published. Filtered
+    or re-sorted queries, and stale snapshots, go to `fallback` (the
+    repository or a columnar engine over it). Rows are returned as public
+    records, thumbnails already included.
+    """
+
+    annotated = True
+
+    def __init__(self, repository, fallback=None, path=DEFAULT_BINARY_PATH):
+        self.repository = repository
+        self.fallback = fallback or repository
+        self.path = path
+        self.source_path = repository.store.store.path
+        self._catalog = None
+        self._lock = threading.Lock()
+
+    def catalog(self):
+        """The mapped snapshot, reopened after a publish; None when missing or stale"""
+        try:
+            stat = os.stat(self.path)
+            source = _stamp(self.source_path)
+        except FileNotFoundError:
+            return None
+        catalog = self._catalog
+        if catalog is None or catalog.stamp != (stat.st_ino, stat.st_mtime_ns):
+            with self._lock:
+                catalog = self._catalog
+                if catalog is None or catalog.stamp != (stat.st_ino, stat.st_mtime_ns):
+                    try:
+                        catalog = self._catalog = BinaryCatalog(self.path)
+                    except (OSError, ValueError) as e:
+                        print(f"[BINARY CATALOG] Cannot map {self.path}: {e}")
+                        return None
+        return catalog if catalog.source_stamp == source else None
+
+    def query(self, query):
+        plain = query.sort_spec == '-date_added' and not any(
+            (query.speaker, query.tag, query.platform, query.date_from, query.date_to)
+        )
+        catalog = self.catalog() if plain else None
+        if catalog is None:
+            from thumbnails import thumbnail_pipeline
+            rows, next_cursor = self.fallback.query(query)
+            records = [self.fallback.serialize(row) for row in rows]
+            if not getattr(self.fallback, 'annotated', False):
+                records = thumbnail_pipeline.annotate(records)
+            return records, next_cursor
+
+        start = catalog.position_after(query.after) if query.after else 0
+        rows = catalog.page(start, start + query.limit + 1)
+        next_cursor = None
+        if len(rows) > query.limit:
+            last = rows[query.limit - 1]
+            next_cursor = query.encode_cursor(query.key(last.get('date_added'), last['id']))
+        return rows[:query.limit], next_cursor
+
+    @staticmethod
+    def serialize(record):
+        return record
+
+def binary_engine(repository, fallback=None):
+    """BinaryCatalogEngine for a JSON-file repository reading videos.json directly, else `fallback`"""
+    fallback = fallback or repository
+    if os.getenv('BINARY_CATALOG', '1') != '1':
+        return fallback
+    # The journal backend's live catalog is not the published videos.json the snapshot mirrors
+    if not hasattr(getattr(getattr(repository, 'store', None), 'store', None), 'path'):
+        return fallback
+    return BinaryCatalogEngine(repository, fallback)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+One-time database bootstrap for the admin apps.
+
+Creating tables and hashing the admin password used to happen on every
+import of index.py, so every serverless cold start paid for them. The
+bootstrap now records SCHEMA_VERSION in a `schema_version` table. A cold
+instance reads that one row and goes straight to serving. The full
+bootstrap runs only when the marker is missing or older.
+
+    python bootstrap.py setup                 # run once per deployment (DATABASE_URL from env)
+    python bootstrap.py setup --app app       # bootstrap the app.py models instead of index.py
+    python bootstrap.py hash-password         # print a bcrypt hash for ADMIN_PASSWORD_HASH
+
+Set BOOTSTRAP_ON_START=0 once `setup` has run against a persistent
+database to skip even the marker check. Set ADMIN_PASSWORD_HASH so an
+ephemeral database (e.g. sqlite in /tmp) never runs bcrypt at boot.
+"""
+import argparse
+import os
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+# Bump whenever the models change in a way db.create_all() must pick up
+SCHEMA_VERSION = 1
+
+def schema_version(db):
+    """Recorded schema version, or 0 for a database that was never bootstrapped"""
+    try:
+        return db.session.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return 0
+
+def _record_version(db, version):
+    db.session.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+    db.session.execute(text('DELETE FROM schema_version'))
+    db.session.execute(text('INSERT INTO schema_version (version) VALUES (:version)'), {'version': version})
+
+def hash_password(password):
+    import bcrypt
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def ensure_admin_user(db, User):
+    """Create the admin account if missing; returns True when it was created"""
+    username = os.getenv('ADMIN_USERNAME', 'admin')
+    if User.query.filter_by(username=username).first():
+        return False
+
+    admin = User(username=username)
+    if os.getenv('ADMIN_PASSWORD_HASH'):
+        admin.password_hash = os.getenv('ADMIN_PASSWORD_HASH')
+    else:
+        admin.set_password(os.getenv('ADMIN_PASSWORD', 'admin123'))
+    db.session.add(admin)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another instance created it first
+        db.session.rollback()
+        return False
+    print(f"Admin user created: username={username}")
+    return True
+
+def bootstrap(app, db, User, force=False):
+    """Create tables, the admin user and the version marker unless already done.
+
+    Returns True when work was done, False on the fast path.
+    """
+    with app.app_context():
+        if not force and schema_version(db) >= SCHEMA_VERSION:
+            return False
+        db.create_all()
+        ensure_admin_user(db, User)
+        _record_version(db, SCHEMA_VERSION)
+        db.session.commit()
+        print(f"[BOOTSTRAP] Database ready at schema version {SCHEMA_VERSION}")
+        return True
+
+def bootstrap_on_start(app, db, User):
+    """Import-time hook for serverless entry points (see BOOTSTRAP_ON_START)"""
+    if os.getenv('BOOTSTRAP_ON_START', '1').lower() in ('0', 'false', 'no', 'off'):
+        return False
+    return bootstrap(app, db, User)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    setup = subparsers.add_parser('setup', help='create tables, admin user and version marker')
+    setup.add_argument('--app', choices=['index', 'app'], default='index', help='which admin app models to use')
+    setup.add_argument('--force', action='store_true', help='run even if the marker is current')
+    subparsers.add_parser('hash-password', help='print a bcrypt hash of ADMIN_PASSWORD (or a prompt)')
+    args = parser.parse_args()
+
+    if args.command == 'hash-password':
+        password = os.getenv('ADMIN_PASSWORD')
+        if not password:
+            import getpass
+            password = getpass.getpass('Admin password: ')
+        print(hash_password(password))
+        return
+
+    os.environ['BOOTSTRAP_ON_START'] = '0'  # the import below must not bootstrap on its own
+    if args.app == 'index':
+        import index as module
+    else:
+        import app as module
+    if not bootstrap(module.app, module.db, module.User, force=args.force):
+        print(f"[BOOTSTRAP] Already at schema version {SCHEMA_VERSION}, nothing to do")
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,10 @@ import csv
 from datetime import datetime
 from flask import current_app
 import validators
+from metrics import timed
+from memory_tracking import track_memory
+from thumbnails import thumbnail_pipeline
+from repository import project
 
 class BulkOperations:
     @staticmethod
@@ -27,98 +31,91 @@ class BulkOperations:
         return errors
     
     @staticmethod
-    def import_from_json(json_data, db, Video):
+    @timed('import_json')
+    @track_memory('import_json')
+    def import_from_json(json_data, repository):
         """Import videos from JSON data"""
         results = {'success': 0, 'errors': [], 'skipped': 0}
         
         try:
             videos_data = json.loads(json_data) if isinstance(json_data, str) else json_data
             
+            valid = []
             for i, video_data in enumerate(videos_data):
                 errors = BulkOperations.validate_video_data(video_data)
                 
                 if errors:
                     results['errors'].append(f"Row {i+1}: {', '.join(errors)}")
                     continue
-                
-                # Check if video already exists
-                existing = Video.query.filter_by(url=video_data['url']).first()
-                if existing:
+                valid.append(video_data)
+            
+            # One batched lookup for duplicates instead of a query per row
+            seen = repository.existing_urls(v['url'] for v in valid)
+            new_videos = []
+            for video_data in valid:
+                if video_data['url'] in seen:
                     results['skipped'] += 1
                     continue
+                seen.add(video_data['url'])
                 
-                # Create new video
-                video = Video(
-                    title=video_data['title'],
-                    url=video_data['url'],
-                    speaker=video_data['speaker'],
-                    tags=video_data.get('tags', ''),
-                    description=video_data.get('description', '')
-                )
-                db.session.add(video)
-                results['success'] += 1
+                new_videos.append({
+                    'title': video_data['title'],
+                    'url': video_data['url'],
+                    'speaker': video_data['speaker'],
+                    'tags': video_data.get('tags', ''),
+                    'description': video_data.get('description', '')
+                })
             
-            db.session.commit()
+            if new_videos:
+                repository.put_many(new_videos)
+            results['success'] = len(new_videos)
             
         except json.JSONDecodeError:
             results['errors'].append("Invalid JSON format")
         except Exception as e:
-            db.session.rollback()
             results['errors'].append(f"Import failed: {str(e)}")
         
         return results
     
     @staticmethod
-    def export_to_json(Video):
-        """Export all videos to JSON"""
-        videos = Video.query.all()
-        video_data = []
-        
-        for video in videos:
-            tags = [tag.strip() for tag in video.tags.split(',') if tag.strip()] if video.tags else []
-            video_data.append({
-                'id': video.id,
-                'title': video.title,
-                'url': video.url,
-                'speaker': video.speaker,
-                'tags': tags,
-                'date_added': video.date_added.isoformat(),
-                'description': video.description or ''
-            })
-        
-        return json.dumps(video_data, indent=2)
+    @timed('export_json')
+    @track_memory('export_json')
+    def export_to_json(repository, slim=False):
+        """Export all videos to JSON; `slim` keeps only the fields list views need"""
+        videos = thumbnail_pipeline.annotate(repository.export())
+        if slim:
+            return json.dumps(project(videos), separators=(',', ':'))
+        return json.dumps(videos, indent=2)
     
     @staticmethod
-    def export_to_csv(Video):
+    @timed('export_csv')
+    def export_to_csv(repository):
         """Export all videos to CSV format"""
-        videos = Video.query.all()
         csv_data = []
         
         # Header
         csv_data.append(['ID', 'Title', 'URL', 'Speaker', 'Tags', 'Date Added', 'Description'])
         
         # Data rows
-        for video in videos:
-            tags = ', '.join([tag.strip() for tag in video.tags.split(',') if tag.strip()]) if video.tags else ''
+        for video in repository.export():
+            date_added = video.get('date_added')
             csv_data.append([
-                video.id,
-                video.title,
-                video.url,
-                video.speaker,
-                tags,
-                video.date_added.strftime('%Y-%m-%d %H:%M:%S'),
-                video.description or ''
+                video['id'],
+                video['title'],
+                video['url'],
+                video['speaker'],
+                ', '.join(video.get('tags') or []),
+                datetime.fromisoformat(date_added).strftime('%Y-%m-%d %H:%M:%S') if date_added else '',
+                video.get('description') or ''
             ])
         
         return csv_data
     
     @staticmethod
-    def bulk_delete(video_ids, db, Video):
+    def bulk_delete(video_ids, repository):
         """Delete multiple videos by IDs"""
         try:
-            deleted_count = Video.query.filter(Video.id.in_(video_ids)).delete(synchronize_session=False)
-            db.session.commit()
+            deleted_count = repository.delete_many(video_ids)
             return {'success': True, 'deleted': deleted_count}
         except Exception as e:
-            db.session.rollback()
             return {'success': False, 'error': str(e)}
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import threading
+import time
+
+class CatalogVersion:
+    """Catalog version shared by every process on the host through one small file.
+
+    bump() atomically replaces the file, so its inode and mtime change;
+    current() is a single os.stat(). With CACHE_VERSION_POLL_INTERVAL set
+    (seconds), the stat is skipped for that long after the last one, trading
+    that much staleness for fewer syscalls. Writes in this process are
+    always seen immediately.
+    """
+
+    def __init__(self, path, poll_interval=None):
+        self.path = os.path.abspath(path)
+        self.poll_interval = float(poll_interval or os.getenv('CACHE_VERSION_POLL_INTERVAL', '0'))
+        self._stamp = None
+        self._checked_at = 0.0
+
+    def bump(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(f"{time.time_ns()} {os.getpid()}\n")
+        os.replace(tmp_path, self.path)
+        self._stamp = None
+
+    def current(self):
+        """Opaque token that changes on every bump() in any process"""
+        now = time.monotonic()
+        if self._stamp is not None and now - self._checked_at < self.poll_interval:
+            return self._stamp
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = (0, 0)
+        self._stamp, self._checked_at = stamp, now
+        return stamp
+
+class VersionedCache:
+    """Values built for one catalog version, all dropped once `version()` returns something else.
+
+    `version` is any callable returning a token that compares equal while
+    the catalog is unchanged, e.g. VideoRepository.catalog_version.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self._entry = (object(), {})  # (token, values), swapped as a whole
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        token = self.version()
+        cached_token, values = self._entry
+        if cached_token != token:
+            with self._lock:
+                if self._entry[0] != token:
+                    self._entry = (token, {})
+                cached_token, values = self._entry
+        if key not in values:
+            values[key] = build()
+        return values[key]
+
+    def clear(self):
+        self._entry = (object(), {})
@@ -0,0 +1,152 @@
+import os
+from contextlib import contextmanager
+from json_store import video_store
+
+class VideoCatalog:
+    """Id-indexed, insertion-ordered collection of video records"""
+
+    def __init__(self, videos=()):
+        self._by_id = {}  # dicts keep insertion order, so iteration follows the file
+        self.max_id = 0
+        self.changes = None  # set to a list to record ('put', record) / ('delete', id) ops
+        self._views = {}  # derived orderings/indexes, dropped on every mutation
+        for video in videos:
+            self.add(video)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __contains__(self, video_id):
+        return video_id in self._by_id
+
+    def get(self, video_id):
+        return self._by_id.get(video_id)
+
+    def newest_first(self):
+        """Records ordered by date_added, newest first"""
+        view = self._views.get('newest_first')
+        if view is None:
+            view = sorted(self._by_id.values(), key=lambda v: v.get('date_added') or '', reverse=True)
+            self._views['newest_first'] = view
+        return view
+
+    def urls(self):
+        view = self._views.get('urls')
+        if view is None:
+            view = {v.get('url') for v in self._by_id.values()}
+            self._views['urls'] = view
+        return view
+
+    def index(self, name, keys):
+        """Map of key -> ids of the records for which `keys(record)` yields it, cached as `name`"""
+        view = self._views.get(('index', name))
+        if view is None:
+            view = {}
+            for video in self._by_id.values():
+                for key in keys(video):
+                    view.setdefault(key, set()).add(video['id'])
+            self._views[('index', name)] = view
+        return view
+
+    def ordered(self, name, key):
+        """(records, keys) sorted ascending by `key(record)`, cached as `name`; keys are for bisect"""
+        view = self._views.get(('ordered', name))
+        if view is None:
+            records = sorted(self._by_id.values(), key=key)
+            view = (records, [key(video) for video in records])
+            self._views[('ordered', name)] = view
+        return view
+
+    def search_text(self):
+        """(lowercased title/description/speakers/tags, record) pairs, newest first"""
+        view = self._views.get('search_text')
+        if view is None:
+            view = [
+                ('\n'.join([
+                    video.get('title') or '', video.get('description') or '',
+                    *(video.get('speakers') or [video.get('speaker') or '']),
+                    *(video.get('tags') or []),
+                ]).lower(), video)
+                for video in self.newest_first()
+            ]
+            self._views['search_text'] = view
+        return view
+
+    def next_id(self):
+        return self.max_id + 1
+
+    def add(self, video):
+        """Insert a record, assigning the next id when it has none"""
+        if video.get('id') is None:
+            video = {'id': self.next_id(), **{k: v for k, v in video.items() if k != 'id'}}
+        video_id = video['id']
+        self._by_id[video_id] = video
+        self._views.clear()
+        if isinstance(video_id, int) and video_id > self.max_id:
+            self.max_id = video_id
+        if self.changes is not None:
+            self.changes.append(('put', video))
+        return video
+
+    def update(self, video_id, fields):
+        """Replace a record with an updated copy; records shared with readers are never mutated"""
+        video = self._by_id.get(video_id)
+        if video is None:
+            return None
+        video = {**video, **fields}
+        self._by_id[video_id] = video
+        self._views.clear()
+        if self.changes is not None:
+            self.changes.append(('put', video))
+        return video
+
+    def remove(self, video_id):
+        # max_id is not lowered, so removing the newest record does not rescan
+        video = self._by_id.pop(video_id, None)
+        self._views.clear()
+        if video is not None and self.changes is not None:
+            self.changes.append(('delete', video_id))
+        return video
+
+    def copy(self):
+        clone = VideoCatalog()
+        clone._by_id = dict(self._by_id)
+        clone.max_id = self.max_id
+        return clone
+
+    def to_list(self):
+        return list(self._by_id.values())
+
+class CatalogStore:
+    """VideoCatalog over a JsonStore, rebuilt only when the underlying file changes"""
+
+    def __init__(self, store=video_store):
+        self.store = store
+
+    def catalog(self):
+        """Shared, read-only catalog for the current version of the file"""
+        return self.store.derived(VideoCatalog)
+
+    def load(self):
+        return self.store.load()
+
+    @contextmanager
+    def edit(self):
+        """Yield a private copy of the catalog under the store lock and persist it on exit"""
+        with self.store.lock:
+            catalog = self.catalog().copy()
+            yield catalog
+            self.store.save(catalog.to_list(), derived={VideoCatalog: catalog})
+
+def open_catalog_store():
+    """Pick the JSON-file backend from VIDEO_STORE_BACKEND ('json' or 'journal')"""
+    backend = os.getenv('VIDEO_STORE_BACKEND', 'json').lower()
+    if backend == 'journal':
+        from journal_store import JournalStore
+        return JournalStore()
+    return CatalogStore()
+
+video_catalog = open_catalog_store()
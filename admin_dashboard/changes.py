@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from json_store import JsonStore, FileLock, DEFAULT_VIDEOS_PATH
+from thumbnails import thumbnail_pipeline
+
+# Static feed published next to videos.json
+DEFAULT_CHANGES_FILE = os.path.join(os.path.dirname(DEFAULT_VIDEOS_PATH), 'changes.json')
+# Log for the JSON-file catalog; the SQL apps keep theirs next to the database (CHANGELOG_PATH)
+DEFAULT_CHANGES_LOG = os.path.abspath(os.path.join(
+    os.getenv('VIDEO_STORE_DIR', os.path.join(os.path.dirname(__file__), '..', 'instance')),
+    'videos.changes.jsonl'
+))
+
+class ChangeState:
+    """The log as of a given byte offset into a given log file; never mutated once published.
+
+    `entries` is in sequence order and may be shared with the next state,
+    which appends to it; this state only reads its first `count` items.
+    """
+
+    def __init__(self, entries, count, seq, floor, inode, offset, lines=0):
+        self.entries = entries
+        self.count = count
+        self.seq = seq
+        self.floor = floor
+        self.inode = inode
+        self.offset = offset
+        self.lines = lines  # lines read from the file, including floors and superseded entries
+
+    def latest(self, after=0):
+        """Latest entry per id among those after sequence `after`, in sequence order"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.entries[middle]['seq'] <= after:
+                low = middle + 1
+            else:
+                high = middle
+        latest = {}
+        for entry in self.entries[low:self.count]:
+            latest.pop(entry['id'], None)  # re-insert, so dict order stays sequence order
+            latest[entry['id']] = entry
+        return list(latest.values())
+
+    def since(self, seq, limit=None):
+        """Changes after `seq` in sequence order, plus the bounds a client needs"""
+        if seq is None or seq < self.floor or seq > self.seq:
+            return {'seq': self.seq, 'floor': self.floor, 'reset': True, 'changes': []}
+        changes = self.latest(seq)
+        more = limit is not None and len(changes) > limit
+        if more:
+            changes = changes[:limit]
+        return {
+            'seq': changes[-1]['seq'] if more else self.seq,
+            'floor': self.floor,
+            'reset': False,
+            'more': more,
+            'changes': changes,
+        }
+
+class ChangeLog:
+    """Monotonic change sequence over a catalog, with tombstones for deletes.
+
+    Stored as an append-only JSONL file, so recording a change costs one
+    appended line however long the log is. Readers replay only the bytes
+    appended since their last read. A `floor` line drops everything before
+    it and sets the floor: a client that synced before the floor has to
+    reload the full catalog. reset() appends one. compact() rewrites the
+    log as one floor line plus the latest change per video, at most
+    `max_entries` of them; it runs on publish and once the file passes
+    `compact_bytes`. A client that synced past the current sequence (the
+    log was replaced) also has to reload.
+    """
+
+    def __init__(self, path, max_entries=None, compact_bytes=None):
+        self.path = os.path.abspath(path)
+        self.max_entries = int(max_entries or os.getenv('CHANGELOG_MAX_ENTRIES', '10000'))
+        self.compact_bytes = int(compact_bytes or os.getenv('CHANGELOG_COMPACT_BYTES', 4 * 1024 * 1024))
+        self.lock = FileLock(self.path)
+        self._state = None
+        self._state_lock = threading.Lock()
+
+    def state(self):
+        """Current ChangeState, re-read only as far as the file has grown"""
+        with self._state_lock:
+            try:
+                st = os.stat(self.path)
+                inode, size = st.st_ino, st.st_size
+            except FileNotFoundError:
+                inode, size = None, 0
+
+            state = self._state
+            if state is None or state.inode != inode or size < state.offset:
+                state = ChangeState([], 0, 0, 0, inode, 0)
+            if size > state.offset:
+                state = self._replay(state, size)
+            self._state = state
+            return state
+
+    @property
+    def seq(self):
+        return self.state().seq
+
+    def since(self, seq, limit=None):
+        return self.state().since(seq, limit)
+
+    def _replay(self, state, size):
+        with open(self.path, 'rb') as f:
+            f.seek(state.offset)
+            chunk = f.read(size - state.offset)
+        # A writer may be mid-append; only apply complete lines
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return state
+        return self._apply(state, [json.loads(line) for line in chunk[:end].splitlines() if line.strip()],
+                           state.offset + end)
+
+    @staticmethod
+    def _apply(state, lines, offset):
+        entries, seq, floor = state.entries, state.seq, state.floor
+        if len(entries) != state.count:
+            entries = entries[:state.count]  # only the newest state may append in place
+        for line in lines:
+            if line.get('op') == 'floor':
+                entries, floor = [], line['floor']
+            else:
+                entries.append(line)
+            seq = max(seq, line['seq'])
+        return ChangeState(entries, len(entries), seq, floor, state.inode, offset, state.lines + len(lines))
+
+    def _append(self, lines):
+        """Append lines under the log lock, which the caller holds, and publish the new state"""
+        payload = ''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines).encode('utf-8')
+        with open(self.path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            inode, size = os.fstat(f.fileno()).st_ino, f.tell()
+        with self._state_lock:
+            state = self._state
+            if state is not None and state.inode == inode and state.offset + len(payload) == size:
+                self._state = self._apply(state, lines, size)
+            else:
+                self._state = None  # the file was just created; replay it on next read
+        return size
+
+    def record(self, put_ids=(), deleted_ids=()):
+        """Give each changed id the next sequence number; returns the new sequence"""
+        put_ids, deleted_ids = list(put_ids), list(deleted_ids)
+        if not put_ids and not deleted_ids:
+            return None
+        now = datetime.now().isoformat()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            seq = self.state().seq
+            lines = []
+            for op, ids in (('put', put_ids), ('delete', deleted_ids)):
+                for video_id in ids:
+                    seq += 1
+                    lines.append({'seq': seq, 'op': op, 'id': video_id, 'at': now})
+            if self._append(lines) >= self.compact_bytes:
+                self.compact()
+        return seq
+
+    def reset(self):
+        """Invalidate every client's sequence, e.g. after a restore replaced the catalog"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            seq = self.state().seq + 1
+            self._append([{'seq': seq, 'op': 'floor', 'floor': seq}])
+
+    def compact(self):
+        """Rewrite the log with the latest change per id, dropping the oldest past max_entries"""
+        with self.lock:
+            state = self.state()
+            if state.lines == 0:
+                return False
+            entries = state.latest(state.floor)
+            floor = state.floor
+            if len(entries) > self.max_entries:
+                floor = entries[-self.max_entries - 1]['seq']
+                entries = entries[-self.max_entries:]
+            if floor == state.floor and len(entries) == state.count == state.lines - 1:
+                return False  # already compact
+            lines = [{'seq': state.seq, 'op': 'floor', 'floor': floor}, *entries]
+            JsonStore(self.path).save_text(''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines))
+            return True
+
+def changes_since(repository, seq, limit=None):
+    """ChangeLog.since() with the current public record attached to every put"""
+    feed = repository.changes.state().since(seq, limit)
+    found = list(repository.export_many(entry['id'] for entry in feed['changes'] if entry['op'] == 'put').values())
+    if not getattr(repository, 'annotated', False):
+        found = thumbnail_pipeline.annotate(found)
+    records = {video['id']: video for video in found}
+    changes = []
+    for entry in feed['changes']:
+        change = {'seq': entry['seq'], 'op': entry['op'], 'id': entry['id']}
+        if entry['op'] == 'put':
+            video = records.get(entry['id'])
+            if video is None:
+                # Deleted after this entry was read; its tombstone comes in a later sync
+                continue
+            change['video'] = video
+        changes.append(change)
+    feed['changes'] = changes
+    return feed
+
+def publish_changes(repository, path=DEFAULT_CHANGES_FILE, limit=None):
+    """Write the recent changes as a static file next to the published videos.json.
+
+    Older history is cut at `limit` entries and the floor raised to match,
+    so clients that are further behind reload videos.json instead.
+    """
+    if repository.changes is None:
+        return None
+    limit = int(limit or os.getenv('CHANGES_FILE_LIMIT', '1000'))
+    if isinstance(repository.changes, ChangeLog):
+        repository.changes.compact()  # publishing already rewrites the catalog; trim the log with it
+    state = repository.changes.state()
+    entries = state.latest(state.floor)
+    floor = state.floor
+    if len(entries) > limit:
+        floor = entries[-limit - 1]['seq']
+    feed = changes_since(repository, floor)
+    feed['floor'] = floor
+    feed.pop('more', None)
+    JsonStore(path, indent=None).save(feed)
+    return feed['seq']
@@ -0,0 +1,220 @@
+"""
+Columnar in-memory snapshot of the catalog for read-heavy API processes.
+
+Holds the catalog as NumPy arrays:
+  - id, date_added (int64 microseconds) and view_count
+  - dictionary-encoded speaker, platform and tag codes, with their string tables
+  - title ranks, so titles sort as integers
+
+Every /api/videos query (see video_query.py) then runs as vectorized masks
+and one lexsort over the matching rows, instead of a Python loop over ORM
+objects or dicts. Python objects are built only for the page returned.
+
+The snapshot is rebuilt when the repository's catalog_version() changes,
+and on the SQL backend also once COLUMNAR_MAX_AGE seconds have passed,
+because view counts do not change the version.
+
+Enable it with COLUMNAR_CATALOG=1. It requires NumPy (`pip install numpy`).
+Without NumPy, the repository's own query is used.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from metrics import registry
+from repository import record_speakers
+from video_metadata import detect_platform
+
+REBUILDS = registry.counter(
+    'gentube_columnar_rebuilds_total', 'Columnar catalog snapshots built after a catalog change'
+)
+
+class _Grouped:
+    """Dictionary-encoded multi-valued column: rows for each code, stored contiguously"""
+
+    def __init__(self, np, values_per_row):
+        table, rows, codes = {}, [], []
+        for row, values in enumerate(values_per_row):
+            for value in set(values):
+                rows.append(row)
+                codes.append(table.setdefault(value, len(table)))
+        codes = np.asarray(codes, dtype=np.int32)
+        order = np.argsort(codes, kind='stable')
+        self.table = table
+        self.rows = np.asarray(rows, dtype=np.int64)[order]
+        self.offsets = np.searchsorted(codes[order], np.arange(len(table) + 1))
+
+    def rows_for(self, value):
+        code = self.table.get(value)
+        if code is None:
+            return self.rows[:0]
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+class ColumnarSnapshot:
+    """Immutable columnar copy of the public records of one catalog version"""
+
+    def __init__(self, rows):
+        import numpy as np
+        self.np = np
+
+        self.records, view_counts = [], []
+        for record, view_count in rows:
+            self.records.append(record)
+            view_counts.append(view_count or 0)
+        records = self.records
+
+        self.ids = np.fromiter((r['id'] for r in records), dtype=np.int64, count=len(records))
+        self.view_counts = np.asarray(view_counts, dtype=np.int64)
+        self.dates = self._datetimes([r.get('date_added') or '' for r in records])
+
+        self.speakers = _Grouped(np, (record_speakers(r) for r in records))
+        self.tags = _Grouped(np, (r.get('tags') or [] for r in records))
+        platform_keys = [detect_platform(r.get('url') or '') for r in records]
+        self.platform_table = {key: code for code, key in enumerate(sorted(set(platform_keys)))}
+        self.platforms = np.fromiter((self.platform_table[key] for key in platform_keys),
+                                     dtype=np.int16, count=len(records))
+
+        self.title_table = sorted({r.get('title') or '' for r in records})
+        ranks = {title: rank for rank, title in enumerate(self.title_table)}
+        self.title_ranks = np.fromiter((ranks[r.get('title') or ''] for r in records),
+                                       dtype=np.int64, count=len(records))
+
+    def __len__(self):
+        return len(self.records)
+
+    def _datetimes(self, values):
+        """ISO strings to int64 microseconds; empty or unparsable dates sort first, like '' does"""
+        np = self.np
+        try:
+            parsed = np.asarray([v or 'NaT' for v in values], dtype='datetime64[us]')
+        except ValueError:
+            parsed = np.asarray([self._datetime(v) for v in values], dtype='datetime64[us]')
+        return parsed.astype(np.int64)
+
+    def _datetime(self, value):
+        try:
+            return self.np.datetime64(value, 'us')
+        except ValueError:
+            return self.np.datetime64('NaT')
+
+    def _column(self, sort):
+        return {'date_added': self.dates, 'view_count': self.view_counts, 'title': self.title_ranks}[sort]
+
+    def _bounds(self, sort, value):
+        """(less-than bound, greater-than bound, equal value or None) for a cursor value in column space"""
+        if sort == 'title':
+            position = bisect_left(self.title_table, value)
+            exact = position < len(self.title_table) and self.title_table[position] == value
+            return position, position + exact - 1, position if exact else None
+        if sort == 'date_added':
+            value = int(self._datetimes([value])[0])
+        return value, value, value
+
+    def _mask_rows(self, mask, rows):
+        selected = self.np.zeros(len(self), dtype=bool)
+        selected[rows] = True
+        return selected if mask is None else mask & selected
+
+    def query(self, query):
+        np = self.np
+        mask = None
+        if query.speaker:
+            mask = self._mask_rows(mask, self.speakers.rows_for(query.speaker))
+        if query.tag:
+            mask = self._mask_rows(mask, self.tags.rows_for(query.tag))
+        if query.platform:
+            code = self.platform_table.get(query.platform, -1)
+            mask = (self.platforms == code) if mask is None else mask & (self.platforms == code)
+        if query.date_from:
+            bound = self.dates >= int(np.datetime64(query.date_from, 'us').astype(np.int64))
+            mask = bound if mask is None else mask & bound
+        if query.date_to:
+            bound = self.dates < int(np.datetime64(query.date_to, 'us').astype(np.int64))
+            mask = bound if mask is None else mask & bound
+
+        column = self._column(query.sort)
+        if query.after is not None:
+            value, last_id = query.after
+            less, greater, equal = self._bounds(query.sort, value)
+            if query.descending:
+                bound = column < less
+                if equal is not None:
+                    bound |= (column == equal) & (self.ids < last_id)
+            else:
+                bound = column > greater
+                if equal is not None:
+                    bound |= (column == equal) & (self.ids > last_id)
+            mask = bound if mask is None else mask & bound
+
+        rows = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        order = np.lexsort((self.ids[rows], column[rows]))
+        if query.descending:
+            order = order[::-1]
+        page = rows[order[:query.limit + 1]].tolist()
+
+        next_cursor = None
+        if len(page) > query.limit:
+            last = page[query.limit - 1]
+            value = int(self.view_counts[last]) if query.sort == 'view_count' else self.records[last].get(query.sort)
+            next_cursor = query.encode_cursor(query.key(value, self.records[last]['id']))
+        return [self.records[row] for row in page[:query.limit]], next_cursor
+
+def _snapshot_rows(repository):
+    for record in repository.all():
+        if isinstance(record, dict):
+            view_count = record.get('view_count')
+        else:
+            view_count = getattr(record, 'view_count', 0)
+        yield repository.serialize(record), view_count
+
+class ColumnarEngine:
+    """Answers repository.query() from a ColumnarSnapshot, rebuilt per catalog version.
+
+    Stands in for the repository in video_query.query_videos(). Its rows
+    are already public records, so serialize() returns them unchanged.
+    """
+
+    def __init__(self, repository, max_age=None):
+        self.repository = repository
+        self.max_age = float(max_age or os.getenv('COLUMNAR_MAX_AGE', '30'))
+        self._snapshot = None
+        self._version = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_current(self, version):
+        if self._snapshot is None or version != self._version:
+            return False
+        # The JSON backends' version covers every write; the SQL one misses view counts
+        return hasattr(self.repository, 'store') or time.monotonic() - self._built_at < self.max_age
+
+    def snapshot(self):
+        version = self.repository.catalog_version()
+        if self._is_current(version):
+            return self._snapshot
+        with self._lock:
+            if not self._is_current(version):
+                self._snapshot = ColumnarSnapshot(_snapshot_rows(self.repository))
+                self._version = version
+                self._built_at = time.monotonic()
+                REBUILDS.inc()
+            return self._snapshot
+
+    def query(self, query):
+        return self.snapshot().query(query)
+
+    @staticmethod
+    def serialize(record):
+        return record
+
+def columnar_engine(repository):
+    """ColumnarEngine over `repository` when COLUMNAR_CATALOG=1 and NumPy is installed, else the repository"""
+    if os.getenv('COLUMNAR_CATALOG', '0') != '1':
+        return repository
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("[COLUMNAR] NumPy is not installed (pip install numpy); querying the repository directly")
+        return repository
+    return ColumnarEngine(repository)
@@ -1,10 +1,18 @@
-from flask import Flask, request, jsonify, render_template_string, redirect, url_for, flash, session, make_response
+from flask import Flask, request, jsonify, render_template_string, redirect, url_for, flash, session, make_response, abort
 from flask_sqlalchemy import SQLAlchemy
 import json
 import os
-import bcrypt
 from datetime import datetime
 from functools import wraps
+from sqlite_tuning import configure_sqlite, database_dir
+from repository import SQLVideoRepository, project
+from changes import ChangeLog, changes_since
+from video_query import VideoQuery, QueryError
+from cache_version import CatalogVersion
+from query_stats import install_query_instrumentation
+from metrics import install_metrics, timed
+from bootstrap import bootstrap_on_start
+from memory_tracking import track_memory
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-change-in-production')
@@ -12,6 +20,9 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:/
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db = SQLAlchemy(app)
+configure_sqlite(app, db)
+install_query_instrumentation(app, db)
+install_metrics(app, admin=True)
 
 # Database Models
 class User(db.Model):
@@ -20,9 +31,11 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     
     def set_password(self, password):
+        import bcrypt  # deferred: only login and account setup need it
         self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
     def check_password(self, password):
+        import bcrypt
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
 
 class Video(db.Model):
@@ -35,16 +48,20 @@ class Video(db.Model):
     description = db.Column(db.Text)
     view_count = db.Column(db.Integer, default=0)
 
-# Initialize database
-with app.app_context():
-    db.create_all()
-    # Create admin user if not exists
-    admin_user = User.query.filter_by(username='admin').first()
-    if not admin_user:
-        admin = User(username='admin')
-        admin.set_password(os.environ.get('ADMIN_PASSWORD', 'admin123'))
-        db.session.add(admin)
-        db.session.commit()
+video_repo = SQLVideoRepository(db, Video, changes=ChangeLog(
+    os.getenv('CHANGELOG_PATH', os.path.join(database_dir(app, db), 'changes.jsonl'))
+), version=CatalogVersion(
+    os.getenv('CATALOG_VERSION_PATH', os.path.join(database_dir(app, db), 'catalog.version'))
+))
+
+def get_video_or_404(video_id):
+    video = video_repo.get(video_id)
+    if video is None:
+        abort(404)
+    return video
+
+# Initialize database: a single marker read once `python bootstrap.py setup` has run
+bootstrap_on_start(app, db, User)
 
 def login_required(f):
     @wraps(f)
@@ -81,9 +98,7 @@ def dashboard():
     page = request.args.get('page', 1, type=int)
     per_page = 20
     
-    videos = Video.query.order_by(Video.date_added.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    videos = video_repo.page(page, per_page)
     
     return render_template_string(DASHBOARD_TEMPLATE, videos=videos.items, pagination=videos)
 
@@ -91,15 +106,13 @@ def dashboard():
 @login_required
 def add_video():
     if request.method == 'POST':
-        video = Video(
-            title=request.form.get('title'),
-            url=request.form.get('url'),
-            speaker=request.form.get('speaker'),
-            tags=request.form.get('tags', ''),
-            description=request.form.get('description', '')
-        )
-        db.session.add(video)
-        db.session.commit()
+        video_repo.add({
+            'title': request.form.get('title'),
+            'url': request.form.get('url'),
+            'speaker': request.form.get('speaker'),
+            'tags': request.form.get('tags', ''),
+            'description': request.form.get('description', '')
+        })
         flash('Video added successfully!')
         return redirect(url_for('dashboard'))
     
@@ -108,33 +121,55 @@ def add_video():
 @app.route('/delete_video/<int:video_id>')
 @login_required
 def delete_video(video_id):
-    video = Video.query.get_or_404(video_id)
-    db.session.delete(video)
-    db.session.commit()
+    get_video_or_404(video_id)
+    video_repo.delete(video_id)
     flash('Video deleted successfully!')
     return redirect(url_for('dashboard'))
 
+@app.route('/api/videos/changes')
+def api_video_changes():
+    """Changes since ?since=<seq>; reset=true means reload /api/videos instead"""
+    since = request.args.get('since', type=int)
+    limit = min(request.args.get('limit', 500, type=int), 5000)
+    return jsonify(changes_since(video_repo, since, limit))
+
+def _api_video(video):
+    return {
+        'id': video.id,
+        'title': video.title,
+        'url': video.url,
+        'speaker': video.speaker,
+        'tags': video.tags,
+        'description': video.description,
+        'date_added': video.date_added.isoformat() if video.date_added else None,
+        'view_count': video.view_count or 0
+    }
+
 @app.route('/api/videos')
 def api_videos():
-    videos = Video.query.all()
-    video_list = []
-    for video in videos:
-        video_list.append({
-            'id': video.id,
-            'title': video.title,
-            'url': video.url,
-            'speaker': video.speaker,
-            'tags': video.tags,
-            'description': video.description,
-            'date_added': video.date_added.isoformat() if video.date_added else None,
-            'view_count': video.view_count or 0
-        })
-    return jsonify(video_list)
+    """Every video, or one page when filter/sort/pagination parameters are given (see video_query.py)"""
+    try:
+        query = VideoQuery.from_args(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    if query is None:
+        return jsonify([_api_video(video) for video in video_repo.all()])
+
+    videos, next_cursor = video_repo.query(query)
+    video_list = [_api_video(video) for video in videos]
+    if query.fields:
+        video_list = project(video_list, query.fields)
+    response = jsonify(video_list)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 @app.route('/export_json')
 @login_required
+@timed('export_json')
+@track_memory('export_json')
 def export_json():
-    videos = Video.query.all()
+    videos = video_repo.all()
     video_list = []
     for video in videos:
         video_list.append({
@@ -156,16 +191,16 @@ def export_json():
 @app.route('/edit_video/<int:video_id>', methods=['GET', 'POST'])
 @login_required
 def edit_video(video_id):
-    video = Video.query.get_or_404(video_id)
+    video = get_video_or_404(video_id)
     
     if request.method == 'POST':
-        video.title = request.form.get('title')
-        video.url = request.form.get('url')
-        video.speaker = request.form.get('speaker')
-        video.tags = request.form.get('tags', '')
-        video.description = request.form.get('description', '')
-        
-        db.session.commit()
+        video_repo.update(video_id, {
+            'title': request.form.get('title'),
+            'url': request.form.get('url'),
+            'speaker': request.form.get('speaker'),
+            'tags': request.form.get('tags', ''),
+            'description': request.form.get('description', '')
+        })
         flash('Video updated successfully!')
         return redirect(url_for('dashboard'))
     
@@ -186,28 +221,29 @@ def bulk_import():
         
         if file and file.filename.endswith('.json'):
             try:
-                data = json.loads(file.read().decode('utf-8'))
-                imported = 0
-                skipped = 0
+                with timed('import_json'), track_memory('import_json'):
+                    data = json.loads(file.read().decode('utf-8'))
+                    skipped = 0
+                    new_videos = []
                 
-                for item in data:
-                    # Check if video already exists
-                    existing = Video.query.filter_by(url=item.get('url')).first()
-                    if existing:
-                        skipped += 1
-                        continue
+                    # Check which videos already exist in one batched lookup
+                    seen = video_repo.existing_urls(item.get('url', '') for item in data)
+                    for item in data:
+                        if item.get('url', '') in seen:
+                            skipped += 1
+                            continue
+                        seen.add(item.get('url', ''))
                     
-                    video = Video(
-                        title=item.get('title', ''),
-                        url=item.get('url', ''),
-                        speaker=item.get('speaker', ''),
-                        tags=item.get('tags', ''),
-                        description=item.get('description', '')
-                    )
-                    db.session.add(video)
-                    imported += 1
+                        new_videos.append({
+                            'title': item.get('title', ''),
+                            'url': item.get('url', ''),
+                            'speaker': item.get('speaker', ''),
+                            'tags': item.get('tags', ''),
+                            'description': item.get('description', '')
+                        })
                 
-                db.session.commit()
+                    video_repo.put_many(new_videos)
+                imported = len(new_videos)
                 flash(f'Successfully imported {imported} videos, skipped {skipped} duplicates')
                 
             except Exception as e:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Append-only catalog storage: a JSON snapshot plus a JSONL change log.
+
+Mutations append one line per changed record; readers replay the log over the
+snapshot; compaction folds the log into a new snapshot once it grows past a
+size threshold. Publishing public_archive/videos.json is a separate step:
+
+    python journal_store.py compact
+    python journal_store.py publish
+"""
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+from catalog import VideoCatalog
+from json_store import JsonStore, FileLock, DEFAULT_VIDEOS_PATH
+
+DEFAULT_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'instance'))
+
+class _ReplayState:
+    """Catalog as of a given byte offset into a given journal file"""
+
+    def __init__(self, catalog, seq, snapshot_stamp, journal_inode, offset):
+        self.catalog = catalog
+        self.seq = seq
+        self.snapshot_stamp = snapshot_stamp
+        self.journal_inode = journal_inode
+        self.offset = offset
+        self.videos = None  # list form, built on first load()
+
+class JournalStore:
+    """Video catalog persisted as snapshot + append-only journal"""
+
+    def __init__(self, data_dir=None, seed_path=DEFAULT_VIDEOS_PATH, compact_bytes=None):
+        data_dir = data_dir or os.getenv('VIDEO_STORE_DIR', DEFAULT_DATA_DIR)
+        os.makedirs(data_dir, exist_ok=True)
+        self.snapshot = JsonStore(os.path.join(data_dir, 'videos.snapshot.json'), default=dict, indent=None)
+        self.journal_path = os.path.join(data_dir, 'videos.journal.jsonl')
+        self.seed_path = seed_path
+        self.compact_bytes = compact_bytes or int(os.getenv('JOURNAL_COMPACT_BYTES', 1024 * 1024))
+        self.lock = FileLock(self.journal_path)
+        self._state = None
+        self._state_lock = threading.Lock()
+
+    # Reading
+
+    def catalog(self):
+        """Shared, read-only catalog with every journal entry applied"""
+        return self._refresh().catalog
+
+    def load(self):
+        state = self._refresh()
+        if state.videos is None:
+            state.videos = state.catalog.to_list()
+        return state.videos
+
+    @property
+    def seq(self):
+        """Sequence number of the last applied change"""
+        return self._refresh().seq
+
+    def _refresh(self):
+        # Seeding takes the journal lock; writers hold that lock when they get here, so
+        # it must never be taken while holding _state_lock (lock order: journal, then state)
+        if self.snapshot._stamp() is None:
+            self._seed_snapshot()
+        with self._state_lock:
+            try:
+                st = os.stat(self.journal_path)
+                inode, size = st.st_ino, st.st_size
+            except FileNotFoundError:
+                inode, size = None, 0
+
+            state = self._state
+            snapshot_stamp = self.snapshot._stamp()
+            if (state is None or state.snapshot_stamp != snapshot_stamp
+                    or state.journal_inode != inode or size < state.offset):
+                state = self._load_snapshot(inode)
+            if size > state.offset:
+                state = self._replay(state, size)
+            self._state = state
+            return state
+
+    def _load_snapshot(self, inode):
+        snapshot = self.snapshot.load()
+        catalog = VideoCatalog(snapshot.get('videos', []))
+        return _ReplayState(catalog, snapshot.get('seq', 0), self.snapshot._stamp(), inode, 0)
+
+    def _seed_snapshot(self):
+        """Start from the published videos.json the first time the store is used"""
+        with self.lock:
+            if self.snapshot._stamp() is None:
+                videos = JsonStore(self.seed_path).load()
+                self.snapshot.save({'seq': 0, 'videos': videos})
+                print(f"[JOURNAL] Seeded snapshot with {len(videos)} videos")
+
+    def _replay(self, state, size):
+        with open(self.journal_path, 'rb') as f:
+            f.seek(state.offset)
+            chunk = f.read(size - state.offset)
+
+        # A writer may be mid-append; only apply complete lines
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return state
+
+        # Copy-on-write so readers holding the previous catalog are unaffected.
+        # Replaying an entry that is already in the snapshot is harmless because
+        # every entry carries the full record (or a delete), so a reader that
+        # races a compaction converges to the same state.
+        catalog = state.catalog.copy()
+        seq = state.seq
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            self._apply(catalog, entry)
+            seq = max(seq, entry.get('seq', seq))
+        return _ReplayState(catalog, seq, state.snapshot_stamp, state.journal_inode, state.offset + end)
+
+    @staticmethod
+    def _apply(catalog, entry):
+        if entry['op'] == 'put':
+            video = entry['video']
+            if video['id'] in catalog:
+                catalog.update(video['id'], video)
+            else:
+                catalog.add(video)
+        elif entry['op'] == 'delete':
+            catalog.remove(entry['id'])
+
+    # Writing
+
+    @contextmanager
+    def edit(self):
+        """Yield a private catalog copy under the journal lock; append its changes on exit"""
+        with self.lock:
+            state = self._refresh()
+            catalog = state.catalog.copy()
+            catalog.changes = []
+            yield catalog
+
+            changes, catalog.changes = catalog.changes, None
+            if not changes:
+                return
+
+            seq = state.seq
+            lines = []
+            for op, value in changes:
+                seq += 1
+                if op == 'put':
+                    lines.append(json.dumps({'seq': seq, 'op': 'put', 'video': value}))
+                else:
+                    lines.append(json.dumps({'seq': seq, 'op': 'delete', 'id': value}))
+            payload = ('\n'.join(lines) + '\n').encode('utf-8')
+
+            with open(self.journal_path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                inode, size = os.fstat(f.fileno()).st_ino, f.tell()
+
+            with self._state_lock:
+                if state.journal_inode == inode and state.offset + len(payload) == size:
+                    self._state = _ReplayState(catalog, seq, state.snapshot_stamp, inode, size)
+                else:
+                    self._state = None  # journal was just created; replay it on next read
+
+            if size >= self.compact_bytes:
+                self.compact()
+
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal"""
+        with self.lock:
+            state = self._refresh()
+            if state.offset == 0:
+                return False
+            self.snapshot.save({'seq': state.seq, 'videos': state.catalog.to_list()})
+            JsonStore(self.journal_path).save_text('')
+            print(f"[JOURNAL] Compacted {state.offset} bytes into snapshot at seq {state.seq}")
+            return True
+
+    def publish(self, path=DEFAULT_VIDEOS_PATH):
+        """Write the current catalog as the public videos.json"""
+        from changes import ChangeLog, DEFAULT_CHANGES_LOG
+        from publish import publish_catalog
+        from repository import FileVideoRepository
+        pointer = publish_catalog(FileVideoRepository(self, ChangeLog(DEFAULT_CHANGES_LOG)), path)
+        count = len(self.load())
+        print(f"[JOURNAL] Published {count} videos to {path} ({pointer['videos']})")
+        return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['compact', 'publish'])
+    parser.add_argument('--output', default=DEFAULT_VIDEOS_PATH, help='publish target (default: public_archive/videos.json)')
+    args = parser.parse_args()
+
+    store = JournalStore()
+    if args.command == 'compact':
+        store.compact()
+    else:
+        store.publish(args.output)
+
+if __name__ == '__main__':
+    main()
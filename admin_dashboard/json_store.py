@@ -0,0 +1,199 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_VIDEOS_PATH = os.path.abspath(os.getenv(
+    'VIDEOS_JSON_PATH',
+    os.path.join(os.path.dirname(__file__), '..', 'public_archive', 'videos.json')
+))
+
+class FileLock:
+    """Exclusive lock shared by threads and processes, backed by a sidecar .lock file"""
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __new__(cls, path):
+        # One instance per lock file so threads in this process queue on the same RLock
+        lock_path = os.path.abspath(path) + '.lock'
+        with cls._registry_lock:
+            instance = cls._registry.get(lock_path)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.lock_path = lock_path
+                instance._thread_lock = threading.RLock()
+                instance._fd = None
+                instance._depth = 0
+                cls._registry[lock_path] = instance
+            return instance
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd(fd)
+            except Exception:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                self._unlock_fd(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def _lock_fd(self, fd):
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 seconds; keep waiting
+
+    def _unlock_fd(self, fd):
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+class JsonStore:
+    """JSON document on disk with atomic, lock-protected writes and a parse cache"""
+
+    # path -> (stamp, parsed data, derived views); shared by every store in the process
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, path=DEFAULT_VIDEOS_PATH, default=list, indent=2):
+        self.path = os.path.abspath(path)
+        self.default = default
+        self.indent = indent
+        self.lock = FileLock(self.path)
+
+    def _stamp(self):
+        """Identify the file's current contents without reading them"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # os.replace gives every write a new inode, so this also catches
+        # two same-size writes landing within the mtime granularity
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return self.default()
+
+    def load(self):
+        """Return the parsed document, re-reading only when the file has changed.
+
+        The returned object is shared with other readers and must not be
+        mutated; use transaction() to modify the document.
+        """
+        return self._entry()[1]
+
+    def derived(self, builder):
+        """Return builder(data), built once per version of the file and shared like load()"""
+        entry = self._entry()
+        views = entry[2]
+        view = views.get(builder)
+        if view is None:
+            view = views.setdefault(builder, builder(entry[1]))
+        return view
+
+    def _entry(self):
+        stamp = self._stamp()
+        cached = self._cache.get(self.path)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            return cached
+
+        entry = (stamp, self._read(), {})
+        if stamp is not None:
+            with self._cache_lock:
+                self._cache[self.path] = entry
+        return entry
+
+    def save(self, data, derived=None):
+        """Atomically replace the document, optionally seeding the derived-view cache"""
+        with self.lock:
+            self._write(json.dumps(data, indent=self.indent), data, derived)
+
+    def save_text(self, text):
+        """Atomically replace the document with already-serialized JSON"""
+        with self.lock:
+            self._write(text, None)
+
+    @contextmanager
+    def transaction(self):
+        """Lock the file, yield a fresh private copy of the document and write it back"""
+        with self.lock:
+            data = self._read()
+            yield data
+            self._write(json.dumps(data, indent=self.indent), data)
+
+    def _write(self, text, data, derived=None):
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600 files; keep the published file world-readable
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._fsync_directory(directory)
+
+        with self._cache_lock:
+            stamp = self._stamp()
+            if data is not None and stamp is not None:
+                self._cache[self.path] = (stamp, data, dict(derived or {}))
+            else:
+                self._cache.pop(self.path, None)
+
+    @staticmethod
+    def _fsync_directory(directory):
+        """Persist the rename itself (not supported on Windows)"""
+        if not fcntl:
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+video_store = JsonStore()
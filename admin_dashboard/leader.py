@@ -0,0 +1,188 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import weakref
+from datetime import datetime
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from metrics import registry
+
+IS_LEADER = registry.gauge(
+    'gentube_scheduler_is_leader', 'Whether this process currently runs the scheduled jobs'
+)
+
+DEFAULT_LOCK_PATH = os.getenv('SCHEDULER_LOCK_PATH', os.path.join('instance', 'scheduler.lock'))
+
+# Every election in this process, reset in forked children (e.g. gunicorn --preload workers)
+_elections = weakref.WeakSet()
+
+def _after_fork_in_child():
+    for election in list(_elections):
+        election._after_fork()
+
+if hasattr(os, 'register_at_fork'):  # POSIX only
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+class LeaderElection:
+    """Elect one process per host to run scheduled jobs.
+
+    Every process that starts a scheduler also starts an election. Each
+    election tries a non-blocking exclusive lock on `lock_path` every
+    `interval` seconds. The holder is the leader and writes a heartbeat
+    (pid, host, timestamps) next to the lock. The OS drops the lock when
+    the leader dies, so a follower takes over on its next attempt. A
+    leader that fails `max_failures` heartbeats in a row gives up the lock.
+
+    A forked child never inherits leadership: it drops its copy of the lock
+    and the election thread, and `start()` joins the election again from
+    the child.
+    """
+
+    def __init__(self, lock_path=None, interval=None, name='scheduler', max_failures=None):
+        self.lock_path = os.path.abspath(lock_path or DEFAULT_LOCK_PATH)
+        self.heartbeat_path = self.lock_path + '.heartbeat'
+        self.interval = float(interval if interval is not None else os.getenv('SCHEDULER_HEARTBEAT_SECONDS', '10'))
+        self.name = name
+        self.max_failures = int(max_failures or os.getenv('SCHEDULER_HEARTBEAT_FAILURES', '3'))
+        self.is_leader = False
+        self.leader_since = None
+        self._fd = None
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+        _elections.add(self)
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        self._try_acquire()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-election", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        self._release()
+
+    def _after_fork(self):
+        """Forget the parent's election; closing (not unlocking) our copy leaves the parent's lock alone"""
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self.is_leader = False
+        self.leader_since = None
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+        IS_LEADER.set(0)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if self.is_leader:
+                    self._write_heartbeat()
+                else:
+                    self._try_acquire()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                print(f"[LEADER] {self.name} election error ({self._failures}/{self.max_failures}): {e}")
+                if self.is_leader and self._failures >= self.max_failures:
+                    # A leader that cannot write its heartbeat looks dead to everyone else
+                    print(f"[LEADER] Process {os.getpid()} gives up the {self.name} leadership")
+                    self._release()
+
+    def _try_acquire(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self.is_leader = True
+        self.leader_since = datetime.now().isoformat()
+        IS_LEADER.set(1)
+        self._write_heartbeat()
+        print(f"[LEADER] Process {os.getpid()} is now the {self.name} leader")
+        return True
+
+    def _release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        self.is_leader = False
+        IS_LEADER.set(0)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def _write_heartbeat(self):
+        beat = {
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'leader_since': self.leader_since,
+            'heartbeat': datetime.now().isoformat(),
+            'heartbeat_ts': time.time(),
+            'interval': self.interval,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.heartbeat_path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(beat, f)
+        os.replace(tmp_path, self.heartbeat_path)
+
+    def status(self):
+        """Last heartbeat plus whether it is fresh (within three intervals)"""
+        try:
+            with open(self.heartbeat_path) as f:
+                beat = json.load(f)
+        except (OSError, ValueError):
+            return {'leader': None, 'this_process': self.is_leader}
+        age = time.time() - beat.get('heartbeat_ts', 0)
+        return {
+            'leader': beat,
+            'age_seconds': round(age, 1),
+            'fresh': age <= 3 * beat.get('interval', self.interval),
+            'this_process': self.is_leader,
+        }
+
+    def only_leader(self, func):
+        """Wrap a scheduled job so it runs only in the current leader"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.is_leader:
+                return None
+            return func(*args, **kwargs)
+        return wrapper
+
+_default_election = None
+_default_lock = threading.Lock()
+
+def scheduler_election():
+    """Process-wide election shared by every scheduled job, (re)started in the calling process"""
+    global _default_election
+    with _default_lock:
+        if _default_election is None:
+            _default_election = LeaderElection()
+        return _default_election.start()
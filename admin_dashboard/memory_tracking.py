@@ -0,0 +1,118 @@
+import os
+import threading
+import tracemalloc
+from contextlib import ContextDecorator
+
+from metrics import registry
+
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (1, 4, 16, 64, 128, 256, 512, 1024, 2048, 4096))
+
+PEAK_MEMORY = registry.histogram(
+    'gentube_operation_peak_memory_bytes', 'Peak traced Python memory during heavy operations',
+    ['operation'], buckets=MEMORY_BUCKETS
+)
+
+class MemoryTracker:
+    """Runtime-toggleable tracemalloc around heavy operations.
+
+    Tracing only runs while a tracked operation is in progress, so the
+    cost is paid by export/import/restore calls and only while enabled.
+    Peaks are approximate when tracked operations overlap, because
+    tracemalloc keeps one process-wide peak.
+    """
+
+    def __init__(self, enabled=None, top_n=None):
+        if enabled is None:
+            enabled = os.getenv('MEMORY_TRACKING', '').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.top_n = int(top_n if top_n is not None else os.getenv('MEMORY_TRACKING_TOP', '10'))
+        self.lock = threading.Lock()
+        self.active = 0
+        self.last = {}  # operation -> last MemoryUsage
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+        print(f"[MEMORY] Tracking {'enabled' if self.enabled else 'disabled'}")
+
+    def _start(self):
+        with self.lock:
+            if self.active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(int(os.getenv('MEMORY_TRACKING_FRAMES', '1')))
+                self.owns_tracing = True
+            elif self.active == 0:
+                self.owns_tracing = False  # someone else (e.g. -X tracemalloc) started it
+            self.active += 1
+            tracemalloc.reset_peak()
+            return tracemalloc.get_traced_memory()[0], tracemalloc.take_snapshot()
+
+    def _stop(self, usage, baseline, before):
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        with self.lock:
+            self.active -= 1
+            if self.active == 0 and self.owns_tracing:
+                tracemalloc.stop()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        usage.peak_bytes = max(peak - baseline, 0)
+        usage.retained_bytes = current - baseline
+        usage.top = [
+            (str(stat.traceback[0]), stat.size_diff, stat.count_diff)
+            for stat in stats[:self.top_n] if stat.size_diff > 0
+        ]
+        self.last[usage.operation] = usage
+        PEAK_MEMORY.observe(usage.peak_bytes, operation=usage.operation)
+        print(f"[MEMORY] {usage.operation}: peak {usage.peak_bytes / 1048576:.1f} MB, "
+              f"retained {usage.retained_bytes / 1048576:+.1f} MB")
+        for site, size, count in usage.top[:5]:
+            print(f"[MEMORY]   {size / 1048576:8.2f} MB {count:>8} blocks  {site}")
+
+    def track(self, operation):
+        return _Tracked(self, operation)
+
+class MemoryUsage:
+    def __init__(self, operation):
+        self.operation = operation
+        self.peak_bytes = None
+        self.retained_bytes = None
+        self.top = []
+
+    def describe(self):
+        """Suffix for an operation's own log line; empty when nothing was measured"""
+        if self.peak_bytes is None:
+            return ''
+        return f" (peak {self.peak_bytes / 1048576:.1f} MB)"
+
+    def to_dict(self):
+        return {
+            'operation': self.operation,
+            'peak_bytes': self.peak_bytes,
+            'retained_bytes': self.retained_bytes,
+            'top': [{'site': site, 'size_bytes': size, 'blocks': count} for site, size, count in self.top],
+        }
+
+class _Tracked(ContextDecorator):
+    def __init__(self, tracker, operation):
+        self.tracker = tracker
+        self.operation = operation
+        self._local = threading.local()
+
+    def __enter__(self):
+        usage = MemoryUsage(self.operation)
+        state = None
+        if self.tracker.enabled:
+            state = self.tracker._start()
+        self._local.__dict__.setdefault('stack', []).append((usage, state))
+        return usage
+
+    def __exit__(self, exc_type, exc, tb):
+        usage, state = self._local.stack.pop()
+        if state is not None:
+            self.tracker._stop(usage, *state)
+        return False
+
+memory_tracker = MemoryTracker()
+
+def track_memory(operation):
+    """`with track_memory('restore') as usage:` or `@track_memory('export_json')`"""
+    return memory_tracker.track(operation)
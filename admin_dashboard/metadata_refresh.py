@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Periodic stale-while-revalidate refresh of video metadata.
+
+Metadata is extracted once when a video is added, so view counts, like
+counts and thumbnails drift. This job ranks videos by how stale their
+metadata is and how popular they are. Each run refreshes the top of that
+list in small batches, at a limited request rate, and stops at a time
+budget. A failed refresh keeps the last known metadata. It only records
+the attempt, so readers and the public export never lose data.
+
+    python metadata_refresh.py --limit 50 --budget 60     # one manual run against DATABASE_URL
+"""
+import argparse
+import atexit
+import heapq
+import math
+import os
+import time
+from datetime import datetime
+
+from metrics import registry, timed
+
+REFRESHED = registry.counter(
+    'gentube_metadata_refresh_total', 'Metadata refresh attempts by outcome', ['outcome']
+)
+
+class MetadataRefresher:
+    def __init__(self, repository, model, extractor=None, batch_size=None, rate_per_minute=None,
+                 time_budget=None, min_age_hours=None, retry_after_hours=None):
+        self.repository = repository
+        self.model = model
+        self.extractor = extractor
+        self.batch_size = int(batch_size or os.getenv('METADATA_REFRESH_BATCH', '20'))
+        self.rate_per_minute = float(rate_per_minute or os.getenv('METADATA_REFRESH_RATE_PER_MINUTE', '30'))
+        self.time_budget = float(time_budget or os.getenv('METADATA_REFRESH_BUDGET_SECONDS', '120'))
+        self.min_age_hours = float(min_age_hours or os.getenv('METADATA_REFRESH_MIN_AGE_HOURS', '24'))
+        self.retry_after_hours = float(retry_after_hours or os.getenv('METADATA_REFRESH_RETRY_HOURS', '6'))
+        self.scheduler = None
+
+    def _extractor(self):
+        if self.extractor is None:
+            from video_metadata import VideoMetadataExtractor
+            self.extractor = VideoMetadataExtractor()
+        return self.extractor
+
+    @staticmethod
+    def _age_hours(timestamp, now):
+        if not timestamp:
+            return None
+        try:
+            return (now - datetime.fromisoformat(timestamp)).total_seconds() / 3600
+        except ValueError:
+            return None
+
+    def candidates(self, limit, now=None):
+        """Ids worth refreshing, highest priority first.
+
+        Priority is staleness in hours weighted by log-scaled views, so a
+        popular video is refreshed sooner than an unwatched one of the same
+        age. Videos without metadata count as maximally stale. Videos whose
+        last attempt failed wait `retry_after_hours` before a retry.
+        """
+        now = now or datetime.now()
+        model = self.model
+        # Pull only the two timestamps out of the JSON column, not the whole document
+        rows = self.repository.db.session.query(
+            model.id,
+            model.view_count,
+            model.video_metadata['extracted_at'].as_string(),
+            model.video_metadata['refresh_attempted_at'].as_string(),
+        )
+
+        ranked = []
+        for video_id, views, extracted_at, attempted_at in rows:
+            attempted_age = self._age_hours(attempted_at, now)
+            if attempted_age is not None and attempted_age < self.retry_after_hours:
+                continue
+            age = self._age_hours(extracted_at, now)
+            if age is None:
+                age = 24 * 365  # never extracted
+            elif age < self.min_age_hours:
+                continue
+            ranked.append((age * (1 + math.log1p(views or 0)), video_id))
+        return [video_id for _, video_id in heapq.nlargest(limit, ranked)]
+
+    def _refreshed_metadata(self, video, now):
+        old = dict(video.video_metadata or {})
+        new = self._extractor().extract(video.url)
+        if new and 'error' not in new:
+            REFRESHED.inc(outcome='refreshed')
+            return new
+        # Stale-while-revalidate: keep serving what we had and note the failed attempt
+        REFRESHED.inc(outcome='failed')
+        old['refresh_attempted_at'] = now.isoformat()
+        old['refresh_error'] = (new or {}).get('error', 'no metadata returned')
+        return old
+
+    @timed('metadata_refresh')
+    def run(self, limit=None):
+        """Refresh one prioritized round; returns counts for logging"""
+        started = time.monotonic()
+        interval = 60.0 / self.rate_per_minute if self.rate_per_minute > 0 else 0
+        limit = limit or max(int(self.time_budget / interval) if interval else self.batch_size, 1)
+        queue = self.candidates(limit)
+        results = {'candidates': len(queue), 'refreshed': 0, 'failed': 0, 'out_of_budget': 0}
+
+        next_call = started
+        while queue:
+            batch, queue = queue[:self.batch_size], queue[self.batch_size:]
+            updates = []
+            found = self.repository.get_many(batch)
+            for video in (found[video_id] for video_id in batch if video_id in found):
+                if time.monotonic() + interval - started > self.time_budget:
+                    break
+                time.sleep(max(next_call - time.monotonic(), 0))
+                next_call = time.monotonic() + interval
+                metadata = self._refreshed_metadata(video, datetime.now())
+                results['refreshed' if 'refresh_error' not in metadata else 'failed'] += 1
+                updates.append({'id': video.id, 'video_metadata': metadata})
+            if updates:
+                self.repository.put_many(updates)
+            if time.monotonic() + interval - started > self.time_budget:
+                results['out_of_budget'] = len(queue) + len(batch) - len(updates)
+                break
+
+        print(f"[METADATA] Refreshed {results['refreshed']}, failed {results['failed']}, "
+              f"deferred {results['out_of_budget']} of {results['candidates']} candidates "
+              f"in {time.monotonic() - started:.1f}s")
+        return results
+
+    def start_scheduled_refresh(self, app, interval_minutes=60, election=None):
+        """Run a refresh round every interval in the elected scheduler leader"""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from leader import scheduler_election
+        election = election or scheduler_election()
+
+        def job():
+            with app.app_context():
+                self.run()
+
+        if self.scheduler is None:
+            self.scheduler = BackgroundScheduler()
+        self.scheduler.add_job(
+            func=election.only_leader(job),
+            trigger='interval',
+            minutes=interval_minutes,
+            id='metadata_refresh_job',
+            max_instances=1,
+            coalesce=True,
+        )
+        self.scheduler.start()
+        atexit.register(lambda: self.scheduler.shutdown())
+        print(f"[METADATA] Scheduled refresh every {interval_minutes} minutes")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--limit', type=int, help='maximum videos to refresh this run')
+    parser.add_argument('--budget', type=float, help='time budget in seconds')
+    parser.add_argument('--rate', type=float, help='extractions per minute')
+    args = parser.parse_args()
+
+    from app import app, video_repo, Video
+    refresher = MetadataRefresher(video_repo, Video, rate_per_minute=args.rate, time_budget=args.budget)
+    with app.app_context():
+        refresher.run(limit=args.limit)
+
+if __name__ == '__main__':
+    main()
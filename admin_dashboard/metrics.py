@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+
+# Seconds; spans a fast JSON read up to a full-catalog export or backup
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key, state):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'gentube_http_request_duration_seconds', 'Request latency by endpoint', ['endpoint', 'method']
+)
+REQUESTS = registry.counter(
+    'gentube_http_requests_total', 'Requests by endpoint and status code', ['endpoint', 'method', 'status']
+)
+RESPONSE_SIZE = registry.histogram(
+    'gentube_http_response_size_bytes', 'Response body size by endpoint', ['endpoint'], buckets=SIZE_BUCKETS
+)
+IN_FLIGHT = registry.gauge(
+    'gentube_http_requests_in_flight', 'Requests currently being handled'
+)
+OPERATION_LATENCY = registry.histogram(
+    'gentube_operation_duration_seconds', 'Duration of exports, backups and metadata extraction', ['operation']
+)
+OPERATION_FAILURES = registry.counter(
+    'gentube_operation_failures_total', 'Operations that raised', ['operation']
+)
+
+class timed(ContextDecorator):
+    """Time a block or function into gentube_operation_duration_seconds.
+
+    Usable as `with timed('backup'):` or `@timed('export_json')`.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        # One decorator instance is shared by every call, so start times are kept per thread
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.__dict__.setdefault('starts', []).append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        started = self._local.starts.pop()
+        OPERATION_LATENCY.observe(time.perf_counter() - started, operation=self.operation)
+        if exc_type is not None:
+            OPERATION_FAILURES.inc(operation=self.operation)
+        return False
+
+def _endpoint_label():
+    from flask import request
+    # The URL rule keeps label cardinality bounded (no raw ids or 404 paths)
+    return request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+def install_metrics(app, path='/metrics', admin=False):
+    """Instrument every request of a Flask app and serve the registry on `path`.
+
+    Set METRICS_TOKEN to require `Authorization: Bearer <token>` on the endpoint.
+    Admin apps (`admin=True`) never serve it openly: without a token it
+    takes a logged-in admin session.
+    """
+    from flask import Response, g, request, abort, session
+
+    def start_timer():
+        g._metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    def record_response(response):
+        g._metrics_status = response.status_code
+        size = response.calculate_content_length()
+        if size is not None:
+            RESPONSE_SIZE.observe(size, endpoint=_endpoint_label())
+        return response
+
+    def finish_timer(exc):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        IN_FLIGHT.dec()
+        endpoint = _endpoint_label()
+        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        status = g.pop('_metrics_status', 500)
+        REQUESTS.inc(endpoint=endpoint, method=request.method, status=status)
+
+    # Run ahead of other before_request hooks (rate limiting, auth) so rejected requests are counted too
+    app.before_request_funcs.setdefault(None, []).insert(0, start_timer)
+    app.after_request(record_response)
+    app.teardown_request(finish_timer)
+
+    def metrics():
+        token = os.getenv('METRICS_TOKEN')
+        if token:
+            if request.headers.get('Authorization') != f"Bearer {token}":
+                abort(401)
+        elif admin and 'user_id' not in session:
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule(path, 'metrics', metrics)
+    return metrics
@@ -0,0 +1,131 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+
+_CAPTURE_NAME = re.compile(r'^profile_\d{8}_\d{6}_\d{6}_[A-Za-z0-9_.-]+\.pstats$')
+
+# Python 3.12+ allows one active cProfile per process; a request that finds it taken runs unprofiled
+_PROFILING = threading.Lock()
+
+class RequestProfiler:
+    """Opt-in cProfile capture of single admin requests.
+
+    Nothing is hooked into the app unless PROFILING_ENABLED is set, so
+    normal requests pay nothing. When it is on, an admin request that sends
+    `X-Profile: 1` or `?profile=1` is profiled and saved as a .pstats file
+    in PROFILE_DIR (default ./profiles). The newest PROFILE_KEEP (default
+    50) captures are kept.
+    """
+
+    def __init__(self, capture_dir=None, enabled=None, keep=None):
+        self.capture_dir = capture_dir or os.getenv('PROFILE_DIR', 'profiles')
+        if enabled is None:
+            enabled = os.getenv('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self.keep = int(keep if keep is not None else os.getenv('PROFILE_KEEP', '50'))
+
+    def install(self, app, is_admin):
+        """Hook profiling into `app`; `is_admin()` decides who may request a capture"""
+        if not self.enabled:
+            return False
+
+        from flask import g, request
+
+        def start_profile():
+            if request.headers.get('X-Profile') != '1' and request.args.get('profile') != '1':
+                return
+            if not is_admin():
+                return
+            if not _PROFILING.acquire(blocking=False):
+                return
+            g._profiling_lock = _PROFILING
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Some other profiler (a debugger, a tool) is active; serve the request as is
+                return
+            g._profiler = profiler
+            g._profile_started = time.perf_counter()
+
+        def stop_profile(response):
+            profiler = g.pop('_profiler', None)
+            if profiler is None:
+                return response
+            profiler.disable()
+            elapsed = time.perf_counter() - g.pop('_profile_started')
+            name = self.save(profiler, request.method, request.endpoint or 'unmatched', elapsed)
+            response.headers['X-Profile-Capture'] = name
+            return response
+
+        def release_profile(exc):
+            # Runs even when the view raised and after_request was skipped
+            profiler = g.pop('_profiler', None)
+            if profiler is not None:
+                profiler.disable()
+            lock = g.pop('_profiling_lock', None)
+            if lock is not None:
+                lock.release()
+
+        app.before_request(start_profile)
+        app.after_request(stop_profile)
+        app.teardown_request(release_profile)
+        print(f"[PROFILE] Per-request profiling enabled, captures in {self.capture_dir}")
+        return True
+
+    def save(self, profiler, method, endpoint, elapsed):
+        os.makedirs(self.capture_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        slug = re.sub(r'[^A-Za-z0-9_.-]', '_', endpoint)
+        name = f"profile_{stamp}_{method}_{slug}_{int(elapsed * 1000)}ms.pstats"
+        profiler.dump_stats(os.path.join(self.capture_dir, name))
+        self.cleanup_old_captures()
+        return name
+
+    def cleanup_old_captures(self):
+        for name in self.list_captures()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.capture_dir, name))
+            except OSError:
+                pass
+
+    def list_captures(self):
+        """Capture file names, newest first"""
+        try:
+            names = [f for f in os.listdir(self.capture_dir) if _CAPTURE_NAME.match(f)]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+
+    def describe(self, name):
+        """Parse a capture name into the fields shown on the admin page"""
+        parts = name[len('profile_'):-len('.pstats')].split('_')
+        return {
+            'name': name,
+            'captured_at': datetime.strptime('_'.join(parts[:3]), '%Y%m%d_%H%M%S_%f'),
+            'method': parts[3],
+            'endpoint': '_'.join(parts[4:-1]),
+            'duration_ms': int(parts[-1].rstrip('ms')),
+        }
+
+    def path(self, name):
+        """Absolute path of an existing capture, or None for unknown or unsafe names"""
+        if not _CAPTURE_NAME.match(name):
+            return None
+        path = os.path.abspath(os.path.join(self.capture_dir, name))
+        return path if os.path.exists(path) else None
+
+    def summary(self, name, sort='cumulative', limit=60):
+        """Top functions of a capture as pstats text"""
+        path = self.path(name)
+        if path is None:
+            return None
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
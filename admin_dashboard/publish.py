@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+
+from binary_catalog import DEFAULT_BINARY_PATH, write_binary_catalog
+from changes import publish_changes
+from json_store import FileLock, JsonStore, DEFAULT_VIDEOS_PATH
+
+ARTIFACT_PREFIX = 'videos.'
+POINTER_NAME = 'catalog.json'
+# The page source; publishing renders it into index.html, committed along with videos.json
+INDEX_TEMPLATE_NAME = 'index.template.html'
+INDEX_NAME = 'index.html'
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# index.template.html regions filled in on every publish
+_PRERENDER = re.compile(r'(<!-- prerender:start -->).*?(<!-- prerender:end -->)', re.S)
+_PRERENDER_DATA = re.compile(r'(<!-- prerender-data:start -->).*?(<!-- prerender-data:end -->)', re.S)
+
+def _artifact_name(text):
+    return f"{ARTIFACT_PREFIX}{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}.json"
+
+def _is_artifact(name):
+    stem = name[len(ARTIFACT_PREFIX):-len('.json')]
+    return name.startswith(ARTIFACT_PREFIX) and name.endswith('.json') and len(stem) == 16 and all(
+        c in '0123456789abcdef' for c in stem
+    )
+
+def prune_artifacts(directory, keep=None):
+    """Delete all but the `keep` newest content-hashed catalogs.
+
+    A few old versions stay, so a client that read the previous pointer
+    just before a publish can still download the catalog it names.
+    """
+    keep = int(keep or os.getenv('CATALOG_ARTIFACTS_KEEP', '3'))
+    artifacts = sorted(
+        (name for name in os.listdir(directory) if _is_artifact(name)),
+        key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+        reverse=True,
+    )
+    for name in artifacts[keep:]:
+        os.remove(os.path.join(directory, name))
+        if os.path.exists(os.path.join(directory, name + '.lock')):
+            os.remove(os.path.join(directory, name + '.lock'))
+    return artifacts[keep:]
+
+def _newest_first(videos):
+    return sorted(videos, key=lambda video: video.get('date_added') or '', reverse=True)
+
+def _facets(videos, limit):
+    """Most common speakers, platforms and tags, as the public app's filters list them"""
+    speakers, platforms, tags = Counter(), Counter(), Counter()
+    for video in videos:
+        speakers.update(video.get('speakers') or ([video['speaker']] if video.get('speaker') else []))
+        platforms.update([video['platform']] if video.get('platform') else [])
+        tags.update(tag for tag in video.get('tags') or [] if tag)
+    return [
+        (label, sorted(value for value, _ in counter.most_common(limit)))
+        for label, counter in (('Speakers', speakers), ('Platforms', platforms), ('Tags', tags))
+    ]
+
+def prerender_index(videos, template_path, index_path, count=None):
+    """Render index.html from the page template, with the newest videos and the facet lists baked in.
+
+    The cards go between the prerender markers inside #app, so they show
+    before Vue loads and disappear once it has videos. The same records go
+    between the prerender-data markers as JSON, and the app starts from
+    those instead of an empty list. The template itself is never written.
+    Returns False, after copying the template as is, when the markers are
+    missing.
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    with open(template_path, encoding='utf-8') as f:
+        html = f.read()
+    if not _PRERENDER.search(html) or not _PRERENDER_DATA.search(html):
+        JsonStore(index_path).save_text(html)
+        return False
+
+    count = int(count or os.getenv('PRERENDER_VIDEOS', '12'))
+    newest = _newest_first(videos)[:count]
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True,
+                      trim_blocks=True, lstrip_blocks=True)
+    cards = env.get_template('public_first_page.html').render(
+        videos=newest, total=len(videos), facets=_facets(videos, int(os.getenv('PRERENDER_FACETS', '20')))
+    )
+    # Escape '<' so no title can close the script element
+    data = json.dumps(newest, separators=(',', ':')).replace('<', '\\u003c')
+    script = f'<script id="prerendered-videos" type="application/json">{data}</script>'
+
+    html = _PRERENDER.sub(lambda m: f"{m.group(1)}\n{cards}\n{m.group(2)}", html, count=1)
+    html = _PRERENDER_DATA.sub(lambda m: f"{m.group(1)}\n    {script}\n    {m.group(2)}", html, count=1)
+    JsonStore(index_path).save_text(html)
+    return True
+
+def render_index(directory, videos, count=None):
+    """Render `directory`/index.html from its template; False when there is no template"""
+    template_path = os.path.join(directory, INDEX_TEMPLATE_NAME)
+    if not os.path.exists(template_path):
+        return False
+    return prerender_index(videos, template_path, os.path.join(directory, INDEX_NAME), count)
+
+def publish_catalog(repository, path=DEFAULT_VIDEOS_PATH):
+    """Publish the public catalog next to `path` and return the pointer document.
+
+    Writes:
+      videos.json               plain catalog for existing readers and the JSON-file backend
+      videos.<hash>.json        the same bytes under a content hash, served as immutable
+      catalog.json              short-lived pointer naming the current hashed file
+      changes.json              recent changes for delta sync (see changes.py)
+      index.html                index.template.html with the newest videos and facets baked in
+                                (see prerender_index)
+
+    plus the mmap-able binary snapshot for the API workers (see binary_catalog.py).
+    """
+    from bulk_operations import BulkOperations
+
+    directory = os.path.dirname(os.path.abspath(path))
+    # One publish at a time across threads and workers, so the files below all come from the same
+    # one; it is videos.json's own lock, so JSON-file backend writes cannot land mid-publish either
+    with FileLock(path):
+        # Read before the export: the catalog then holds every change up to seq (and maybe
+        # later ones, which clients simply apply again), never less than the pointer claims
+        seq = repository.changes.state().seq if repository.changes is not None else None
+        text = BulkOperations.export_to_json(repository)
+        JsonStore(path).save_text(text)
+        videos = json.loads(text)
+        write_binary_catalog(videos, DEFAULT_BINARY_PATH, source_path=path)
+
+        name = _artifact_name(text)
+        artifact_path = os.path.join(directory, name)
+        if os.path.exists(artifact_path):
+            os.utime(artifact_path)  # republishing an old version makes it the newest again
+        else:
+            JsonStore(artifact_path).save_text(text)
+
+        publish_changes(repository, os.path.join(directory, 'changes.json'))
+        pointer = {
+            'videos': name,
+            'seq': seq,
+            'published_at': datetime.now().isoformat(),
+        }
+        JsonStore(os.path.join(directory, POINTER_NAME), indent=None).save(pointer)
+        prune_artifacts(directory)
+
+        render_index(directory, videos)
+    return pointer
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the public index.html from the published catalog')
+    parser.add_argument('command', choices=['index'])
+    parser.add_argument('--output', default=DEFAULT_VIDEOS_PATH, help='published catalog (default: public_archive/videos.json)')
+    args = parser.parse_args()
+
+    directory = os.path.dirname(os.path.abspath(args.output))
+    index_path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(os.path.join(directory, INDEX_TEMPLATE_NAME)):
+        parser.exit(1, f"[PUBLISH] No {INDEX_TEMPLATE_NAME} in {directory}\n")
+    if not os.path.exists(args.output):
+        parser.exit(1, f"[PUBLISH] No catalog at {args.output} to pre-render\n")
+    try:
+        rendered = render_index(directory, JsonStore(args.output).load())
+    except ImportError as e:
+        parser.exit(1, f"[PUBLISH] Cannot pre-render {index_path}: {e} (pip install jinja2)\n")
+    if not rendered:
+        parser.exit(1, f"[PUBLISH] {INDEX_TEMPLATE_NAME} has no prerender markers; copied it unchanged\n")
+    print(f"[PUBLISH] Wrote {index_path}")
+
+if __name__ == '__main__':
+    main()
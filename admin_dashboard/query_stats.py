@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import re
+import time
+
+from sqlalchemy import event
+
+from metrics import registry
+
+logger = logging.getLogger('gentube.sql')
+
+QUERIES_PER_REQUEST = registry.histogram(
+    'gentube_db_queries_per_request', 'SQL statements issued per request', ['endpoint'],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000)
+)
+QUERY_LATENCY = registry.histogram(
+    'gentube_db_query_duration_seconds', 'SQL statement duration'
+)
+SLOW_QUERIES = registry.counter(
+    'gentube_db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS', ['endpoint']
+)
+SUSPECTED_N_PLUS_ONE = registry.counter(
+    'gentube_db_repeated_statements_total', 'Requests that repeated one statement shape past the N+1 threshold', ['endpoint']
+)
+
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    """Normalize a statement so calls differing only in IN-list length or literals compare equal"""
+    shape = _PLACEHOLDER_LIST.sub('(?...)', statement)
+    shape = _NUMBER.sub('N', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+class QueryStats:
+    """Per-request SQL counters, kept on flask.g"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes = {}
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold):
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+class QueryInstrumentation:
+    """Count, time and log every SQL statement an app issues.
+
+    SLOW_QUERY_MS (default 100) sets the slow-query threshold, and
+    QUERY_REPEAT_THRESHOLD (default 10) sets how many identical statement
+    shapes in one request are reported as a likely N+1. SLOW_QUERY_LOG
+    appends the JSON log lines to a file. SQL_DEBUG_HEADERS=1 (or debug
+    mode) adds X-DB-Query-Count / X-DB-Time-Ms response headers.
+    """
+
+    def __init__(self, slow_ms=None, repeat_threshold=None, debug_headers=None, log_path=None):
+        self.slow_seconds = float(slow_ms if slow_ms is not None else os.getenv('SLOW_QUERY_MS', '100')) / 1000
+        self.repeat_threshold = int(repeat_threshold if repeat_threshold is not None
+                                    else os.getenv('QUERY_REPEAT_THRESHOLD', '10'))
+        self.debug_headers = debug_headers
+        self.log_path = log_path if log_path is not None else os.getenv('SLOW_QUERY_LOG')
+
+    def install(self, app, db):
+        from flask import g, has_request_context, request
+
+        if self.debug_headers is None:
+            self.debug_headers = app.debug or os.getenv('SQL_DEBUG_HEADERS', '').lower() in ('1', 'true', 'yes')
+        if self.log_path and not any(getattr(h, 'baseFilename', None) == os.path.abspath(self.log_path)
+                                     for h in logger.handlers):
+            logger.addHandler(logging.FileHandler(self.log_path))
+            logger.setLevel(logging.INFO)
+
+        def endpoint():
+            if has_request_context() and request.url_rule is not None:
+                return request.url_rule.rule
+            return '<none>'
+
+        # The start time goes on the statement's execution context, which is dropped along with a
+        # failed statement (after_cursor_execute never runs for it); the rare context-less call
+        # uses one slot per connection that the next statement overwrites
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._query_started = time.perf_counter()
+            else:
+                conn.info['query_started'] = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                started = getattr(context, '_query_started', None)
+            else:
+                started = conn.info.pop('query_started', None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            QUERY_LATENCY.observe(elapsed)
+            if has_request_context():
+                stats = g.get('query_stats')
+                if stats is None:
+                    stats = g.query_stats = QueryStats()
+                stats.record(statement, elapsed)
+            if elapsed >= self.slow_seconds:
+                SLOW_QUERIES.inc(endpoint=endpoint())
+                self._log('slow_query', endpoint=endpoint(), duration_ms=round(elapsed * 1000, 2),
+                          statement=statement_shape(statement), executemany=executemany)
+
+        def finish_request(response):
+            stats = g.get('query_stats')
+            if stats is None:
+                return response
+            QUERIES_PER_REQUEST.observe(stats.count, endpoint=endpoint())
+            repeated = stats.repeated(self.repeat_threshold)
+            if repeated:
+                SUSPECTED_N_PLUS_ONE.inc(endpoint=endpoint())
+                for shape, n in repeated.items():
+                    self._log('repeated_statement', endpoint=endpoint(), method=request.method,
+                              count=n, statement=shape)
+            if self.debug_headers:
+                response.headers['X-DB-Query-Count'] = str(stats.count)
+                response.headers['X-DB-Time-Ms'] = f"{stats.total_seconds * 1000:.2f}"
+            return response
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+        app.after_request(finish_request)
+        return self
+
+    def _log(self, kind, **fields):
+        logger.warning(json.dumps({'event': kind, 'at': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields}))
+
+def install_query_instrumentation(app, db, **options):
+    """Instrument a Flask-SQLAlchemy app's engine (see QueryInstrumentation)"""
+    return QueryInstrumentation(**options).install(app, db)
@@ -0,0 +1,537 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+
+from video_metadata import PLATFORM_DOMAINS, catalog_fields, detect_platform
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+SQL_BATCH_SIZE = 500
+
+# Fields not in the public export; writes touching only these are not recorded as changes
+UNPUBLISHED_FIELDS = {'view_count'}
+
+# Projection for list views: everything a card needs, without descriptions or metadata
+SLIM_FIELDS = ('id', 'title', 'speaker', 'tags', 'date_added', 'url',
+               'platform', 'video_id', 'thumbnail', 'duration', 'duration_string', 'thumb')
+
+def project(records, fields=SLIM_FIELDS):
+    """Copies of public records restricted to `fields`"""
+    return [{key: record[key] for key in fields if key in record} for record in records]
+
+def _chunks(items, size=SQL_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _like(text):
+    """LIKE pattern matching `text` anywhere, with wildcards in it escaped"""
+    return '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def record_speakers(record):
+    """Speakers of a public record, which has either `speakers` or a single `speaker`"""
+    if isinstance(record.get('speakers'), list):
+        return record['speakers']
+    return [record['speaker']] if record.get('speaker') else []
+
+def split_tags(tags):
+    """Normalize a comma-separated string or list of tags to a clean list"""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [tag.strip() for tag in tags if tag and tag.strip()]
+
+class Page:
+    """Pagination result with the attributes the dashboard template expects"""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self):
+        return math.ceil(self.total / self.per_page) if self.per_page else 0
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+class VideoRepository(ABC):
+    """Storage interface shared by every entry point.
+
+    Records are whatever the backend stores natively (ORM objects for SQL,
+    dicts for the JSON files); export() always returns plain dicts in the
+    public videos.json shape.
+
+    When `changes` is a ChangeLog, every write that affects the export is
+    recorded in it after it succeeds (see changes.py). When `version` is a
+    CatalogVersion, those writes also bump it, so caches in other processes
+    notice them (see cache_version.py).
+    """
+
+    changes = None
+    version = None
+
+    @abstractmethod
+    def get(self, video_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_many(self, video_ids):
+        """Map of id -> record for the ids that exist"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def all(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def page(self, page, per_page):
+        """Newest-first page of records"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, query):
+        """(records, next_cursor) for one page of a video_query.VideoQuery"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, text, limit):
+        """Newest-first records whose title, description, speaker or tags contain `text` (any case)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def serialize(self, record):
+        """Public export dict for one native record"""
+        raise NotImplementedError
+
+    def add(self, fields):
+        return self.put_many([fields])[0]
+
+    @abstractmethod
+    def put_many(self, records):
+        """Insert records without an id (or with an unknown id) and update the rest, in one write"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, video_id, fields):
+        raise NotImplementedError
+
+    @abstractmethod
+    def increment_views(self, video_id):
+        """Add one view in a single write, so concurrent views all count; the record, or None"""
+        raise NotImplementedError
+
+    def delete(self, video_id):
+        return self.delete_many([video_id]) > 0
+
+    @abstractmethod
+    def delete_many(self, video_ids):
+        """Delete records by id and return how many were removed"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def existing_urls(self, urls):
+        """Subset of urls already present in the catalog"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def export(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def export_many(self, video_ids):
+        """Map of id -> public record for the ids that exist"""
+        raise NotImplementedError
+
+    def record_changes(self, put_ids=(), deleted_ids=()):
+        """Log changed ids and bump the shared version after a write that affects the export"""
+        put_ids, deleted_ids = list(put_ids), list(deleted_ids)
+        if not put_ids and not deleted_ids:
+            return
+        if self.changes is not None:
+            self.changes.record(put_ids, deleted_ids)
+        self.invalidate()
+
+    def invalidate(self):
+        """Bump the shared version, e.g. after a restore replaced the data behind the repository"""
+        if self.version is not None:
+            self.version.bump()
+
+    def catalog_version(self):
+        """Token that changes whenever the export may have; cheap enough to check per request"""
+        if self.version is not None:
+            return self.version.current()
+        if self.changes is not None:
+            return self.changes.state().seq
+        return object()  # no way to tell, so never equal
+
+class SQLVideoRepository(VideoRepository):
+    """Repository over a Flask-SQLAlchemy Video model"""
+
+    def __init__(self, db, model, changes=None, version=None):
+        self.db = db
+        self.model = model
+        self.columns = {column.name for column in model.__table__.columns}
+        self.changes = changes
+        self.version = version
+
+    def get(self, video_id):
+        return self.db.session.get(self.model, video_id)
+
+    def get_many(self, video_ids):
+        found = {}
+        for chunk in _chunks(set(video_ids)):
+            for video in self.model.query.filter(self.model.id.in_(chunk)):
+                found[video.id] = video
+        return found
+
+    def all(self):
+        return self.model.query.all()
+
+    def page(self, page, per_page):
+        return self.model.query.order_by(self.model.date_added.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+
+    def count(self):
+        return self.model.query.count()
+
+    def query(self, query):
+        from sqlalchemy import and_, func, or_
+
+        model = self.model
+        base = model.query
+        if query.speaker:
+            base = base.filter(model.speaker == query.speaker)
+        # Tags and platform can only be prefiltered with LIKE; query.accepts() checks them exactly
+        if query.tag:
+            base = base.filter(model.tags.like(_like(query.tag), escape='\\'))
+        if query.platform in PLATFORM_DOMAINS:
+            base = base.filter(or_(*(model.url.like(_like(d), escape='\\') for d in PLATFORM_DOMAINS[query.platform])))
+        if query.date_from:
+            base = base.filter(model.date_added >= query.date_from)
+        if query.date_to:
+            base = base.filter(model.date_added < query.date_to)
+
+        column = {
+            'date_added': model.date_added,
+            'view_count': func.coalesce(model.view_count, 0),
+            'title': model.title,
+        }[query.sort]
+        if query.descending:
+            base = base.order_by(column.desc(), model.id.desc())
+        else:
+            base = base.order_by(column.asc(), model.id.asc())
+
+        rows, after = [], query.after
+        while len(rows) <= query.limit:
+            batch = base
+            if after is not None:
+                value, last_id = after
+                if query.sort == 'date_added':
+                    # '' (a file record without a date) sorts before every date there, as here
+                    value = datetime.fromisoformat(value) if value else datetime.min
+                if query.descending:
+                    batch = batch.filter(or_(column < value, and_(column == value, model.id < last_id)))
+                else:
+                    batch = batch.filter(or_(column > value, and_(column == value, model.id > last_id)))
+            fetched = batch.limit(query.limit + 1).all()
+            for video in fetched:
+                after = query.key(getattr(video, query.sort), video.id)
+                if query.accepts(video.url, video.tags):
+                    rows.append(video)
+            if len(fetched) <= query.limit:
+                break
+
+        next_cursor = None
+        if len(rows) > query.limit:
+            last = rows[query.limit - 1]
+            next_cursor = query.encode_cursor(query.key(getattr(last, query.sort), last.id))
+        return rows[:query.limit], next_cursor
+
+    def search(self, text, limit):
+        from sqlalchemy import or_
+
+        model = self.model
+        pattern = _like(text)
+        return model.query.filter(or_(*(
+            column.ilike(pattern, escape='\\')
+            for column in (model.title, model.description, model.speaker, model.tags)
+        ))).order_by(model.date_added.desc(), model.id.desc()).limit(limit).all()
+
+    def _columns_only(self, fields):
+        fields = dict(fields)
+        if 'tags' in fields and not isinstance(fields['tags'], str):
+            fields['tags'] = ', '.join(split_tags(fields['tags']))
+        return {key: value for key, value in fields.items() if key in self.columns}
+
+    def put_many(self, records):
+        records = [self._columns_only(record) for record in records]
+        existing = self.get_many(r['id'] for r in records if r.get('id') is not None)
+        saved, published = [], []
+        try:
+            for fields in records:
+                video = existing.get(fields.get('id'))
+                if video is None:
+                    video = self.model(**fields)
+                    self.db.session.add(video)
+                    published.append(video)
+                else:
+                    for key, value in fields.items():
+                        setattr(video, key, value)
+                    if set(fields) - UNPUBLISHED_FIELDS - {'id'}:
+                        published.append(video)
+                saved.append(video)
+            self.db.session.flush()  # assigns new ids without expiring them like commit does
+            published = [video.id for video in published]
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+        self.record_changes(put_ids=published)
+        return saved
+
+    def update(self, video_id, fields):
+        video = self.get(video_id)
+        if video is None:
+            return None
+        fields = self._columns_only(fields)
+        try:
+            for key, value in fields.items():
+                setattr(video, key, value)
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+        if set(fields) - UNPUBLISHED_FIELDS:
+            self.record_changes(put_ids=[video_id])
+        return video
+
+    def increment_views(self, video_id):
+        from sqlalchemy import func
+
+        model = self.model
+        try:
+            # UPDATE ... SET view_count = view_count + 1, so no view is lost to a concurrent one
+            updated = model.query.filter(model.id == video_id).update(
+                {model.view_count: func.coalesce(model.view_count, 0) + 1}, synchronize_session=False
+            )
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+        return self.get(video_id) if updated else None
+
+    def delete_many(self, video_ids):
+        deleted, total = [], 0
+        try:
+            for chunk in _chunks(set(video_ids)):
+                # Only ids that exist get a tombstone; clients must not see deletes for phantom ids
+                found = [video_id for (video_id,) in
+                         self.db.session.query(self.model.id).filter(self.model.id.in_(chunk))]
+                if found:
+                    total += self.model.query.filter(self.model.id.in_(found)).delete(synchronize_session=False)
+                    deleted += found
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            raise
+        self.record_changes(deleted_ids=sorted(deleted))
+        return total
+
+    def existing_urls(self, urls):
+        found = set()
+        for chunk in _chunks(set(urls)):
+            rows = self.db.session.query(self.model.url).filter(self.model.url.in_(chunk))
+            found.update(url for (url,) in rows)
+        return found
+
+    def export(self):
+        return [self.serialize(video) for video in self.model.query.all()]
+
+    def export_many(self, video_ids):
+        return {video_id: self.serialize(video) for video_id, video in self.get_many(video_ids).items()}
+
+    @staticmethod
+    def serialize(video):
+        return {
+            'id': video.id,
+            'title': video.title,
+            'url': video.url,
+            'speaker': video.speaker,
+            'tags': split_tags(video.tags),
+            'date_added': video.date_added.isoformat(),
+            'description': video.description or '',
+            # index.py's model has no metadata column
+            **catalog_fields(video.url, getattr(video, 'video_metadata', None))
+        }
+
+class FileVideoRepository(VideoRepository):
+    """Repository over the JSON-file catalog (CatalogStore or JournalStore)"""
+
+    def __init__(self, store, changes=None, version=None):
+        self.store = store
+        self.changes = changes
+        self.version = version
+
+    def catalog_version(self):
+        # The stores re-stat their files on every read, so the shared catalog object is the version
+        return self.store.catalog()
+
+    def get(self, video_id):
+        return self.store.catalog().get(video_id)
+
+    def get_many(self, video_ids):
+        catalog = self.store.catalog()
+        return {video_id: catalog.get(video_id) for video_id in video_ids if video_id in catalog}
+
+    def all(self):
+        return self.store.load()
+
+    def page(self, page, per_page):
+        ordered = self.store.catalog().newest_first()
+        start = (page - 1) * per_page
+        return Page(ordered[start:start + per_page], page, per_page, len(ordered))
+
+    def count(self):
+        return len(self.store.catalog())
+
+    def query(self, query):
+        catalog = self.store.catalog()
+
+        def key(video):
+            return query.key(video.get(query.sort), video['id'])
+
+        # Indexes and sort orders are cached on the catalog until the next write
+        lookups = []
+        if query.speaker:
+            lookups.append(catalog.index('speaker', record_speakers).get(query.speaker, set()))
+        if query.tag:
+            lookups.append(catalog.index('tag', lambda v: split_tags(v.get('tags'))).get(query.tag, set()))
+        if query.platform:
+            lookups.append(catalog.index('platform', lambda v: [detect_platform(v.get('url') or '')])
+                           .get(query.platform, set()))
+
+        after = tuple(query.after) if query.after else None
+        if lookups:
+            ids = set.intersection(*sorted(lookups, key=len))
+            candidates = sorted((catalog.get(video_id) for video_id in ids), key=key, reverse=query.descending)
+            if after is not None:
+                candidates = [v for v in candidates if (key(v) < after if query.descending else key(v) > after)]
+        else:
+            records, keys = catalog.ordered(query.sort, key)
+            if query.descending:
+                end = bisect_left(keys, after) if after is not None else len(records)
+                candidates = (records[i] for i in range(end - 1, -1, -1))
+            else:
+                start = bisect_right(keys, after) if after is not None else 0
+                candidates = islice(records, start, None)
+
+        date_from = query.date_from.isoformat() if query.date_from else None
+        date_to = query.date_to.isoformat() if query.date_to else None
+        rows = list(islice((
+            video for video in candidates
+            if (date_from is None or (video.get('date_added') or '') >= date_from)
+            and (date_to is None or (video.get('date_added') or '') < date_to)
+        ), query.limit + 1))
+
+        next_cursor = query.encode_cursor(key(rows[query.limit - 1])) if len(rows) > query.limit else None
+        return rows[:query.limit], next_cursor
+
+    def search(self, text, limit):
+        text = text.lower()
+        return list(islice((video for haystack, video in self.store.catalog().search_text() if text in haystack), limit))
+
+    @staticmethod
+    def _put(catalog, records):
+        """Apply put_many() to a catalog being edited; returns (saved records, published ids)"""
+        saved, published = [], []
+        for record in records:
+            record = dict(record)
+            if 'tags' in record:
+                record['tags'] = split_tags(record['tags'])
+            if isinstance(record.get('date_added'), datetime):
+                record['date_added'] = record['date_added'].isoformat()
+            video_id = record.get('id')
+            if video_id is not None and video_id in catalog:
+                saved.append(catalog.update(video_id, record))
+                if set(record) - UNPUBLISHED_FIELDS - {'id'}:
+                    published.append(video_id)
+            else:
+                record.setdefault('date_added', datetime.now().isoformat())
+                saved.append(catalog.add(record))
+                published.append(saved[-1]['id'])
+        return saved, published
+
+    def put_many(self, records):
+        with self.store.edit() as catalog:
+            saved, published = self._put(catalog, records)
+        self.record_changes(put_ids=published)
+        return saved
+
+    def update(self, video_id, fields):
+        # Check and write in one edit, so an update racing a delete cannot re-create the video
+        with self.store.edit() as catalog:
+            if video_id not in catalog:
+                return None
+            saved, published = self._put(catalog, [{**fields, 'id': video_id}])
+        self.record_changes(put_ids=published)
+        return saved[0]
+
+    def increment_views(self, video_id):
+        with self.store.edit() as catalog:
+            video = catalog.get(video_id)
+            if video is None:
+                return None
+            saved, _ = self._put(catalog, [{'id': video_id, 'view_count': (video.get('view_count') or 0) + 1}])
+        return saved[0]
+
+    def delete_many(self, video_ids):
+        removed = []
+        with self.store.edit() as catalog:
+            for video_id in set(video_ids):
+                if catalog.remove(video_id) is not None:
+                    removed.append(video_id)
+        self.record_changes(deleted_ids=sorted(removed))
+        return len(removed)
+
+    def existing_urls(self, urls):
+        known = self.store.catalog().urls()
+        return {url for url in urls if url in known}
+
+    @staticmethod
+    def serialize(record):
+        return {**record, **catalog_fields(record.get('url') or '', record.get('metadata'))}
+
+    def export(self):
+        return [self.serialize(record) for record in self.store.load()]
+
+    def export_many(self, video_ids):
+        return {video_id: self.serialize(record) for video_id, record in self.get_many(video_ids).items()}
+
+def file_repository():
+    """Repository over the configured JSON-file backend (see VIDEO_STORE_BACKEND)"""
+    from catalog import video_catalog
+    from changes import ChangeLog, DEFAULT_CHANGES_LOG
+    return FileVideoRepository(video_catalog, changes=ChangeLog(DEFAULT_CHANGES_LOG))
@@ -0,0 +1,80 @@
+import os
+from sqlalchemy import event
+
+class SQLiteProfile:
+    """Connection-level PRAGMA tuning for SQLite databases"""
+
+    # Applied in this order; busy_timeout goes first so the WAL switch
+    # waits for other connections instead of failing with "database is locked"
+    DEFAULTS = {
+        'busy_timeout': 5000,       # milliseconds
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,     # 256 MB
+        'cache_size': -65536,       # negative values are KiB (64 MB)
+        'temp_store': 'MEMORY',
+    }
+
+    ENV_PREFIX = 'SQLITE_'
+
+    def __init__(self, enabled=True, **pragmas):
+        self.enabled = enabled
+        self.pragmas = dict(self.DEFAULTS)
+        for name, value in pragmas.items():
+            if name not in self.DEFAULTS:
+                raise ValueError(f"Unknown SQLite pragma: {name}")
+            self.pragmas[name] = value
+
+    @classmethod
+    def from_env(cls):
+        """Build a profile from SQLITE_* environment variables"""
+        enabled = os.getenv('SQLITE_PROFILE', 'tuned').lower() not in ('off', 'default', 'none', '0')
+        pragmas = {}
+        for name, default in cls.DEFAULTS.items():
+            value = os.getenv(cls.ENV_PREFIX + name.upper())
+            if value is not None:
+                pragmas[name] = int(value) if isinstance(default, int) else value
+        return cls(enabled=enabled, **pragmas)
+
+    def apply(self, dbapi_connection):
+        """Run the profile's PRAGMA statements on a raw DB-API connection"""
+        if not self.enabled:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    def install(self, engine):
+        """Apply the profile to every new connection opened by an engine"""
+        if not self.enabled or engine.dialect.name != 'sqlite':
+            return False
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            self.apply(dbapi_connection)
+
+        return True
+
+    def describe(self):
+        if not self.enabled:
+            return 'default'
+        return ', '.join(f"{name}={value}" for name, value in self.pragmas.items())
+
+def database_dir(app, db):
+    """Directory of the SQLite database file, where files that belong to the data go; else the instance folder"""
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        return os.path.dirname(os.path.abspath(url.database))
+    return app.instance_path
+
+def configure_sqlite(app, db, profile=None):
+    """Install a SQLite tuning profile on a Flask-SQLAlchemy engine"""
+    profile = profile or SQLiteProfile.from_env()
+    with app.app_context():
+        if profile.install(db.engine):
+            print(f"[SQLITE] Connection profile: {profile.describe()}")
+    return profile
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Local, resized WebP thumbnails for the public catalog.
+
+Without this step, the public site hot-links full-size platform
+thumbnails, e.g. the 480x360 YouTube hqdefault JPEG, even in cards that
+are about 200px wide. This job fetches each video's thumbnail once. It
+writes WebP variants at a few widths under public_archive/thumbs/, and
+each file name carries a hash of the source image. A manifest records
+what was generated per video URL. Exports then add a `thumb` object
+(src, srcset, placeholder) to every video that has one. Runs are
+incremental: a video is fetched again only when its thumbnail URL
+changes or a variant file is missing.
+
+    python thumbnails.py                    # new/changed videos from DATABASE_URL, then republish videos.json
+    python thumbnails.py --source json      # use the JSON-file catalog instead
+    python thumbnails.py --force --prune    # rebuild everything and delete unreferenced files
+
+Requires Pillow (`pip install Pillow`), which the web apps do not need.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from json_store import JsonStore, DEFAULT_VIDEOS_PATH
+from metrics import registry, timed
+from video_metadata import catalog_fields
+
+GENERATED = registry.counter(
+    'gentube_thumbnails_total', 'Thumbnail pipeline results per video', ['outcome']
+)
+
+DEFAULT_THUMBS_DIR = os.path.abspath(os.getenv(
+    'THUMBNAILS_DIR', os.path.join(os.path.dirname(DEFAULT_VIDEOS_PATH), 'thumbs')
+))
+DEFAULT_WIDTHS = (160, 320, 480)
+PLACEHOLDER_WIDTH = 16
+
+def source_url(url, metadata_thumbnail=None):
+    """Thumbnail to fetch for a video: extracted metadata first, then the platform default"""
+    return catalog_fields(url or '', {'thumbnail': metadata_thumbnail})['thumbnail']
+
+class ThumbnailPipeline:
+    """Generate content-addressed WebP variants and describe them for the export.
+
+    The manifest maps a video URL to the source it was built from, the
+    content hash and the generated variants. It is keyed by URL rather than
+    id so entries survive re-imports and apply to every storage backend.
+    """
+
+    def __init__(self, output_dir=None, widths=None, quality=None, workers=4):
+        self.output_dir = os.path.abspath(output_dir or DEFAULT_THUMBS_DIR)
+        self.widths = tuple(sorted(widths or DEFAULT_WIDTHS))
+        self.quality = int(quality or os.getenv('THUMBNAIL_QUALITY', '75'))
+        self.workers = workers
+        self.manifest = JsonStore(os.path.join(self.output_dir, 'manifest.json'), default=dict)
+        # Paths in the export are relative to the site root that serves videos.json
+        self.url_prefix = os.path.basename(self.output_dir) + '/'
+
+    def _is_current(self, entry, source):
+        if not entry or entry.get('source') != source:
+            return False
+        return all(
+            os.path.exists(os.path.join(self.output_dir, variant['file']))
+            for variant in entry.get('variants', [])
+        )
+
+    def _fetch(self, source):
+        import requests
+        response = requests.get(source, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+        response.raise_for_status()
+        return response.content
+
+    def _render(self, data):
+        """Write the WebP variants for one source image; returns the manifest entry"""
+        from PIL import Image
+
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert('RGB')
+            width, height = image.size
+            variants = []
+            # Never upscale; a small source still gets one variant at its own width
+            for target in [w for w in self.widths if w < width] + [min(width, self.widths[-1])]:
+                if any(v['width'] == target for v in variants):
+                    continue
+                name = f"{digest}-{target}.webp"
+                path = os.path.join(self.output_dir, name)
+                target_height = round(height * target / width)
+                if not os.path.exists(path):
+                    resized = image.resize((target, target_height), Image.LANCZOS)
+                    tmp_path = path + '.tmp'
+                    resized.save(tmp_path, 'WEBP', quality=self.quality, method=6)
+                    os.replace(tmp_path, path)
+                variants.append({'file': name, 'width': target, 'height': target_height})
+
+            tiny = image.resize((PLACEHOLDER_WIDTH, max(round(height * PLACEHOLDER_WIDTH / width), 1)), Image.BILINEAR)
+            buffer = io.BytesIO()
+            tiny.save(buffer, 'WEBP', quality=30)
+
+        return {
+            'hash': digest,
+            'width': width,
+            'height': height,
+            'variants': variants,
+            'placeholder': 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'),
+        }
+
+    def _process(self, url, source):
+        try:
+            entry = self._render(self._fetch(source))
+        except Exception as e:
+            GENERATED.inc(outcome='failed')
+            print(f"[THUMBNAILS] {url}: {e}")
+            return url, None
+        GENERATED.inc(outcome='generated')
+        entry['source'] = source
+        return url, entry
+
+    @timed('thumbnails')
+    def run(self, videos, force=False):
+        """Build thumbnails for (url, metadata_thumbnail) pairs that are new or changed"""
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("[THUMBNAILS] Pillow is not installed (pip install Pillow); skipping")
+            return None
+
+        started = time.monotonic()
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = self.manifest.load()
+        pending = []
+        for url, metadata_thumbnail in videos:
+            source = source_url(url, metadata_thumbnail)
+            if source and (force or not self._is_current(manifest.get(url), source)):
+                pending.append((url, source))
+
+        results = {'pending': len(pending), 'generated': 0, 'failed': 0, 'urls': []}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            built = list(pool.map(lambda item: self._process(*item), pending))
+
+        with self.manifest.transaction() as manifest:
+            for url, entry in built:
+                if entry is None:
+                    results['failed'] += 1
+                    continue
+                manifest[url] = entry
+                results['generated'] += 1
+                results['urls'].append(url)
+
+        print(f"[THUMBNAILS] Generated {results['generated']}, failed {results['failed']} "
+              f"of {results['pending']} new or changed in {time.monotonic() - started:.1f}s")
+        return results
+
+    def prune(self, keep_urls=None):
+        """Drop manifest entries for videos not in keep_urls, then delete unreferenced files"""
+        with self.manifest.transaction() as manifest:
+            if keep_urls is not None:
+                for url in set(manifest) - set(keep_urls):
+                    del manifest[url]
+            referenced = {v['file'] for entry in manifest.values() for v in entry.get('variants', [])}
+        removed = 0
+        for name in os.listdir(self.output_dir):
+            if name.endswith('.webp') and name not in referenced:
+                os.remove(os.path.join(self.output_dir, name))
+                removed += 1
+        print(f"[THUMBNAILS] Pruned {removed} unreferenced files")
+        return removed
+
+    def describe(self, entry):
+        variants = entry.get('variants') or []
+        if not variants:
+            return None
+        largest = variants[-1]
+        return {
+            'src': self.url_prefix + largest['file'],
+            'srcset': ', '.join(f"{self.url_prefix}{v['file']} {v['width']}w" for v in variants),
+            'width': largest['width'],
+            'height': largest['height'],
+            'placeholder': entry.get('placeholder'),
+        }
+
+    def annotate(self, records, manifest=None):
+        """Copies of export records with a `thumb` object (and local `thumbnail`) where one was generated"""
+        manifest = self.manifest.load() if manifest is None else manifest
+        if not manifest:
+            return records
+        annotated = []
+        for record in records:
+            entry = manifest.get(record.get('url'))
+            thumb = self.describe(entry) if entry else None
+            annotated.append({**record, 'thumb': thumb, 'thumbnail': thumb['src']} if thumb else record)
+        return annotated
+
+thumbnail_pipeline = ThumbnailPipeline()
+
+def _sql_videos():
+    from app import app, Video, db
+    with app.app_context():
+        rows = db.session.query(Video.id, Video.url, Video.video_metadata['thumbnail'].as_string()).all()
+    return app, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', choices=['db', 'json'], default='db', help='catalog to read videos from')
+    parser.add_argument('--widths', help=f"comma-separated widths (default {','.join(map(str, DEFAULT_WIDTHS))})")
+    parser.add_argument('--force', action='store_true', help='regenerate even unchanged videos')
+    parser.add_argument('--prune', action='store_true', help='forget removed videos and delete unreferenced files')
+    parser.add_argument('--no-publish', action='store_true', help='do not rewrite the public videos.json')
+    args = parser.parse_args()
+
+    widths = [int(w) for w in args.widths.split(',')] if args.widths else None
+    pipeline = ThumbnailPipeline(widths=widths)
+
+    if args.source == 'db':
+        app, rows = _sql_videos()
+        from app import video_repo as repository
+    else:
+        from repository import file_repository
+        app, repository = None, file_repository()
+        rows = [(v['id'], v['url'], (v.get('metadata') or {}).get('thumbnail')) for v in repository.all()]
+
+    results = pipeline.run([(url, thumbnail) for _, url, thumbnail in rows], force=args.force)
+    if results is None:
+        return
+    if args.prune:
+        pipeline.prune(url for _, url, _ in rows)
+
+    if results['generated'] and not args.no_publish:
+        from publish import publish_catalog
+        generated = set(results['urls'])
+        # New thumbnails change the exported records, so delta-syncing clients and caches must refetch them
+        repository.record_changes(put_ids=[video_id for video_id, url, _ in rows if url in generated])
+        with app.app_context() if app else nullcontext():
+            pointer = publish_catalog(repository)
+        print(f"[THUMBNAILS] Republished the catalog as {pointer['videos']}")
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,79 @@
-import yt_dlp
-import requests
+import os
 import re
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 import json
+from metrics import timed
+
+# yt_dlp and requests are imported on first use: together they add ~250 ms to
+# every cold start of the apps that import this module but never extract.
+
+PLATFORM_DOMAINS = {
+    'youtube': ['youtube.com', 'youtu.be', 'm.youtube.com'],
+    'vimeo': ['vimeo.com', 'player.vimeo.com'],
+    'dailymotion': ['dailymotion.com', 'dai.ly'],
+    'twitch': ['twitch.tv', 'clips.twitch.tv'],
+    'twitter': ['twitter.com', 'x.com', 't.co'],
+    'linkedin': ['linkedin.com'],
+    'facebook': ['facebook.com', 'fb.watch'],
+    'instagram': ['instagram.com'],
+    'tiktok': ['tiktok.com'],
+    'rumble': ['rumble.com'],
+    'bitchute': ['bitchute.com'],
+    'odysee': ['odysee.com'],
+    'brighteon': ['brighteon.com']
+}
+
+# Names shown by the public site's platform filter and player
+PLATFORM_LABELS = {
+    'youtube': 'YouTube', 'vimeo': 'Vimeo', 'dailymotion': 'Dailymotion', 'twitch': 'Twitch',
+    'twitter': 'Twitter', 'linkedin': 'LinkedIn', 'facebook': 'Facebook', 'instagram': 'Instagram',
+    'tiktok': 'TikTok', 'rumble': 'Rumble', 'bitchute': 'BitChute', 'odysee': 'Odysee',
+    'brighteon': 'Brighteon', 'generic': 'Other'
+}
+
+_VIDEO_ID_PATTERNS = {
+    'youtube': re.compile(r'(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|embed/|shorts/|live/)|youtu\.be/)([\w-]+)'),
+    'vimeo': re.compile(r'vimeo\.com/(?:[^?#]*/)?(\d+)'),
+    'dailymotion': re.compile(r'(?:dailymotion\.com/video/|dai\.ly/)([A-Za-z0-9]+)'),
+}
+
+def detect_platform(url):
+    """Platform key for a video URL, 'generic' when unknown"""
+    domain = urlparse(url).netloc.lower()
+    for platform, domains in PLATFORM_DOMAINS.items():
+        if any(d in domain for d in domains):
+            return platform
+    return 'generic'
+
+def platform_video_id(url, platform=None):
+    """The platform's own id for the video (used for embeds and default thumbnails)"""
+    pattern = _VIDEO_ID_PATTERNS.get(platform or detect_platform(url))
+    match = pattern.search(url) if pattern else None
+    return match.group(1) if match else None
+
+def catalog_fields(url, metadata=None):
+    """Fields the public export precomputes so clients do no per-record parsing"""
+    metadata = metadata or {}
+    platform = detect_platform(url)
+    video_id = platform_video_id(url, platform)
+    thumbnail = metadata.get('thumbnail')
+    if not thumbnail and platform == 'youtube' and video_id:
+        thumbnail = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+    return {
+        'platform': PLATFORM_LABELS.get(platform, platform.title()),
+        'video_id': video_id,
+        'thumbnail': thumbnail,
+        'duration': metadata.get('duration'),
+        'duration_string': metadata.get('duration_string'),
+    }
 
 class VideoMetadataExtractor:
     """Extract metadata from various video platforms"""
     
-    def __init__(self):
+    def __init__(self, stub_url=None):
+        # When set, all platform lookups go to a local stub server (see loadtest/stub_server.py)
+        self.stub_url = (stub_url or os.getenv('VIDEO_METADATA_STUB_URL') or '').rstrip('/') or None
         self.ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -22,14 +87,15 @@ class VideoMetadataExtractor:
         platform = self.detect_platform(url)
         
         try:
-            if platform in ['youtube', 'vimeo', 'dailymotion', 'twitch']:
-                return self._extract_with_ytdlp(url, platform)
-            elif platform == 'twitter':
-                return self._extract_twitter(url)
-            elif platform == 'linkedin':
-                return self._extract_linkedin(url)
-            else:
-                return self._extract_generic(url)
+            with timed('metadata_extraction'):
+                if platform in ['youtube', 'vimeo', 'dailymotion', 'twitch']:
+                    return self._extract_with_ytdlp(url, platform)
+                elif platform == 'twitter':
+                    return self._extract_twitter(url)
+                elif platform == 'linkedin':
+                    return self._extract_linkedin(url)
+                else:
+                    return self._extract_generic(url)
         except Exception as e:
             return {
                 'platform': platform,
@@ -39,34 +105,52 @@ class VideoMetadataExtractor:
     
     def _extract_with_ytdlp(self, url, platform):
         """Extract metadata using yt-dlp"""
+        info = self._fetch_info(url)
+        return {
+            'platform': platform,
+            'title': info.get('title'),
+            'description': info.get('description'),
+            'duration': info.get('duration'),  # in seconds
+            'duration_string': self._format_duration(info.get('duration')),
+            'view_count': info.get('view_count'),
+            'like_count': info.get('like_count'),
+            'upload_date': info.get('upload_date'),
+            'uploader': info.get('uploader'),
+            'uploader_id': info.get('uploader_id'),
+            'thumbnail': info.get('thumbnail'),
+            'thumbnails': info.get('thumbnails', [])[:3],  # First 3 thumbnails
+            'tags': info.get('tags', []),
+            'categories': info.get('categories', []),
+            'webpage_url': info.get('webpage_url'),
+            'original_url': url,
+            'extracted_at': datetime.now().isoformat()
+        }
+    
+    def _fetch_info(self, url):
+        """Return a yt-dlp info dict, from the stub server when one is configured"""
+        if self.stub_url:
+            import requests
+            response = requests.get(f"{self.stub_url}/ytdlp", params={'url': url}, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        import yt_dlp
         with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            return {
-                'platform': platform,
-                'title': info.get('title'),
-                'description': info.get('description'),
-                'duration': info.get('duration'),  # in seconds
-                'duration_string': self._format_duration(info.get('duration')),
-                'view_count': info.get('view_count'),
-                'like_count': info.get('like_count'),
-                'upload_date': info.get('upload_date'),
-                'uploader': info.get('uploader'),
-                'uploader_id': info.get('uploader_id'),
-                'thumbnail': info.get('thumbnail'),
-                'thumbnails': info.get('thumbnails', [])[:3],  # First 3 thumbnails
-                'tags': info.get('tags', []),
-                'categories': info.get('categories', []),
-                'webpage_url': info.get('webpage_url'),
-                'original_url': url,
-                'extracted_at': datetime.now().isoformat()
-            }
+            return ydl.extract_info(url, download=False)
+    
+    def _get_page(self, url):
+        """Fetch a page for Open Graph parsing, from the stub server when one is configured"""
+        import requests
+        if self.stub_url:
+            response = requests.get(f"{self.stub_url}/page", params={'url': url}, timeout=10)
+            response.raise_for_status()
+            return response
+        return requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
     
     def _extract_twitter(self, url):
         """Extract metadata from Twitter/X videos"""
         # Basic Twitter metadata extraction
         try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+            response = self._get_page(url)
             content = response.text
             
             # Extract basic info from meta tags
@@ -93,7 +177,7 @@ class VideoMetadataExtractor:
     def _extract_linkedin(self, url):
         """Extract metadata from LinkedIn videos"""
         try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+            response = self._get_page(url)
             content = response.text
             
             title_match = re.search(r'<meta property="og:title" content="([^"]*)"', content)
@@ -117,7 +201,7 @@ class VideoMetadataExtractor:
     def _extract_generic(self, url):
         """Generic metadata extraction for unknown platforms"""
         try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+            response = self._get_page(url)
             content = response.text
             
             # Extract Open Graph metadata
@@ -158,29 +242,7 @@ class VideoMetadataExtractor:
     
     def detect_platform(self, url):
         """Detect video platform from URL"""
-        domain = urlparse(url).netloc.lower()
-        
-        platform_patterns = {
-            'youtube': ['youtube.com', 'youtu.be', 'm.youtube.com'],
-            'vimeo': ['vimeo.com', 'player.vimeo.com'],
-            'dailymotion': ['dailymotion.com', 'dai.ly'],
-            'twitch': ['twitch.tv', 'clips.twitch.tv'],
-            'twitter': ['twitter.com', 'x.com', 't.co'],
-            'linkedin': ['linkedin.com'],
-            'facebook': ['facebook.com', 'fb.watch'],
-            'instagram': ['instagram.com'],
-            'tiktok': ['tiktok.com'],
-            'rumble': ['rumble.com'],
-            'bitchute': ['bitchute.com'],
-            'odysee': ['odysee.com'],
-            'brighteon': ['brighteon.com']
-        }
-        
-        for platform, domains in platform_patterns.items():
-            if any(d in domain for d in domains):
-                return platform
-        
-        return 'generic'
+        return detect_platform(url)
     
     def get_supported_platforms(self):
         """Get list of supported platforms"""
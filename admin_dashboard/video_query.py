@@ -0,0 +1,162 @@
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+
+from repository import SLIM_FIELDS, project, split_tags
+from thumbnails import thumbnail_pipeline
+from video_metadata import PLATFORM_LABELS, detect_platform
+
+SORT_FIELDS = ('date_added', 'view_count', 'title')
+DEFAULT_LIMIT = int(os.getenv('VIDEO_QUERY_DEFAULT_LIMIT', '100'))
+MAX_LIMIT = int(os.getenv('VIDEO_QUERY_MAX_LIMIT', '1000'))
+
+# Any of these in the query string switches /api/videos from the full catalog to a query
+QUERY_PARAMS = ('speaker', 'tag', 'platform', 'date_from', 'date_to', 'sort', 'limit', 'cursor', 'fields')
+
+# Platform filter accepts the export label ('YouTube') or the key ('youtube')
+_PLATFORM_KEYS = {**{key: key for key in PLATFORM_LABELS}, **{label.lower(): key for key, label in PLATFORM_LABELS.items()}}
+
+class QueryError(ValueError):
+    """Invalid query parameter; the API answers 400 with the message"""
+
+def _parse_date(value, name):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an ISO date or datetime")
+
+def sort_value(sort, value):
+    """Normalize a raw column/field value to the comparable form cursors carry"""
+    if sort == 'view_count':
+        return int(value or 0)
+    if sort == 'date_added':
+        return value.isoformat() if isinstance(value, datetime) else (value or '')
+    return value or ''
+
+class VideoQuery:
+    """Filter, sort, cursor and projection for /api/videos.
+
+    Pagination is keyset-based: the cursor is the (sort value, id) of the
+    last record returned, so every page costs the same however deep it is
+    and concurrent inserts do not shift later pages. Ties are broken by id
+    in the sort direction.
+    """
+
+    def __init__(self, speaker=None, tag=None, platform=None, date_from=None, date_to=None,
+                 sort='-date_added', limit=None, cursor=None, fields=None):
+        self.speaker = speaker or None
+        self.tag = tag or None
+        self.platform = None
+        if platform:
+            self.platform = _PLATFORM_KEYS.get(platform.lower())
+            if self.platform is None:
+                raise QueryError(f"unknown platform {platform!r}")
+
+        self.date_from = _parse_date(date_from, 'date_from') if date_from else None
+        self.date_to = None
+        if date_to:
+            self.date_to = _parse_date(date_to, 'date_to')
+            if len(date_to) == 10:
+                self.date_to += timedelta(days=1)  # a bare date includes the whole day
+
+        self.descending = sort.startswith('-')
+        self.sort = sort.lstrip('-')
+        if self.sort not in SORT_FIELDS:
+            raise QueryError(f"sort must be one of {', '.join(SORT_FIELDS)}, optionally prefixed with '-'")
+
+        try:
+            self.limit = int(limit) if limit not in (None, '') else DEFAULT_LIMIT
+        except ValueError:
+            raise QueryError("limit must be an integer")
+        if self.limit < 1:
+            raise QueryError("limit must be positive")
+        self.limit = min(self.limit, MAX_LIMIT)
+
+        self.after = self.decode_cursor(cursor) if cursor else None
+        self.fields = fields
+
+    @classmethod
+    def from_args(cls, args):
+        """Query from request args, or None when none of QUERY_PARAMS is present"""
+        if not any(name in args for name in QUERY_PARAMS):
+            return None
+        fields = None
+        if args.get('fields'):
+            fields = ('id',) + tuple(f.strip() for f in args['fields'].split(',') if f.strip() and f.strip() != 'id')
+        elif args.get('slim') == '1':
+            fields = SLIM_FIELDS
+        return cls(
+            speaker=args.get('speaker'),
+            tag=args.get('tag'),
+            platform=args.get('platform'),
+            date_from=args.get('date_from'),
+            date_to=args.get('date_to'),
+            sort=args.get('sort') or '-date_added',
+            limit=args.get('limit'),
+            cursor=args.get('cursor'),
+            fields=fields,
+        )
+
+    @property
+    def sort_spec(self):
+        return ('-' if self.descending else '') + self.sort
+
+    def encode_cursor(self, key):
+        raw = json.dumps([self.sort_spec, *key], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            spec, value, video_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (ValueError, TypeError):
+            raise QueryError("invalid cursor")
+        if spec != self.sort_spec:
+            raise QueryError("cursor belongs to a different sort order")
+        if not isinstance(video_id, int) or not isinstance(value, int if self.sort == 'view_count' else str):
+            raise QueryError("invalid cursor")
+        if self.sort == 'date_added' and value:
+            # Checked here so no backend ever parses an unchecked date ('' is a record without one)
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                raise QueryError("invalid cursor")
+        return value, video_id
+
+    def key(self, value, video_id):
+        """Position of a record in this query's order, as cursors store it"""
+        return sort_value(self.sort, value), video_id
+
+    def accepts(self, url, tags):
+        """Exact tag and platform check, for backends that can only prefilter them"""
+        if self.tag and self.tag not in split_tags(tags):
+            return False
+        if self.platform and detect_platform(url or '') != self.platform:
+            return False
+        return True
+
+def query_videos(repository, query):
+    """Public records for one page of `query`, and the cursor of the next page (or None).
+
+    `repository` may also be an engine standing in for one (columnar.py,
+    binary_catalog.py); engines whose rows already carry thumbnails set
+    `annotated`.
+    """
+    rows, next_cursor = repository.query(query)
+    videos = [repository.serialize(row) for row in rows]
+    if not getattr(repository, 'annotated', False):
+        videos = thumbnail_pipeline.annotate(videos)
+    # Rows may be lazily decoded mappings (see binary_catalog.py); projecting reads only the requested fields
+    if query.fields:
+        videos = project(videos, query.fields)
+    else:
+        videos = [video if isinstance(video, dict) else dict(video) for video in videos]
+    return videos, next_cursor
+
+def search_videos(repository, text, limit=None):
+    """Public records of the newest `limit` videos matching a free-text search"""
+    limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    videos = [repository.serialize(row) for row in repository.search(text, limit)]
+    if not getattr(repository, 'annotated', False):
+        videos = thumbnail_pipeline.annotate(videos)
+    return videos
@@ -1,6 +1,6 @@
-import json
 import os
 from datetime import datetime
+from metrics import timed
 
 class WebhookManager:
     """Simple webhook manager for auto-export functionality"""
@@ -18,17 +18,14 @@ class PublicArchiveWebhook:
     def trigger_export(event, data):
         """Trigger automatic export to public archive"""
         try:
-            from bulk_operations import BulkOperations
-            from app import Video
+            from publish import publish_catalog
+            from app import video_repo
             
             # Export to public archive
-            json_data = BulkOperations.export_to_json(Video)
-            public_path = os.path.join('..', 'public_archive', 'videos.json')
+            with timed('auto_export'):
+                pointer = publish_catalog(video_repo)
             
-            with open(public_path, 'w') as f:
-                f.write(json_data)
-            
-            print(f"Auto-export completed: {len(json.loads(json_data))} videos")
+            print(f"Auto-export completed: {video_repo.count()} videos as {pointer['videos']}")
             return True
         except Exception as e:
             print(f"Auto-export failed: {str(e)}")
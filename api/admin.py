@@ -1,6 +1,13 @@
 from flask import Flask
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
+
+from metrics import install_metrics
 
 app = Flask(__name__)
+install_metrics(app, admin=True)
 
 @app.route('/')
 @app.route('/admin')
@@ -8,22 +8,19 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
 
 from forms import VideoForm, BulkImportForm
+from repository import file_repository
+from metrics import install_metrics
 
 app = Flask(__name__, 
            template_folder='../admin_dashboard/templates',
            static_folder='../admin_dashboard/static')
 app.secret_key = 'your-secret-key-change-in-production'
+install_metrics(app, admin=True)
 
-def load_videos():
-    try:
-        with open('../public_archive/videos.json', 'r') as f:
-            return json.load(f)
-    except:
-        return []
+video_repo = file_repository()
 
-def save_videos(videos):
-    with open('../public_archive/videos.json', 'w') as f:
-        json.dump(videos, f, indent=2)
+def load_videos():
+    return video_repo.all()
 
 @app.route('/admin')
 @app.route('/admin/')
@@ -35,18 +32,14 @@ def dashboard():
 def add_video():
     form = VideoForm()
     if form.validate_on_submit():
-        videos = load_videos()
-        video = {
-            'id': max([v.get('id', 0) for v in videos], default=0) + 1,
+        video_repo.add({
             'title': form.title.data,
             'url': form.url.data,
             'speaker': form.speaker.data,
             'tags': [tag.strip() for tag in form.tags.data.split(',') if tag.strip()] if form.tags.data else [],
             'description': form.description.data or '',
             'date_added': datetime.now().isoformat()
-        }
-        videos.append(video)
-        save_videos(videos)
+        })
         flash('Video added successfully!', 'success')
         return redirect('/admin')
     
@@ -54,8 +47,7 @@ def add_video():
 
 @app.route('/admin/edit/<int:video_id>', methods=['GET', 'POST'])
 def edit_video(video_id):
-    videos = load_videos()
-    video = next((v for v in videos if v.get('id') == video_id), None)
+    video = video_repo.get(video_id)
     
     if not video:
         flash('Video not found', 'error')
@@ -63,14 +55,13 @@ def edit_video(video_id):
     
     form = VideoForm(obj=type('obj', (object,), video)())
     if form.validate_on_submit():
-        video.update({
+        video_repo.update(video_id, {
             'title': form.title.data,
             'url': form.url.data,
             'speaker': form.speaker.data,
             'tags': [tag.strip() for tag in form.tags.data.split(',') if tag.strip()] if form.tags.data else [],
             'description': form.description.data or ''
         })
-        save_videos(videos)
         flash('Video updated successfully!', 'success')
         return redirect('/admin')
     
@@ -78,8 +69,7 @@ def edit_video(video_id):
 
 @app.route('/admin/preview/<int:video_id>')
 def video_preview(video_id):
-    videos = load_videos()
-    video = next((v for v in videos if v.get('id') == video_id), None)
+    video = video_repo.get(video_id)
     
     if not video:
         flash('Video not found', 'error')
@@ -95,9 +85,7 @@ def video_preview(video_id):
 
 @app.route('/admin/delete/<int:video_id>', methods=['POST'])
 def delete_video(video_id):
-    videos = load_videos()
-    videos = [v for v in videos if v.get('id') != video_id]
-    save_videos(videos)
+    video_repo.delete(video_id)
     flash('Video deleted successfully!', 'success')
     return redirect('/admin')
 
@@ -0,0 +1,199 @@
+"""
+ASGI version of the public read API: list, search and changes.
+
+    pip install uvicorn
+    uvicorn asgi:app --app-dir api --workers 4
+
+Serves the same endpoints as api/index.py, from the same JSON-file catalog:
+    GET /api/videos              full catalog, or one page with query parameters
+    GET /api/videos/search?q=    newest videos matching free text
+    GET /api/videos/changes      delta sync feed
+
+No request handler touches the filesystem. A background task re-reads the
+catalog, change log and thumbnail manifest in a worker thread every
+ASGI_REFRESH_INTERVAL seconds (default 1), and only when a file changed.
+It then swaps in a new in-memory snapshot. Requests are answered on the
+event loop from that snapshot, so one process holds thousands of open
+connections without a thread each. Responses can lag a write by up to the
+refresh interval.
+"""
+import asyncio
+import json
+import os
+import sys
+from urllib.parse import parse_qsl
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
+
+from changes import changes_since
+from columnar import columnar_engine
+from repository import FileVideoRepository, file_repository, project
+from thumbnails import thumbnail_pipeline
+from video_query import VideoQuery, QueryError, query_videos, search_videos
+
+REFRESH_INTERVAL = float(os.getenv('ASGI_REFRESH_INTERVAL', '1'))
+
+class _Loaded:
+    """Read-only stand-in for a store or change log, holding the version read by the last refresh"""
+
+    def __init__(self, data, catalog=None):
+        self.data = data
+        self._catalog = catalog
+
+    def load(self):
+        return self.data
+
+    def catalog(self):
+        return self._catalog
+
+    def state(self):
+        return self.data
+
+class SnapshotRepository(FileVideoRepository):
+    """FileVideoRepository over data already in memory; serialize() includes thumbnails"""
+
+    annotated = True
+
+    def __init__(self, live, catalog, log, manifest):
+        changes = _Loaded(log) if live.changes is not None else None
+        super().__init__(_Loaded(catalog.to_list(), catalog), changes)
+        self.manifest = manifest or {}
+
+    def serialize(self, record):
+        return thumbnail_pipeline.annotate([super().serialize(record)], self.manifest)[0]
+
+class CatalogState:
+    """The snapshot every request reads, replaced whole by refresh()"""
+
+    def __init__(self, repository):
+        self.live = repository
+        self.sources = None
+        self.repository = None
+        self.engine = None
+        self.payloads = {}
+
+    def refresh(self):
+        """Reload whatever changed; blocking, so it runs in a worker thread"""
+        catalog = self.live.store.catalog()
+        log = self.live.changes.state() if self.live.changes is not None else None
+        # Without a manifest file every load() is a new empty dict; None keeps that source identical
+        manifest = thumbnail_pipeline.manifest.load() or None
+        sources = (catalog, log, manifest)
+        if self.sources is not None and all(a is b for a, b in zip(self.sources, sources)):
+            return False
+
+        repository = SnapshotRepository(self.live, catalog, log, manifest)
+        videos = repository.export()
+        payloads = {
+            False: json.dumps(videos, separators=(',', ':')).encode('utf-8'),
+            True: json.dumps(project(videos), separators=(',', ':')).encode('utf-8'),
+        }
+        engine = columnar_engine(repository)
+        if engine is not repository:
+            engine.snapshot()  # build it here rather than in the first request
+        catalog.search_text()
+        # Readers take these attributes one at a time; each is consistent on its own
+        self.repository, self.engine, self.payloads, self.sources = repository, engine, payloads, sources
+        return True
+
+state = CatalogState(file_repository())
+_started = None
+
+async def _refresh_forever():
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL)
+        try:
+            await asyncio.to_thread(state.refresh)
+        except Exception as e:
+            print(f"[ASGI] Catalog refresh failed: {e}")
+
+async def _start():
+    """Load the catalog and start the refresher once per process, whichever comes first"""
+    global _started
+    if _started is None:
+        _started = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.to_thread(state.refresh)
+            asyncio.get_running_loop().create_task(_refresh_forever())
+            _started.set_result(True)
+        except Exception as e:
+            _started.set_exception(e)
+            _started = None
+            raise
+    await _started
+
+def _int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def _list_videos(args):
+    try:
+        query = VideoQuery.from_args(args)
+    except QueryError as e:
+        return 400, {'error': str(e)}, {}
+    if query is None:
+        return 200, state.payloads[args.get('slim') == '1'], {}
+    videos, next_cursor = query_videos(state.engine, query)
+    headers = {'x-next-cursor': next_cursor, 'access-control-expose-headers': 'X-Next-Cursor'} if next_cursor else {}
+    return 200, videos, headers
+
+def _search_videos(args):
+    text = args.get('q', '').strip()
+    if not text:
+        return 400, {'error': 'q required'}, {}
+    return 200, search_videos(state.repository, text, _int(args.get('limit'))), {}
+
+def _video_changes(args):
+    limit = min(_int(args.get('limit'), 500), 5000)
+    return 200, changes_since(state.repository, _int(args.get('since')), limit), {}
+
+ROUTES = {
+    '/api/videos': _list_videos,
+    '/api/videos/search': _search_videos,
+    '/api/videos/changes': _video_changes,
+}
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await _start()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    await _start()
+    handler = ROUTES.get(scope['path'].rstrip('/') or '/')
+    headers = {}
+    if handler is None:
+        status, payload = 404, {'error': 'not found'}
+    elif scope['method'] != 'GET':
+        status, payload, headers = 405, {'error': 'method not allowed'}, {'allow': 'GET'}
+    else:
+        args = dict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        status, payload, headers = handler(args)
+
+    body = payload if isinstance(payload, bytes) else json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            *((name.encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
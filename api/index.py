@@ -1,41 +1,75 @@
 from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, session
 import json
 import os
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
+
+from repository import file_repository, project
+from changes import changes_since
+from video_query import VideoQuery, QueryError, query_videos, search_videos
+from columnar import columnar_engine
+from binary_catalog import binary_engine
+from cache_version import VersionedCache
+from metrics import install_metrics
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-in-production'
+install_metrics(app)
 
-def load_videos():
-    try:
-        with open('public_archive/videos.json', 'r') as f:
-            return json.load(f)
-    except:
-        return []
+video_repo = file_repository()
+# Default-order pages from the mmap-ed publish snapshot, everything else from the catalog
+video_search = binary_engine(video_repo, columnar_engine(video_repo))
+# Full-catalog payloads, rebuilt when the catalog files change
+api_cache = VersionedCache(video_repo.catalog_version)
 
-def save_videos(videos):
-    with open('public_archive/videos.json', 'w') as f:
-        json.dump(videos, f, indent=2)
+def load_videos():
+    return video_repo.all()
 
 @app.route('/api/videos', methods=['GET'])
 def api_get_videos():
-    return jsonify(load_videos())
+    try:
+        query = VideoQuery.from_args(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    if query is not None:
+        videos, next_cursor = query_videos(video_search, query)
+        response = jsonify(videos)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+        return response
+    slim = request.args.get('slim') == '1'
+    return app.response_class(
+        api_cache.get(('videos', slim), lambda: json.dumps(project(video_repo.export()) if slim else video_repo.export())),
+        mimetype='application/json',
+    )
+
+@app.route('/api/videos/search', methods=['GET'])
+def api_search_videos():
+    text = request.args.get('q', '').strip()
+    if not text:
+        return jsonify({'error': 'q required'}), 400
+    return jsonify(search_videos(video_repo, text, request.args.get('limit', type=int)))
+
+@app.route('/api/videos/changes', methods=['GET'])
+def api_video_changes():
+    since = request.args.get('since', type=int)
+    limit = min(request.args.get('limit', 500, type=int), 5000)
+    return jsonify(changes_since(video_repo, since, limit))
 
 @app.route('/api/videos', methods=['POST'])
 def api_add_video():
     data = request.json
-    videos = load_videos()
-    video = {
-        'id': max([v.get('id', 0) for v in videos], default=0) + 1,
+    video = video_repo.add({
         'title': data.get('title'),
         'url': data.get('url'),
         'speaker': data.get('speaker'),
         'tags': data.get('tags', []),
         'description': data.get('description', ''),
         'date_added': datetime.now().isoformat()
-    }
-    videos.append(video)
-    save_videos(videos)
+    })
     return jsonify(video), 201
 
 # Vercel handler
@@ -1,47 +1,45 @@
 from flask import Flask, request, jsonify
 import json
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
+
+from repository import file_repository
+from video_query import VideoQuery, QueryError, query_videos
+from binary_catalog import binary_engine
 
 app = Flask(__name__)
+video_repo = file_repository()
+video_search = binary_engine(video_repo)
 
 def handler(req):
     with app.app_context():
         if req.method == 'GET':
             try:
-                with open('public_archive/videos.json', 'r') as f:
-                    videos = json.load(f)
-                return jsonify(videos)
-            except:
-                return jsonify([])
+                query = VideoQuery.from_args(req.args)
+            except QueryError as e:
+                return jsonify({'error': str(e)}), 400
+            if query is None:
+                return jsonify(get_videos())
+            videos, next_cursor = query_videos(video_search, query)
+            response = jsonify(videos)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+            return response
         
         elif req.method == 'POST':
             data = req.get_json()
-            video = {
-                'id': len(get_videos()) + 1,
+            video = video_repo.add({
                 'title': data.get('title'),
                 'url': data.get('url'),
                 'speaker': data.get('speaker'),
                 'tags': data.get('tags', []),
                 'description': data.get('description', ''),
                 'date_added': data.get('date_added')
-            }
-            
-            try:
-                with open('public_archive/videos.json', 'r') as f:
-                    videos = json.load(f)
-            except:
-                videos = []
-            
-            videos.append(video)
-            
-            with open('public_archive/videos.json', 'w') as f:
-                json.dump(videos, f, indent=2)
+            })
             
             return jsonify(video), 201
 
 def get_videos():
-    try:
-        with open('public_archive/videos.json', 'r') as f:
-            return json.load(f)
-    except:
-        return []
\ No newline at end of file
+    return video_repo.all()
\ No newline at end of file
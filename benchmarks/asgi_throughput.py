@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Concurrent-connection throughput of the public read API: Flask vs ASGI.
+
+Starts api/index.py (threaded WSGI server) and api/asgi.py (uvicorn) over
+the same synthetic videos.json via loadtest/serve.py. Each route is driven
+from --connections keep-alive connections for --seconds, and the report
+gives requests/s, p50/p99 latency and errors per server and route.
+
+    pip install uvicorn
+    python benchmarks/asgi_throughput.py --videos 10000 --connections 200 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVE = os.path.join(os.path.dirname(BENCH_DIR), 'loadtest', 'serve.py')
+
+ROUTES = {
+    'list_page': '/api/videos?limit=20',
+    'list_filtered': '/api/videos?platform=youtube&sort=-title&limit=20',
+    'search': '/api/videos/search?q=keynote&limit=20',
+    'changes': '/api/videos/changes?since=0',
+}
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+async def _request(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: keep-alive\r\n\r\n".encode('ascii'))
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = dict(
+        line.split(b':', 1) for line in head.split(b'\r\n')[1:] if b':' in line
+    )
+    headers = {name.strip().lower(): value.strip() for name, value in headers.items()}
+    await reader.readexactly(int(headers.get(b'content-length', b'0')))
+    return status, headers.get(b'connection', b'').lower() == b'close'
+
+async def _connection(port, path, deadline, latencies, errors):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            started = time.perf_counter()
+            status, close = await _request(reader, writer, path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors[0] += 1
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors[0] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+async def drive(port, path, connections, seconds):
+    latencies, errors = [], [0]
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(_connection(port, path, deadline, latencies, errors) for _ in range(connections)))
+    latencies.sort()
+    return {
+        'rps': round(len(latencies) / seconds, 1),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+        'errors': errors[0],
+    }
+
+def _start(target, workdir, videos):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, SERVE, target, '--port', str(port), '--workdir', workdir, '--videos', str(videos)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{target} server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b"GET /api/videos?limit=1 HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n")
+                if sock.recv(12).startswith(b'HTTP/1.1 200'):
+                    return process, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{target} server did not become ready")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=10000)
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--routes', default=','.join(ROUTES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'server':<8}{'route':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for target, label in (('public', 'flask'), ('public-asgi', 'asgi')):
+            process, port = _start(target, workdir, args.videos)
+            try:
+                for route in args.routes.split(','):
+                    result = asyncio.run(drive(port, ROUTES[route], args.connections, args.seconds))
+                    print(f"{label:<8}{route:<16}{result['rps']:>10}{result['p50_ms']:>10}"
+                          f"{result['p99_ms']:>10}{result['errors']:>8}", flush=True)
+            finally:
+                process.terminate()
+                process.wait()
+
+if __name__ == '__main__':
+    main()
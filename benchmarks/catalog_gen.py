@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic video catalog for benchmarks and load tests.
+
+    python benchmarks/catalog_gen.py 10000 -o /tmp/videos.json
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+PLATFORMS = [
+    # (weight, url template, metadata platform name)
+    (70, 'https://www.youtube.com/watch?v={key}', 'youtube'),
+    (10, 'https://vimeo.com/{num}', 'vimeo'),
+    (10, 'https://x.com/genlayer/status/{num}', 'twitter'),
+    (5, 'https://www.linkedin.com/posts/genlayer-{key}', 'linkedin'),
+    (5, 'https://media.example.org/talks/{key}', 'generic'),
+]
+
+WORDS = (
+    'genlayer intelligent contracts consensus validators optimistic democracy ai llm '
+    'blockchain decentralized trustless oracle web agents equivalence principle '
+    'appeals rollup ethereum developers tutorial podcast interview keynote demo'
+).split()
+
+START_DATE = datetime(2023, 1, 1)
+
+def _sentence(rng, min_words, max_words):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+def generate_videos(count, seed=42, with_metadata=True):
+    """Yield `count` video dicts shaped like the admin Video model"""
+    rng = random.Random(seed)
+    speakers = [f"Speaker {i}" for i in range(max(20, int(count ** 0.5)))]
+    tags = [f"tag{i}" for i in range(200)]
+    weights = [p[0] for p in PLATFORMS]
+    span_minutes = 3 * 365 * 24 * 60
+
+    for i in range(1, count + 1):
+        _, template, platform = rng.choices(PLATFORMS, weights)[0]
+        key = f"{i:011d}"
+        url = template.format(key=key, num=1000000 + i)
+        date_added = START_DATE + timedelta(minutes=span_minutes * i // count)
+        view_count = int(rng.paretovariate(1.2)) - 1
+
+        video = {
+            'id': i,
+            'title': _sentence(rng, 4, 12).capitalize(),
+            'url': url,
+            'speaker': rng.choice(speakers),
+            'tags': ', '.join(rng.sample(tags, rng.randint(0, 4))),
+            'date_added': date_added,
+            'description': _sentence(rng, 15, 150),
+            'view_count': view_count,
+        }
+        if with_metadata:
+            metadata = {
+                'platform': platform,
+                'original_url': url,
+                'extracted_at': (date_added + timedelta(minutes=1)).isoformat(),
+            }
+            if platform == 'youtube':
+                metadata.update({
+                    'duration': rng.randint(60, 7200),
+                    'view_count': rng.randint(0, 500000),
+                    'like_count': rng.randint(0, 20000),
+                    'thumbnail': f"https://i.ytimg.com/vi/{key}/hqdefault.jpg",
+                })
+            video['video_metadata'] = metadata
+        yield video
+
+def to_export_record(video):
+    """Public videos.json shape (tags as a list, ISO dates, no metadata)"""
+    return {
+        'id': video['id'],
+        'title': video['title'],
+        'url': video['url'],
+        'speaker': video['speaker'],
+        'tags': [tag.strip() for tag in video['tags'].split(',') if tag.strip()],
+        'date_added': video['date_added'].isoformat(),
+        'description': video['description'],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('count', type=int)
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    videos = [to_export_record(v) for v in generate_videos(args.count, args.seed, with_metadata=False)]
+    with open(args.output, 'w') as f:
+        json.dump(videos, f, indent=2)
+    print(f"Wrote {len(videos)} videos to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+/api/videos query latency: full-table scan vs SQL vs the columnar snapshot.
+
+Runs the same filter/sort/limit queries three ways against a synthetic
+SQLite catalog and prints the median latency of each:
+  all        Video.query.all(), then filter and sort in Python (what every
+             consumer did before /api/videos could query)
+  sql        SQLVideoRepository.query()
+  columnar   ColumnarEngine over the same repository (needs NumPy)
+
+The columnar snapshot's one-off build time is reported separately.
+
+    python benchmarks/query_engines.py --videos 100000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ADMIN_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'admin_dashboard')
+
+QUERIES = {
+    'newest': {'limit': '50'},
+    'speaker': {'speaker': 'Speaker 3', 'limit': '50'},
+    'tag_by_views': {'tag': 'tag7', 'sort': '-view_count', 'limit': '50'},
+    'platform_by_title': {'platform': 'vimeo', 'sort': 'title', 'limit': '50'},
+    'date_range': {'date_from': '2024-01-01', 'date_to': '2024-06-30', 'sort': 'view_count', 'limit': '50'},
+}
+
+def _load_app(workdir, count):
+    os.chdir(workdir)  # BackupManager creates ./backups
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'videos.db')}"
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ['CHANGELOG_PATH'] = os.path.join(workdir, 'changes.jsonl')
+    sys.path.insert(0, ADMIN_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import app as admin_app
+    from catalog_gen import generate_videos
+
+    with admin_app.app.app_context():
+        admin_app.db.create_all()
+        admin_app.db.session.execute(admin_app.Video.__table__.insert(), list(generate_videos(count)))
+        admin_app.db.session.commit()
+    return admin_app
+
+def _scan_all(repository, query):
+    """The pre-query path: load every ORM object, then filter and sort in Python"""
+    from video_metadata import detect_platform
+    from repository import split_tags
+
+    videos = [
+        video for video in repository.model.query.all()
+        if (not query.speaker or video.speaker == query.speaker)
+        and (not query.tag or query.tag in split_tags(video.tags))
+        and (not query.platform or detect_platform(video.url) == query.platform)
+        and (not query.date_from or video.date_added >= query.date_from)
+        and (not query.date_to or video.date_added < query.date_to)
+    ]
+    videos.sort(key=lambda video: query.key(getattr(video, query.sort), video.id), reverse=query.descending)
+    return [repository.serialize(video) for video in videos[:query.limit]]
+
+def _median_ms(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"[BENCH] Building a {args.videos}-video catalog...")
+        admin_app = _load_app(workdir, args.videos)
+        from video_query import VideoQuery
+        repository = admin_app.video_repo
+
+        with admin_app.app.app_context():
+            engine = None
+            try:
+                from columnar import ColumnarEngine
+                engine = ColumnarEngine(repository)
+                started = time.perf_counter()
+                engine.snapshot()
+                print(f"[BENCH] Columnar snapshot built in {time.perf_counter() - started:.2f}s")
+            except ImportError:
+                print("[BENCH] NumPy is not installed; skipping the columnar engine")
+
+            print(f"{'query':<20}{'all (ms)':>12}{'sql (ms)':>12}{'columnar (ms)':>15}")
+            for name, params in QUERIES.items():
+                query = VideoQuery.from_args(params)
+                scan_ms, expected = _median_ms(lambda: _scan_all(repository, query), max(1, args.repeat // 5))
+                sql_ms, (rows, _) = _median_ms(lambda: repository.query(query), args.repeat)
+                assert [v.id for v in rows] == [v['id'] for v in expected], name
+                columnar = '-'
+                if engine is not None:
+                    columnar_ms, (records, _) = _median_ms(lambda: engine.query(query), args.repeat)
+                    assert [v['id'] for v in records] == [v['id'] for v in expected], name
+                    columnar = f"{columnar_ms:.2f}"
+                print(f"{name:<20}{scan_ms:>12.2f}{sql_ms:>12.2f}{columnar:>15}")
+
+if __name__ == '__main__':
+    main()
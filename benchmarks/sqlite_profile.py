@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write SQLite throughput with and without the tuned connection profile.
+
+Simulates the admin dashboard workload: writer threads bump view counts the
+way view_video does, reader threads run the paginated dashboard query.
+
+    python benchmarks/sqlite_profile.py --videos 5000 --seconds 5
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'admin_dashboard'))
+
+from sqlite_tuning import SQLiteProfile
+
+def create_database(path, video_count):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE video (
+            id INTEGER PRIMARY KEY,
+            title VARCHAR(200) NOT NULL,
+            url VARCHAR(500) NOT NULL,
+            speaker VARCHAR(100) NOT NULL,
+            tags VARCHAR(500) NOT NULL,
+            date_added DATETIME,
+            description TEXT,
+            view_count INTEGER
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO video (title, url, speaker, tags, date_added, description, view_count) "
+        "VALUES (?, ?, ?, ?, datetime('now', ?), ?, 0)",
+        [
+            (f"Video {i}", f"https://www.youtube.com/watch?v=vid{i:08d}", f"Speaker {i % 50}",
+             'genlayer, ai', f"-{i} minutes", 'x' * 400)
+            for i in range(video_count)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    if profile is not None:
+        profile.apply(conn)
+    return conn
+
+def run_workload(path, profile, video_count, readers, writers, seconds):
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def reader():
+        conn = connect(path, profile)
+        reads = locked = 0
+        while not stop.is_set():
+            page = random.randint(0, max(video_count // 20 - 1, 0))
+            try:
+                conn.execute(
+                    "SELECT * FROM video ORDER BY date_added DESC LIMIT 20 OFFSET ?", (page * 20,)
+                ).fetchall()
+                conn.execute("SELECT count(*) FROM video").fetchone()
+                reads += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        conn.close()
+        with lock:
+            counts['reads'] += reads
+            counts['locked'] += locked
+
+    def writer():
+        conn = connect(path, profile)
+        writes = locked = 0
+        while not stop.is_set():
+            video_id = random.randint(1, video_count)
+            try:
+                conn.execute("UPDATE video SET view_count = view_count + 1 WHERE id = ?", (video_id,))
+                conn.commit()
+                writes += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                locked += 1
+        conn.close()
+        with lock:
+            counts['writes'] += writes
+            counts['locked'] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    counts['reads_per_sec'] = counts['reads'] / seconds
+    counts['writes_per_sec'] = counts['writes'] / seconds
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--videos', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    profiles = [
+        ('default', None),
+        ('tuned', SQLiteProfile.from_env()),
+    ]
+
+    print(f"{'profile':<10} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    for name, profile in profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'videos.db')
+            create_database(path, args.videos)
+            result = run_workload(path, profile, args.videos, args.readers, args.writers, args.seconds)
+        print(f"{name:<10} {result['reads_per_sec']:>10.1f} {result['writes_per_sec']:>10.1f} {result['locked']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark and import-time profile for every deployable entry point.
+
+Each entry point is imported in a fresh interpreter (as a serverless cold
+start would) several times. The report covers median wall time, the time
+spent importing the module itself, which heavy optional dependencies got
+loaded eagerly, and the slowest imports according to `python -X importtime`.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 10 --entries admin_app,api_index --importtime-dir /tmp/importtime
+    python benchmarks/startup.py --baseline benchmarks/results/<previous>.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# name -> (directory put first on sys.path, module to import)
+ENTRY_POINTS = {
+    'admin_app': ('admin_dashboard', 'app'),
+    'admin_index': ('admin_dashboard', 'index'),
+    'api_index': ('api', 'index'),
+    'api_app': ('api', 'app'),
+    'api_videos': ('api', 'videos'),
+    'api_admin': ('api', 'admin'),
+}
+
+# Dependencies only some requests need; none of these should load at import time
+HEAVY_MODULES = ['yt_dlp', 'requests', 'apscheduler', 'bcrypt', 'numpy']
+
+NOISE_FLOOR_S = 0.02
+
+_CHILD = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'import_s': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def _child_env(workdir):
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'startup-benchmark')
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    return env
+
+def slowest_imports(stderr, limit=15, max_depth=2):
+    """Top imports by cumulative time from `-X importtime` output (microseconds)"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = len(indent) // 2
+        if depth <= max_depth:
+            rows.append({'module': name, 'depth': depth, 'self_ms': int(self_us) / 1000,
+                         'cumulative_ms': int(cumulative_us) / 1000})
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+def measure(entry, runs, workdir, importtime_dir=None):
+    directory, module = ENTRY_POINTS[entry]
+    code = _CHILD.format(path=os.path.join(ROOT_DIR, directory), module=module, heavy=HEAVY_MODULES)
+    env = _child_env(workdir)
+
+    walls, imports, loaded = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env,
+                                capture_output=True, text=True)
+        walls.append(time.perf_counter() - started)
+        if result.returncode:
+            raise RuntimeError(f"{entry} failed to import:\n{result.stderr}")
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        imports.append(report['import_s'])
+        loaded = report['loaded']
+
+    profile = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=workdir, env=env,
+                             capture_output=True, text=True)
+    if importtime_dir:
+        os.makedirs(importtime_dir, exist_ok=True)
+        with open(os.path.join(importtime_dir, f"{entry}.log"), 'w') as f:
+            f.write(profile.stderr)
+
+    return {
+        'wall_s': round(statistics.median(walls), 4),
+        'import_s': round(statistics.median(imports), 4),
+        'heavy_loaded': loaded,
+        'slowest_imports': slowest_imports(profile.stderr),
+    }
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for entry, metrics in results.items():
+        previous = baseline.get('results', {}).get(entry)
+        if not previous:
+            continue
+        for metric in ('wall_s', 'import_s'):
+            old, new = previous[metric], metrics[metric]
+            if new - old > NOISE_FLOOR_S and new > old * (1 + threshold):
+                regressions.append(f"{entry} {metric}: {old} -> {new}")
+        for module in set(metrics['heavy_loaded']) - set(previous.get('heavy_loaded', [])):
+            regressions.append(f"{entry} now imports {module} at startup")
+    return regressions
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', default=','.join(ENTRY_POINTS), help=f"comma-separated, from {', '.join(ENTRY_POINTS)}")
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per entry point (default 5)')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to print per entry point')
+    parser.add_argument('--importtime-dir', help='also save raw -X importtime logs here (e.g. for tuna)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/startup-<timestamp>.json)')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed regression as a fraction (default 0.25)')
+    args = parser.parse_args()
+
+    entries = [e.strip() for e in args.entries.split(',') if e.strip()]
+    for entry in entries:
+        if entry not in ENTRY_POINTS:
+            parser.error(f"unknown entry point: {entry}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for entry in entries:
+            result = results[entry] = measure(entry, args.runs, workdir, args.importtime_dir)
+            heavy = ', '.join(result['heavy_loaded']) or 'none'
+            print(f"[STARTUP] {entry:<12} {result['wall_s']:>7.3f}s cold start, "
+                  f"{result['import_s']:>7.3f}s importing; heavy deps loaded: {heavy}")
+            for row in result['slowest_imports'][:args.top]:
+                print(f"            {row['cumulative_ms']:>8.1f} ms  {'  ' * row['depth']}{row['module']}")
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': args.runs,
+        'results': results,
+    }
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', f"startup-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[STARTUP] Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"[STARTUP] {len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"[STARTUP] No regressions above {args.threshold:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the admin dashboard's heavy operations.
+
+Builds a synthetic SQLite catalog per scale, then runs each operation in a
+fresh process and records wall time, peak RSS and SQL queries issued.
+Results are saved as JSON; pass --baseline to fail on regressions.
+
+    python benchmarks/suite.py --scales 10k,100k
+    python benchmarks/suite.py --scales 10k --baseline benchmarks/results/baseline.json --threshold 0.25
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+ADMIN_DIR = os.path.join(ROOT_DIR, 'admin_dashboard')
+
+SCALES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+OPERATIONS = ['export_to_json', 'export_to_csv', 'import_from_json', 'api_videos', 'detect_platform']
+METRICS = ['wall_s', 'peak_rss_mb', 'queries']
+
+# Differences below these are treated as noise by the regression check
+NOISE_FLOOR = {'wall_s': 0.005, 'peak_rss_mb': 2.0, 'queries': 0}
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _load_app(db_path, workdir):
+    """Import the admin app against a benchmark database"""
+    os.chdir(workdir)  # BackupManager creates ./backups
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['CHANGELOG_PATH'] = os.path.join(workdir, 'changes.jsonl')
+    os.environ['CATALOG_VERSION_PATH'] = os.path.join(workdir, 'catalog.version')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    sys.path.insert(0, ADMIN_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import app as admin_app
+    admin_app.limiter.enabled = False
+    return admin_app
+
+def _build_database(db_path, count, workdir, queue):
+    from catalog_gen import generate_videos
+    admin_app = _load_app(db_path, workdir)
+    table = admin_app.Video.__table__
+    with admin_app.app.app_context():
+        admin_app.db.create_all()
+        chunk = []
+        for video in generate_videos(count):
+            chunk.append(video)
+            if len(chunk) == 10000:
+                admin_app.db.session.execute(table.insert(), chunk)
+                chunk = []
+        if chunk:
+            admin_app.db.session.execute(table.insert(), chunk)
+        admin_app.db.session.commit()
+    queue.put(True)
+
+def _prepare(operation, admin_app, count):
+    """Build the callable for one operation; setup cost is kept out of the timing"""
+    from bulk_operations import BulkOperations
+    repo = admin_app.video_repo
+
+    if operation == 'export_to_json':
+        return lambda: BulkOperations.export_to_json(repo)
+
+    if operation == 'export_to_csv':
+        return lambda: BulkOperations.export_to_csv(repo)
+
+    if operation == 'import_from_json':
+        from catalog_gen import generate_videos, to_export_record
+        # Half of the batch already exists, half is new. The duplicates are drawn exactly as
+        # _build_database drew the catalog: another count, or skipping the metadata, consumes the
+        # rng differently and yields other URLs. The new half takes ids past count, which no
+        # catalog URL uses.
+        batch = max(1000, count // 10)
+        existing = [video for video in generate_videos(count) if video['id'] > count - batch // 2]
+        new = [video for video in generate_videos(count + batch // 2) if video['id'] > count]
+        payload = []
+        for video in existing + new:
+            record = to_export_record(video)
+            record.pop('id')
+            payload.append(record)
+        payload = json.dumps(payload)
+        return lambda: BulkOperations.import_from_json(payload, repo)
+
+    if operation == 'api_videos':
+        client = admin_app.app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 1
+
+        def request_videos():
+            response = client.get('/api/videos')
+            assert response.status_code == 200, response.status_code
+            return response.data
+        return request_videos
+
+    if operation == 'detect_platform':
+        from video_metadata import VideoMetadataExtractor
+        extractor = VideoMetadataExtractor()
+        urls = [url for (url,) in admin_app.db.session.query(admin_app.Video.url)]
+
+        def detect_all():
+            return [extractor.detect_platform(url) for url in urls]
+        return detect_all
+
+    raise ValueError(f"Unknown operation: {operation}")
+
+def _measure(operation, db_path, count, workdir, queue):
+    from sqlalchemy import event
+    admin_app = _load_app(db_path, workdir)
+    with admin_app.app.app_context():
+        run = _prepare(operation, admin_app, count)
+
+        queries = [0]
+
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            queries[0] += 1
+        event.listen(admin_app.db.engine, 'before_cursor_execute', count_query)
+
+        gc.collect()
+        rss_before = _peak_rss_mb()
+        started = time.perf_counter()
+        run()
+        wall = time.perf_counter() - started
+        peak = _peak_rss_mb()
+
+    queue.put({
+        'wall_s': round(wall, 4),
+        'peak_rss_mb': round(peak, 1),
+        'rss_growth_mb': round(max(peak - rss_before, 0), 1),
+        'queries': queries[0],
+    })
+
+def _in_child(target, *args):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=args + (queue,))
+    process.start()
+    result = queue.get()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f"{target.__name__} failed with exit code {process.exitcode}")
+    return result
+
+def run_suite(scales, operations):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            count = SCALES[scale]
+            db_path = os.path.join(workdir, f"videos_{scale}.db")
+            print(f"[BENCH] Building {scale} catalog ({count} videos)...")
+            _in_child(_build_database, db_path, count, workdir)
+
+            results[scale] = {}
+            for operation in operations:
+                # Operations that write get their own copy of the database
+                target = db_path
+                if operation == 'import_from_json':
+                    target = os.path.join(workdir, f"videos_{scale}_import.db")
+                    with open(db_path, 'rb') as src, open(target, 'wb') as dst:
+                        dst.write(src.read())
+                result = _in_child(_measure, operation, target, count, workdir)
+                results[scale][operation] = result
+                print(f"[BENCH] {scale:>5} {operation:<18} {result['wall_s']:>9.3f}s "
+                      f"{result['peak_rss_mb']:>8.1f} MB {result['queries']:>6} queries")
+    return results
+
+def compare(results, baseline, threshold):
+    """List regressions beyond `threshold` (a fraction) against a baseline run"""
+    regressions = []
+    for scale, operations in results.items():
+        for operation, metrics in operations.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(operation)
+            if not previous:
+                continue
+            for metric in METRICS:
+                old, new = previous.get(metric), metrics.get(metric)
+                if old is None or new is None:
+                    continue
+                if new - old > NOISE_FLOOR[metric] and new > old * (1 + threshold):
+                    regressions.append(f"{scale} {operation} {metric}: {old} -> {new}")
+    return regressions
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='10k,100k', help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument('--operations', default=','.join(OPERATIONS))
+    parser.add_argument('--output', help='results file (default: benchmarks/results/run-<timestamp>.json)')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed regression as a fraction (default 0.25)')
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    operations = [o.strip() for o in args.operations.split(',') if o.strip()]
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"unknown scale: {scale}")
+    for operation in operations:
+        if operation not in OPERATIONS:
+            parser.error(f"unknown operation: {operation}")
+
+    results = run_suite(scales, operations)
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', f"run-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"[BENCH] No regressions above {args.threshold:.0%}")
+
+if __name__ == '__main__':
+    main()
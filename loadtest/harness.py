@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the admin and public apps.
+
+Starts the stub video-platform server and both apps (see serve.py) as
+subprocesses, drives a weighted mix of read/write/view traffic from
+concurrent workers, and reports p50/p95/p99 latency, throughput and errors
+per route.
+
+    python loadtest/harness.py --duration 30 --concurrency 16
+    python loadtest/harness.py --mix dashboard=5,admin_api=2,public_api=5,view=6,add_video=1,public_add=1 \\
+        --stub-latency-ms 200 --stub-error-rate 0.05 --output /tmp/loadtest.json
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Route name -> weight; reads dominate, as they do in production
+DEFAULT_MIX = {
+    'dashboard': 4,
+    'admin_api': 1,
+    'public_api': 4,
+    'view': 6,
+    'add_video': 1,
+    'public_add': 1,
+}
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _wait_ready(url, process, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming ready")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown route in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+class Recorder:
+    """Thread-safe per-route latency and error collection"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+    def report(self, elapsed):
+        routes = {}
+        with self.lock:
+            for route, values in sorted(self.latencies.items()):
+                values = sorted(values)
+                routes[route] = {
+                    'requests': len(values),
+                    'errors': self.errors[route],
+                    'rps': round(len(values) / elapsed, 1),
+                    'p50_ms': round(_percentile(values, 0.50) * 1000, 1),
+                    'p95_ms': round(_percentile(values, 0.95) * 1000, 1),
+                    'p99_ms': round(_percentile(values, 0.99) * 1000, 1),
+                    'max_ms': round(values[-1] * 1000, 1),
+                }
+        return routes
+
+class Worker(threading.Thread):
+    def __init__(self, number, admin_url, public_url, mix, deadline, recorder, video_ids, counter):
+        super().__init__(daemon=True)
+        self.admin_url = admin_url
+        self.public_url = public_url
+        self.routes = list(mix)
+        self.weights = [mix[route] for route in self.routes]
+        self.deadline = deadline
+        self.recorder = recorder
+        self.video_ids = video_ids
+        self.counter = counter
+        self.rng = random.Random(number)
+        self.admin = requests.Session()
+        self.public = requests.Session()
+
+    def login(self):
+        response = self.admin.post(f"{self.admin_url}/login", data={
+            'username': os.getenv('ADMIN_USERNAME', 'admin'),
+            'password': os.getenv('ADMIN_PASSWORD', 'admin123'),
+        }, allow_redirects=False)
+        if response.status_code != 302:
+            raise RuntimeError(f"login failed with status {response.status_code}")
+
+    def _new_video(self):
+        n = next(self.counter)
+        return {
+            'title': f"Load test video {n}",
+            'url': f"https://www.youtube.com/watch?v=lt{n:09d}",
+            'speaker': 'Load Test',
+            'tags': 'loadtest, genlayer',
+            'description': 'Created by loadtest/harness.py',
+        }
+
+    def request(self, route):
+        """Issue one request for `route` and return whether it succeeded"""
+        if route == 'dashboard':
+            page = self.rng.randint(1, 10)
+            return self.admin.get(f"{self.admin_url}/dashboard?page={page}", allow_redirects=False).ok
+        if route == 'admin_api':
+            return self.admin.get(f"{self.admin_url}/api/videos").ok
+        if route == 'public_api':
+            return self.public.get(f"{self.public_url}/api/videos").ok
+        if route == 'view':
+            video_id = self.rng.choice(self.video_ids)
+            return self.public.get(f"{self.admin_url}/video/{video_id}/view").ok
+        if route == 'add_video':
+            # A successful add redirects to the dashboard; a re-rendered form means it failed
+            response = self.admin.post(f"{self.admin_url}/add_video", data=self._new_video(), allow_redirects=False)
+            return response.status_code == 302
+        if route == 'public_add':
+            video = self._new_video()
+            video['tags'] = video['tags'].split(', ')
+            return self.public.post(f"{self.public_url}/api/videos", json=video).ok
+        raise ValueError(route)
+
+    def run(self):
+        while time.time() < self.deadline:
+            route = self.rng.choices(self.routes, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = self.request(route)
+            except requests.RequestException:
+                ok = False
+            self.recorder.record(route, time.perf_counter() - started, ok)
+
+def _spawn(args, log):
+    return subprocess.Popen([sys.executable] + args, cwd=LOADTEST_DIR, stdout=log, stderr=subprocess.STDOUT)
+
+def run(args):
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='gentube-loadtest-')
+    stub_port, admin_port, public_port = _free_port(), _free_port(), _free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    admin_url = f"http://127.0.0.1:{admin_port}"
+    public_url = f"http://127.0.0.1:{public_port}"
+
+    log_path = os.path.join(workdir, 'servers.log')
+    os.makedirs(workdir, exist_ok=True)
+    processes = []
+    with open(log_path, 'w') as log:
+        try:
+            processes.append(_spawn([
+                'stub_server.py', '--port', str(stub_port),
+                '--latency-ms', str(args.stub_latency_ms), '--jitter-ms', str(args.stub_jitter_ms),
+                '--error-rate', str(args.stub_error_rate), '--seed', '1',
+            ], log))
+            _wait_ready(f"{stub_url}/oembed?url=ready", processes[-1])
+
+            common = ['--workdir', workdir, '--stub-url', stub_url, '--videos', str(args.videos)]
+            processes.append(_spawn(['serve.py', 'admin', '--port', str(admin_port)] + common, log))
+            _wait_ready(f"{admin_url}/login", processes[-1])
+            processes.append(_spawn(['serve.py', 'public', '--port', str(public_port)] + common, log))
+            _wait_ready(f"{public_url}/api/videos", processes[-1])
+
+            print(f"[LOADTEST] {args.concurrency} workers for {args.duration}s against {admin_url} and {public_url}")
+            print(f"[LOADTEST] Server logs: {log_path}")
+
+            recorder = Recorder()
+            counter = itertools.count(1)
+            video_ids = list(range(1, args.videos + 1))
+            started = time.time()
+            deadline = started + args.duration
+            workers = [
+                Worker(n, admin_url, public_url, mix, deadline, recorder, video_ids, counter)
+                for n in range(args.concurrency)
+            ]
+            for worker in workers:
+                worker.login()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.time() - started
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+
+    routes = recorder.report(elapsed)
+    total = sum(r['requests'] for r in routes.values())
+    return {
+        'duration_s': round(elapsed, 2),
+        'concurrency': args.concurrency,
+        'videos': args.videos,
+        'mix': mix,
+        'stub': {
+            'latency_ms': args.stub_latency_ms,
+            'jitter_ms': args.stub_jitter_ms,
+            'error_rate': args.stub_error_rate,
+        },
+        'total_requests': total,
+        'total_rps': round(total / elapsed, 1),
+        'routes': routes,
+    }
+
+def print_report(report):
+    print(f"\n{'route':<12} {'reqs':>7} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, r in report['routes'].items():
+        print(f"{route:<12} {r['requests']:>7} {r['errors']:>7} {r['rps']:>8} "
+              f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['max_ms']:>9}")
+    print(f"\n[LOADTEST] {report['total_requests']} requests in {report['duration_s']}s "
+          f"({report['total_rps']} req/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=30, help='seconds of traffic (default 30)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--videos', type=int, default=1000, help='synthetic videos to seed (default 1000)')
+    parser.add_argument('--mix', help=f"route=weight list from {', '.join(DEFAULT_MIX)}")
+    parser.add_argument('--stub-latency-ms', type=float, default=100)
+    parser.add_argument('--stub-jitter-ms', type=float, default=50)
+    parser.add_argument('--stub-error-rate', type=float, default=0.02)
+    parser.add_argument('--workdir', help='keep databases and logs here (default: a new temp dir)')
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args()
+
+    if args.mix:
+        try:
+            parse_mix(args.mix)
+        except ValueError as e:
+            parser.error(str(e))
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[LOADTEST] Report saved to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Run the admin or public app for load testing, isolated from real data.
+
+Each target gets its own database / videos.json under --workdir, metadata
+extraction is pointed at the stub server, and CSRF and rate limiting are
+switched off so the harness can submit forms at full speed.
+
+    python loadtest/serve.py admin --port 5100 --workdir /tmp/lt --stub-url http://127.0.0.1:8765 --videos 2000
+    python loadtest/serve.py public --port 5200 --workdir /tmp/lt
+    python loadtest/serve.py public-asgi --port 5300 --workdir /tmp/lt    # api/asgi.py under uvicorn
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(LOADTEST_DIR)
+ADMIN_DIR = os.path.join(ROOT_DIR, 'admin_dashboard')
+API_DIR = os.path.join(ROOT_DIR, 'api')
+BENCH_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+
+def _configure_env(args):
+    os.makedirs(args.workdir, exist_ok=True)
+    os.environ['VIDEOS_JSON_PATH'] = os.path.join(args.workdir, 'videos.json')
+    os.environ.setdefault('VIDEO_STORE_DIR', os.path.join(args.workdir, 'instance'))
+    os.environ['CHANGELOG_PATH'] = os.path.join(args.workdir, 'changes.jsonl')
+    os.environ['CATALOG_VERSION_PATH'] = os.path.join(args.workdir, 'catalog.version')
+    os.environ.setdefault('SECRET_KEY', 'loadtest')
+    if args.stub_url:
+        os.environ['VIDEO_METADATA_STUB_URL'] = args.stub_url
+    sys.path.insert(0, ADMIN_DIR)
+    sys.path.insert(0, BENCH_DIR)
+
+def _seed_videos_json(path, count):
+    from catalog_gen import generate_videos, to_export_record
+    if os.path.exists(path):
+        return
+    with open(path, 'w') as f:
+        json.dump([to_export_record(v) for v in generate_videos(count, with_metadata=False)], f)
+
+def build_admin(args):
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(args.workdir, 'admin.db')}"
+    os.chdir(args.workdir)  # BackupManager creates ./backups
+    import app as admin_app
+    from catalog_gen import generate_videos
+
+    admin_app.app.config['WTF_CSRF_ENABLED'] = False
+    admin_app.limiter.enabled = False
+
+    with admin_app.app.app_context():
+        admin_app.db.create_all()
+        admin_app.create_admin_user()
+        if admin_app.video_repo.count() == 0 and args.videos:
+            admin_app.db.session.execute(admin_app.Video.__table__.insert(), list(generate_videos(args.videos)))
+            admin_app.db.session.commit()
+    return admin_app.app
+
+def build_public(args):
+    _seed_videos_json(os.environ['VIDEOS_JSON_PATH'], args.videos)
+    # Loaded by path: admin_dashboard/ has an index.py of its own
+    spec = importlib.util.spec_from_file_location('public_index', os.path.join(API_DIR, 'index.py'))
+    public_app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(public_app)
+    return public_app.app
+
+def build_public_asgi(args):
+    _seed_videos_json(os.environ['VIDEOS_JSON_PATH'], args.videos)
+    spec = importlib.util.spec_from_file_location('public_asgi', os.path.join(API_DIR, 'asgi.py'))
+    public_asgi = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(public_asgi)
+    return public_asgi.app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('target', choices=['admin', 'public', 'public-asgi'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--workdir', required=True)
+    parser.add_argument('--stub-url', help='base URL of loadtest/stub_server.py')
+    parser.add_argument('--videos', type=int, default=1000, help='synthetic videos to seed (default 1000)')
+    args = parser.parse_args()
+    args.workdir = os.path.abspath(args.workdir)
+
+    _configure_env(args)
+    if args.target == 'public-asgi':
+        import uvicorn
+        print(f"[LOADTEST] {args.target} app serving on http://{args.host}:{args.port}", flush=True)
+        uvicorn.run(build_public_asgi(args), host=args.host, port=args.port, log_level='warning')
+        return
+    app = build_admin(args) if args.target == 'admin' else build_public(args)
+
+    from werkzeug.serving import make_server
+    server = make_server(args.host, args.port, app, threaded=True)
+    print(f"[LOADTEST] {args.target} app serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
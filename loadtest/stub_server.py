@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for YouTube, Twitter/X, LinkedIn and other video platforms.
+
+Serves canned responses for VideoMetadataExtractor when it runs with
+VIDEO_METADATA_STUB_URL pointing here:
+
+    GET /ytdlp?url=...   yt-dlp style info dict (JSON)
+    GET /page?url=...    HTML page with Open Graph tags
+    GET /oembed?url=...  oEmbed JSON
+
+    python loadtest/stub_server.py --port 8765 --latency-ms 150 --jitter-ms 50 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class StubConfig:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self.random.random() < self.error_rate
+        time.sleep(max(self.latency_ms + jitter, 0) / 1000)
+        return fail
+
+def _video_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:11]
+
+def ytdlp_info(url):
+    key = _video_key(url)
+    seed = int(key, 16)
+    thumbnail = f"https://i.ytimg.com/vi/{key}/hqdefault.jpg"
+    return {
+        'id': key,
+        'title': f"Stub video {key}",
+        'description': f"Canned description for {url}",
+        'duration': 60 + seed % 3600,
+        'view_count': seed % 1000000,
+        'like_count': seed % 50000,
+        'upload_date': '20250101',
+        'uploader': 'GenLayer',
+        'uploader_id': '@genlayer',
+        'thumbnail': thumbnail,
+        'thumbnails': [
+            {'url': f"https://i.ytimg.com/vi/{key}/default.jpg", 'width': 120, 'height': 90},
+            {'url': f"https://i.ytimg.com/vi/{key}/mqdefault.jpg", 'width': 320, 'height': 180},
+            {'url': thumbnail, 'width': 480, 'height': 360},
+        ],
+        'tags': ['genlayer', 'stub'],
+        'categories': ['Science & Technology'],
+        'webpage_url': url,
+    }
+
+def og_page(url):
+    key = _video_key(url)
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<title>Stub page {key}</title>
+<meta property="og:title" content="Stub post {key}" />
+<meta property="og:description" content="Canned Open Graph description for {escape(url)}" />
+<meta property="og:image" content="https://cdn.example.com/{key}.jpg" />
+<meta property="og:video" content="https://cdn.example.com/{key}.mp4" />
+<meta property="og:url" content="{escape(url)}" />
+</head>
+<body></body>
+</html>
+"""
+
+def oembed(url):
+    key = _video_key(url)
+    return {
+        'type': 'video',
+        'version': '1.0',
+        'title': f"Stub video {key}",
+        'author_name': 'GenLayer',
+        'provider_name': 'Stub',
+        'thumbnail_url': f"https://i.ytimg.com/vi/{key}/hqdefault.jpg",
+        'thumbnail_width': 480,
+        'thumbnail_height': 360,
+        'html': f'<iframe src="https://www.youtube.com/embed/{key}"></iframe>',
+    }
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            url = parse_qs(parsed.query).get('url', [''])[0]
+
+            if parsed.path not in ('/ytdlp', '/page', '/oembed'):
+                return self._send(404, 'text/plain', b'not found')
+            if not url:
+                return self._send(400, 'text/plain', b'url parameter required')
+            if config.delay():
+                return self._send(503, 'text/plain', b'injected failure')
+
+            if parsed.path == '/ytdlp':
+                self._send(200, 'application/json', json.dumps(ytdlp_info(url)).encode('utf-8'))
+            elif parsed.path == '/page':
+                self._send(200, 'text/html; charset=utf-8', og_page(url).encode('utf-8'))
+            else:
+                self._send(200, 'application/json', json.dumps(oembed(url)).encode('utf-8'))
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep load-test output readable
+
+    return StubHandler
+
+def create_server(host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+    config = StubConfig(latency_ms, jitter_ms, error_rate, seed)
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    print(f"[STUB] Serving on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,17 @@
 // Vue.js Application
 const { createApp } = Vue;
 
+// Newest videos baked into index.html at publish time (admin_dashboard/publish.py)
+function prerenderedVideos() {
+    const element = document.getElementById('prerendered-videos');
+    if (!element) return [];
+    try {
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        return [];
+    }
+}
+
 createApp({
     data() {
         return {
@@ -35,6 +46,13 @@ createApp({
         // Initialize theme
         this.initializeTheme();
         
+        // Show the pre-rendered first page while the catalog downloads
+        const prerendered = prerenderedVideos();
+        if (prerendered.length) {
+            this.videos = this.processVideoData(prerendered);
+            this.processVideos();
+        }
+        
         // Load videos
         await this.loadVideos();
         
@@ -65,15 +83,24 @@ createApp({
                     return;
                 }
                 
-                // Load from server
-                const response = await fetch('videos.json');
+                // A cached catalog only needs the changes published since it was fetched
+                if (await this.syncChanges()) {
+                    this.processVideos();
+                    return;
+                }
+                
+                // Load from server: the content-hashed catalog named by the pointer is
+                // cached indefinitely, so each version is downloaded only once
+                const pointer = await this.resolveCatalogPointer();
+                const response = await fetch(pointer.videos);
                 if (!response.ok) throw new Error('Failed to load videos');
                 
                 const data = await response.json();
                 this.videos = this.processVideoData(data);
                 
-                // Cache for offline use
-                this.cacheVideos(this.videos);
+                // Cache for offline use, with the change sequence this catalog matches;
+                // it comes from the same pointer, so a publish in between cannot skew it
+                this.cacheVideos(this.videos, 'seq' in pointer ? pointer.seq : null);
                 
                 this.processVideos();
                 
@@ -93,17 +120,80 @@ createApp({
             }
         },
         
+        async resolveCatalogPointer() {
+            try {
+                const response = await fetch('catalog.json', { cache: 'no-cache' });
+                if (response.ok) {
+                    const pointer = await response.json();
+                    if (pointer.videos) return pointer;
+                }
+            } catch (error) {
+                console.warn('Catalog pointer unavailable, using videos.json:', error);
+            }
+            // No sequence: without the pointer there is nothing to sync changes against
+            return { videos: 'videos.json' };
+        },
+        
+        async fetchChanges() {
+            try {
+                const response = await fetch('changes.json', { cache: 'no-cache' });
+                return response.ok ? await response.json() : null;
+            } catch (error) {
+                return null;
+            }
+        },
+        
+        async syncChanges() {
+            const since = parseInt(localStorage.getItem('catalogSeq'), 10);
+            const cached = this.getCachedVideos(true);
+            if (!cached || isNaN(since)) return false;
+            
+            const feed = await this.fetchChanges();
+            // Too far behind (or the catalog was reset): reload everything
+            if (!feed || since < feed.floor || since > feed.seq) return false;
+            
+            this.videos = this.mergeChanges(cached, feed.changes.filter(change => change.seq > since));
+            this.cacheVideos(this.videos, feed.seq);
+            return true;
+        },
+        
+        mergeChanges(videos, changes) {
+            const byId = new Map(videos.map(video => [video.id, video]));
+            for (const change of changes) {
+                if (change.op === 'delete') {
+                    byId.delete(change.id);
+                } else {
+                    byId.set(change.id, this.processVideoData([change.video])[0]);
+                }
+            }
+            return Array.from(byId.values());
+        },
+        
         processVideoData(data) {
-            return data.map(video => ({
-                ...video,
-                thumbnail: this.extractThumbnail(video),
-                platform: this.detectPlatform(video.url),
-                duration: this.extractDuration(video)
-            }));
+            return data.map(video => {
+                // Current exports precompute platform, thumbnail and duration;
+                // only catalogs published before that are derived here
+                const derived = 'platform' in video ? {} : {
+                    thumbnail: this.extractThumbnail(video),
+                    platform: this.detectPlatform(video.url),
+                    duration: this.extractDuration(video)
+                };
+                return {
+                    ...video,
+                    ...derived,
+                    thumbnailSrcset: video.thumb ? video.thumb.srcset : null,
+                    placeholder: video.thumb ? video.thumb.placeholder : null
+                };
+            });
         },
         
         extractThumbnail(video) {
-            // Try to get thumbnail from metadata first
+            // Local WebP variants generated by admin_dashboard/thumbnails.py
+            if (video.thumb && video.thumb.src) {
+                return video.thumb.src;
+            }
+            
+            // Then the thumbnail from metadata
             if (video.metadata && video.metadata.thumbnail) {
                 return video.metadata.thumbnail;
             }
@@ -369,22 +459,27 @@ createApp({
         },
         
         // Caching for Offline Support
-        cacheVideos(videos) {
+        cacheVideos(videos, seq = null) {
             try {
                 localStorage.setItem('cachedVideos', JSON.stringify(videos));
                 localStorage.setItem('cacheTimestamp', Date.now());
+                if (seq === null) {
+                    localStorage.removeItem('catalogSeq');
+                } else {
+                    localStorage.setItem('catalogSeq', seq);
+                }
             } catch (error) {
                 console.warn('Failed to cache videos:', error);
             }
         },
         
-        getCachedVideos() {
+        getCachedVideos(ignoreExpiry = false) {
             try {
                 const cached = localStorage.getItem('cachedVideos');
                 const timestamp = localStorage.getItem('cacheTimestamp');
                 
-                // Cache expires after 1 hour
-                if (cached && timestamp && (Date.now() - timestamp < 3600000)) {
+                // Cache expires after 1 hour, unless it is about to be brought up to date with changes.json
+                if (cached && timestamp && (ignoreExpiry || Date.now() - timestamp < 3600000)) {
                     return JSON.parse(cached);
                 }
             } catch (error) {
@@ -508,15 +603,16 @@ createApp({
         },
         
         getFeaturedVideo() {
-            const youtubeVideos = this.videos.filter(video => 
-                video.url.includes('youtube.com') || video.url.includes('youtu.be')
-            );
+            const youtubeVideos = this.videos.filter(video => video.platform === 'YouTube');
             if (youtubeVideos.length === 0) return null;
             return youtubeVideos[Math.floor(Math.random() * youtubeVideos.length)];
         },
         
         getRecentVideos() {
-            return this.videos.slice(0, 6);
+            // Newest first, matching the cards pre-rendered into index.html
+            return [...this.videos]
+                .sort((a, b) => (b.date_added || '').localeCompare(a.date_added || ''))
+                .slice(0, 6);
         },
         
         getVideosByTag(tag) {
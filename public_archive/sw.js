@@ -1,7 +1,10 @@
 // Service Worker for PWA functionality
-const CACHE_NAME = 'gentube-v1.0.0';
-const STATIC_CACHE = 'gentube-static-v1.0.0';
-const DYNAMIC_CACHE = 'gentube-dynamic-v1.0.0';
+const CACHE_NAME = 'gentube-v1.1.0';
+const STATIC_CACHE = 'gentube-static-v1.1.0';
+const DYNAMIC_CACHE = 'gentube-dynamic-v1.1.0';
+// Content-hashed catalogs (videos.<hash>.json) never change, so this cache is not versioned
+const CATALOG_CACHE = 'gentube-catalog';
+const CATALOG_ARTIFACT = /\/videos\.[0-9a-f]{16}\.json$/;
 
 // Files to cache immediately
 const STATIC_FILES = [
@@ -10,7 +13,6 @@ const STATIC_FILES = [
     '/css/app.css',
     '/js/app.js',
     '/manifest.json',
-    '/videos.json',
     'https://unpkg.com/vue@3/dist/vue.global.js'
 ];
 
@@ -42,7 +44,7 @@ self.addEventListener('activate', (event) => {
             .then((cacheNames) => {
                 return Promise.all(
                     cacheNames.map((cacheName) => {
-                        if (cacheName !== STATIC_CACHE && cacheName !== DYNAMIC_CACHE) {
+                        if (cacheName !== STATIC_CACHE && cacheName !== DYNAMIC_CACHE && cacheName !== CATALOG_CACHE) {
                             console.log('Deleting old cache:', cacheName);
                             return caches.delete(cacheName);
                         }
@@ -70,6 +72,32 @@ self.addEventListener('fetch', (event) => {
         return;
     }
     
+    // The change feed is tiny and must always be fresh; let the browser fetch it
+    if (url.pathname.endsWith('/changes.json') || url.pathname.startsWith('/api/')) {
+        return;
+    }
+    
+    if (CATALOG_ARTIFACT.test(url.pathname)) {
+        event.respondWith(cacheCatalogArtifact(request));
+        return;
+    }
+    
+    // The pointer changes on every publish: network first, cached copy when offline
+    if (url.pathname.endsWith('/catalog.json')) {
+        event.respondWith(
+            fetch(request)
+                .then((response) => {
+                    if (response && response.status === 200) {
+                        const responseClone = response.clone();
+                        caches.open(DYNAMIC_CACHE).then((cache) => cache.put(request, responseClone));
+                    }
+                    return response;
+                })
+                .catch(() => caches.match(request))
+        );
+        return;
+    }
+    
     event.respondWith(
         caches.match(request)
             .then((cachedResponse) => {
@@ -121,6 +149,26 @@ self.addEventListener('fetch', (event) => {
     );
 });
 
+// Serve a hashed catalog from cache forever; keep only the newest version
+function cacheCatalogArtifact(request) {
+    return caches.open(CATALOG_CACHE).then((cache) =>
+        cache.match(request).then((cachedResponse) => {
+            if (cachedResponse) {
+                return cachedResponse;
+            }
+            return fetch(request).then((networkResponse) => {
+                if (networkResponse && networkResponse.status === 200) {
+                    cache.put(request, networkResponse.clone());
+                    cache.keys().then((keys) => keys
+                        .filter((key) => key.url !== request.url)
+                        .forEach((key) => cache.delete(key)));
+                }
+                return networkResponse;
+            });
+        })
+    );
+}
+
 // Background sync for updating video cache
 function updateVideoCache(request) {
     fetch(request)
@@ -144,6 +192,7 @@ function isStaticFile(url) {
            url.includes('.js') ||
            url.includes('.png') ||
            url.includes('.jpg') ||
+           url.includes('.webp') ||
            url.includes('.svg') ||
            url.includes('.ico');
 }
@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every default path is read from the environment at import time; point them
+# all at a scratch directory before any project module is imported, so the
+# suite never touches public_archive/ or instance/.
+WORKDIR = tempfile.mkdtemp(prefix='gentube-tests-')
+os.environ.update({
+    'VIDEOS_JSON_PATH': os.path.join(WORKDIR, 'public', 'videos.json'),
+    'VIDEO_STORE_DIR': os.path.join(WORKDIR, 'store'),
+    'THUMBNAILS_DIR': os.path.join(WORKDIR, 'public', 'thumbs'),
+    'CHANGELOG_PATH': os.path.join(WORKDIR, 'changes.jsonl'),
+    'CATALOG_VERSION_PATH': os.path.join(WORKDIR, 'catalog.version'),
+    'SCHEDULER_LOCK_PATH': os.path.join(WORKDIR, 'scheduler.lock'),
+    'PROFILE_DIR': os.path.join(WORKDIR, 'profiles'),
+})
+for directory in ('public', 'store'):
+    os.makedirs(os.path.join(WORKDIR, directory), exist_ok=True)
+
+sys.path.insert(0, os.path.join(ROOT, 'admin_dashboard'))
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+
+# Shared catalog fixtures; imported only now, after the environment above is set
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from catalog import CatalogStore
+from json_store import JsonStore
+from journal_store import JournalStore
+from repository import FileVideoRepository, SQLVideoRepository
+from video_query import VideoQuery, query_videos
+
+db = SQLAlchemy()
+
+
+class Video(db.Model):
+    # Same columns as the admin app's model
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    url = db.Column(db.String(500), nullable=False)
+    speaker = db.Column(db.String(100), nullable=False)
+    tags = db.Column(db.String(500), nullable=False)
+    date_added = db.Column(db.DateTime, default=datetime.utcnow)
+    description = db.Column(db.Text)
+    video_metadata = db.Column(db.JSON)
+    view_count = db.Column(db.Integer, default=0)
+
+
+START = datetime(2024, 3, 1, 12, 0, 0)
+
+
+def sample_videos(count=30):
+    speakers = ['Ada', 'Grace', 'Linus']
+    hosts = ['https://www.youtube.com/watch?v=vid{}', 'https://vimeo.com/{}', 'https://x.com/gen/status/{}']
+    return [{
+        'title': f'Talk {i:02d} about {"consensus" if i % 3 else "validators"}',
+        'url': hosts[i % 3].format(1000 + i),
+        'speaker': speakers[i % 3],
+        'tags': ['genlayer', 'ai'] if i % 2 else ['genlayer'],
+        'description': f'Description {i}',
+        'date_added': START + timedelta(hours=i // 2),  # pairs share a timestamp
+    } for i in range(count)]
+
+
+@pytest.fixture
+def sql_repo(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'videos.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield SQLVideoRepository(db, Video)
+        db.session.remove()
+
+
+@pytest.fixture(params=['json', 'journal'])
+def file_repo(request, tmp_path):
+    path = tmp_path / 'videos.json'
+    path.write_text('[]')
+    if request.param == 'json':
+        store = CatalogStore(JsonStore(str(path)))
+    else:
+        store = JournalStore(str(tmp_path / 'store'), seed_path=str(path))
+    return FileVideoRepository(store)
+
+
+@pytest.fixture
+def repos(sql_repo, file_repo):
+    for repo in (sql_repo, file_repo):
+        repo.put_many(sample_videos())
+    return sql_repo, file_repo
+
+
+SORTS = ['-date_added', 'date_added', '-view_count', 'view_count', 'title', '-title']
+
+
+@pytest.fixture
+def ranked(repos):
+    # View counts with ties, so every sort has equal keys to break by id
+    for repo in repos:
+        repo.put_many([{'id': video_id, 'view_count': video_id % 4} for video_id in range(1, 31)])
+    return repos
+
+
+def walk(repo, **params):
+    """Every page of a query, following cursors; returns the ids in order and the page count"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        videos, cursor = query_videos(repo, VideoQuery(cursor=cursor, **params))
+        ids += [video['id'] for video in videos]
+        pages += 1
+        if cursor is None:
+            return ids, pages
@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import json
+import os
+
+import pytest
+
+from catalog import CatalogStore
+from changes import ChangeLog
+from conftest import ROOT, sample_videos
+from json_store import JsonStore
+from repository import FileVideoRepository
+
+
+async def call(app, path, method='GET', query=''):
+    """One HTTP request through the ASGI app: (status, headers, parsed JSON body)"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'), 'headers': []}
+    await app(scope, receive, send)
+    start, body = messages
+    headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in start['headers']}
+    assert int(headers['content-length']) == len(body['body'])
+    return start['status'], headers, json.loads(body['body'])
+
+
+@pytest.fixture
+def asgi(tmp_path):
+    # A fresh module per test: the started state belongs to one event loop
+    spec = importlib.util.spec_from_file_location('public_asgi', os.path.join(ROOT, 'api', 'asgi.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    path = tmp_path / 'videos.json'
+    path.write_text('[]')
+    repo = FileVideoRepository(CatalogStore(JsonStore(str(path))), ChangeLog(str(tmp_path / 'changes.jsonl')))
+    repo.put_many(sample_videos(25))
+    module.state = module.CatalogState(repo)
+    return module, repo
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_full_catalog_and_slim_projection(asgi):
+    module, repo = asgi
+
+    async def scenario():
+        return await call(module.app, '/api/videos'), await call(module.app, '/api/videos/', query='slim=1')
+
+    (status, headers, videos), (_, _, slim) = run(scenario())
+    assert status == 200 and headers['content-type'] == 'application/json'
+    assert videos == repo.export()
+    assert [video['id'] for video in slim] == [video['id'] for video in videos]
+    assert 'description' not in slim[0]
+
+
+def test_query_pages_follow_cursors(asgi):
+    module, repo = asgi
+
+    async def scenario():
+        ids, cursor = [], None
+        while True:
+            query = 'sort=title&limit=4' + (f'&cursor={cursor}' if cursor else '')
+            status, headers, videos = await call(module.app, '/api/videos', query=query)
+            assert status == 200
+            ids += [video['id'] for video in videos]
+            cursor = headers.get('x-next-cursor')
+            if cursor is None:
+                return ids
+
+    ids = run(scenario())
+    assert ids == [video['id'] for video in sorted(repo.export(), key=lambda v: (v['title'], v['id']))]
+
+
+def test_search_changes_and_errors(asgi):
+    module, repo = asgi
+    repo.delete(2)
+    module.state.refresh()
+
+    async def scenario():
+        return {
+            'search': await call(module.app, '/api/videos/search', query='q=validators&limit=3'),
+            'no_q': await call(module.app, '/api/videos/search'),
+            'changes': await call(module.app, '/api/videos/changes', query='since=24'),
+            'bad_sort': await call(module.app, '/api/videos', query='sort=rating'),
+            'missing': await call(module.app, '/api/nothing'),
+            'post': await call(module.app, '/api/videos', method='POST'),
+        }
+
+    results = run(scenario())
+    status, _, found = results['search']
+    assert status == 200 and len(found) == 3 and all('validators' in video['title'] for video in found)
+    assert results['no_q'][0] == 400 and results['no_q'][2] == {'error': 'q required'}
+    status, _, feed = results['changes']
+    assert status == 200 and feed['changes'][-1] == {'seq': 26, 'op': 'delete', 'id': 2}
+    assert results['bad_sort'][0] == 400 and 'sort must be one of' in results['bad_sort'][2]['error']
+    assert results['missing'][0] == 404
+    assert results['post'][0] == 405 and results['post'][1]['allow'] == 'GET'
+
+
+def test_refresh_swaps_in_writes(asgi):
+    module, repo = asgi
+
+    async def scenario():
+        await call(module.app, '/api/videos')
+        assert module.state.refresh() is False  # nothing changed since startup
+        repo.update(1, {'title': 'Retitled'})
+        assert await asyncio.to_thread(module.state.refresh) is True
+        return await call(module.app, '/api/videos', query='fields=title&limit=1000')
+
+    _, _, videos = run(scenario())
+    assert {'id': 1, 'title': 'Retitled'} in videos
+
+
+def test_lifespan_startup_loads_the_catalog(asgi):
+    module, _ = asgi
+    sent = []
+
+    async def scenario():
+        messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await module.app({'type': 'lifespan'}, receive, send)
+
+    run(scenario())
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert module.state.repository is not None
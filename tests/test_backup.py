@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+from backup import BackupManager
+
+
+def _wal_database(path):
+    """A WAL database with uncheckpointed commits; the returned connection keeps the -wal file alive"""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA wal_autocheckpoint=0')
+    conn.execute('CREATE TABLE video (id INTEGER PRIMARY KEY, title TEXT)')
+    conn.executemany('INSERT INTO video (title) VALUES (?)', [(f'Video {i}',) for i in range(50)])
+    conn.commit()
+    return conn
+
+
+def _titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [title for (title,) in conn.execute('SELECT title FROM video ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def test_backup_includes_commits_still_in_wal(tmp_path):
+    db_path = str(tmp_path / 'videos.db')
+    conn = _wal_database(db_path)
+    try:
+        assert os.path.getsize(db_path + '-wal') > 0
+        manager = BackupManager(db_path, str(tmp_path / 'backups'))
+        backup_path = manager.create_backup()
+
+        assert backup_path is not None
+        assert len(_titles(backup_path)) == 50
+        assert not os.path.exists(backup_path + '-wal')
+    finally:
+        conn.close()
+
+
+def test_restore_over_live_wal_database(tmp_path):
+    db_path = str(tmp_path / 'videos.db')
+    conn = _wal_database(db_path)
+    try:
+        manager = BackupManager(db_path, str(tmp_path / 'backups'))
+        backup_path = manager.create_backup()
+
+        conn.execute("DELETE FROM video WHERE id > 10")
+        conn.execute("UPDATE video SET title = 'changed' WHERE id = 1")
+        conn.commit()
+
+        assert manager.restore_backup(os.path.basename(backup_path))
+        # The connection that stayed open sees the restored data, not its stale WAL
+        titles = [title for (title,) in conn.execute('SELECT title FROM video ORDER BY id')]
+        assert titles == [f'Video {i}' for i in range(50)]
+        assert conn.execute('PRAGMA integrity_check').fetchone() == ('ok',)
+    finally:
+        conn.close()
+    assert _titles(db_path) == [f'Video {i}' for i in range(50)]
+
+
+def test_restore_missing_backup(tmp_path):
+    manager = BackupManager(str(tmp_path / 'videos.db'), str(tmp_path / 'backups'))
+    assert manager.restore_backup('videos_backup_missing.db') is False
+    assert not os.path.exists(tmp_path / 'videos.db')
@@ -0,0 +1,65 @@
+import pytest
+
+from binary_catalog import BinaryCatalogEngine, write_binary_catalog
+from catalog import CatalogStore
+from conftest import sample_videos, walk
+from json_store import JsonStore
+from repository import FileVideoRepository
+from video_query import VideoQuery, query_videos
+
+
+class Fallback:
+    """The repository, counting the queries the snapshot could not answer"""
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.queries = 0
+
+    def query(self, query):
+        self.queries += 1
+        return self.repository.query(query)
+
+    def serialize(self, record):
+        return self.repository.serialize(record)
+
+
+@pytest.fixture
+def published(tmp_path):
+    path = tmp_path / 'videos.json'
+    path.write_text('[]')
+    repo = FileVideoRepository(CatalogStore(JsonStore(str(path))))
+    repo.put_many(sample_videos(40))
+    binary_path = str(tmp_path / 'videos.bin')
+    write_binary_catalog(repo.export(), binary_path, source_path=str(path))
+    fallback = Fallback(repo)
+    return repo, BinaryCatalogEngine(repo, fallback, path=binary_path), fallback
+
+
+def test_newest_first_pages_come_from_the_snapshot(published):
+    repo, engine, fallback = published
+    assert engine.catalog() is not None
+    assert walk(engine, limit=6) == walk(repo, limit=6)
+    for cursor_limit in (1, 7, 40, 1000):
+        assert query_videos(engine, VideoQuery(limit=cursor_limit)) == query_videos(repo, VideoQuery(limit=cursor_limit))
+    assert fallback.queries == 0
+
+
+def test_projected_pages_match(published):
+    repo, engine, _ = published
+    query = VideoQuery.from_args({'fields': 'title,platform,thumbnail', 'limit': '9'})
+    assert query_videos(engine, query) == query_videos(repo, query)
+
+
+def test_filtered_and_resorted_queries_use_the_fallback(published):
+    repo, engine, fallback = published
+    for params in ({'speaker': 'Ada'}, {'sort': 'title'}, {'tag': 'ai', 'sort': '-view_count'}):
+        assert walk(engine, limit=5, **params) == walk(repo, limit=5, **params)
+    assert fallback.queries > 0
+
+
+def test_unpublished_write_makes_the_snapshot_stale(published):
+    repo, engine, fallback = published
+    repo.update(1, {'title': 'Edited after publishing'})
+    assert engine.catalog() is None
+    assert query_videos(engine, VideoQuery(limit=50)) == query_videos(repo, VideoQuery(limit=50))
+    assert fallback.queries == 1
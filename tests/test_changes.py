@@ -0,0 +1,160 @@
+import json
+import os
+
+from catalog import CatalogStore
+from changes import ChangeLog, changes_since, publish_changes
+from json_store import JsonStore
+from repository import FileVideoRepository
+
+
+def _lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_record_appends_one_line_per_change(tmp_path):
+    log = ChangeLog(str(tmp_path / 'changes.jsonl'))
+    assert log.record([1, 2], [3]) == 3
+    assert log.record([1]) == 4
+    assert log.record() is None
+
+    assert [(line['seq'], line['op'], line['id']) for line in _lines(log.path)] == [
+        (1, 'put', 1), (2, 'put', 2), (3, 'delete', 3), (4, 'put', 1)
+    ]
+    feed = log.since(0)
+    # Only the latest change per id, in sequence order
+    assert [(c['seq'], c['op'], c['id']) for c in feed['changes']] == [(2, 'put', 2), (3, 'delete', 3), (4, 'put', 1)]
+    assert (feed['seq'], feed['floor'], feed['reset'], feed['more']) == (4, 0, False, False)
+
+
+def test_since_bounds_and_limit(tmp_path):
+    log = ChangeLog(str(tmp_path / 'changes.jsonl'))
+    log.record([1, 2, 3, 4])
+
+    assert [c['id'] for c in log.since(2)['changes']] == [3, 4]
+    assert log.since(4)['changes'] == []
+    assert log.since(None)['reset'] is True
+    assert log.since(5)['reset'] is True  # ahead of the log, e.g. after it was replaced
+
+    page = log.since(0, limit=3)
+    assert page['more'] is True and page['seq'] == 3
+    assert log.since(page['seq'], limit=3) == {**log.since(3), 'more': False}
+
+
+def test_other_instances_replay_appended_lines(tmp_path):
+    path = str(tmp_path / 'changes.jsonl')
+    writer, reader = ChangeLog(path), ChangeLog(path)
+    writer.record([1])
+    first = reader.state()
+    assert first.seq == 1
+
+    writer.record([2], [1])
+    second = reader.state()
+    assert second is not first and second.seq == 3
+    assert [c['id'] for c in second.since(0)['changes']] == [2, 1]
+    # States already handed out keep answering for their own sequence
+    assert first.seq == 1 and [c['id'] for c in first.since(0)['changes']] == [1]
+    assert reader.state() is second  # unchanged file, same state
+
+    with open(path, 'a') as f:
+        f.write('{"seq": 4, "op": "put"')  # a writer mid-append
+    assert reader.state().seq == 3
+
+
+def test_reset_raises_floor(tmp_path):
+    log = ChangeLog(str(tmp_path / 'changes.jsonl'))
+    log.record([1, 2])
+    log.reset()
+
+    assert log.seq == 3
+    assert log.since(2)['reset'] is True
+    assert log.since(3) == {'seq': 3, 'floor': 3, 'reset': False, 'more': False, 'changes': []}
+    log.record([5])
+    assert [c['id'] for c in ChangeLog(log.path).since(3)['changes']] == [5]
+
+
+def test_compact_keeps_latest_per_id_up_to_max_entries(tmp_path):
+    log = ChangeLog(str(tmp_path / 'changes.jsonl'), max_entries=3)
+    for video_id in (1, 2, 3, 1, 4, 5):
+        log.record([video_id])
+    log.record(deleted_ids=[2])
+    before = log.since(0)
+
+    assert log.compact() is True
+    assert log.compact() is False  # already compact
+    lines = _lines(log.path)
+    assert lines[0] == {'seq': 7, 'op': 'floor', 'floor': 4}
+    assert [(line['seq'], line['id']) for line in lines[1:]] == [(5, 4), (6, 5), (7, 2)]
+
+    reopened = ChangeLog(log.path)
+    assert (reopened.seq, reopened.state().floor) == (7, 4)
+    assert reopened.since(3)['reset'] is True
+    assert reopened.since(4)['changes'] == log.since(4)['changes'] == before['changes'][-3:]
+
+
+def test_compacts_once_past_threshold(tmp_path):
+    log = ChangeLog(str(tmp_path / 'changes.jsonl'), compact_bytes=2000)
+    for _ in range(100):
+        log.record([1, 2])
+    assert os.path.getsize(log.path) < 2000
+    assert log.seq == 200
+    assert [c['id'] for c in ChangeLog(log.path).since(150)['changes']] == [1, 2]
+
+
+def _repository(tmp_path):
+    path = tmp_path / 'videos.json'
+    path.write_text('[]')
+    return FileVideoRepository(CatalogStore(JsonStore(str(path))), ChangeLog(str(tmp_path / 'changes.jsonl')))
+
+
+def test_changes_since_attaches_records_and_tombstones(tmp_path):
+    repo = _repository(tmp_path)
+    first, second = repo.put_many([
+        {'title': 'One', 'url': 'https://youtu.be/one', 'speaker': 'Ada', 'tags': 'a'},
+        {'title': 'Two', 'url': 'https://youtu.be/two', 'speaker': 'Ada', 'tags': 'b'},
+    ])
+    repo.update(first['id'], {'title': 'One, edited'})
+    repo.update(first['id'], {'view_count': 3})  # not in the export, so not a change
+    repo.delete(second['id'])
+
+    feed = changes_since(repo, 0)
+    assert feed['seq'] == 4
+    assert [(c['seq'], c['op'], c['id']) for c in feed['changes']] == [(3, 'put', first['id']), (4, 'delete', second['id'])]
+    assert feed['changes'][0]['video']['title'] == 'One, edited'
+    assert feed['changes'][0]['video']['platform'] == 'YouTube'
+    assert 'video' not in feed['changes'][1]
+
+    assert changes_since(repo, 3)['changes'] == [{'seq': 4, 'op': 'delete', 'id': second['id']}]
+    assert changes_since(repo, 4)['changes'] == []
+
+
+def test_put_skipped_when_video_deleted_after_the_log_was_read(tmp_path):
+    repo = _repository(tmp_path)
+    video = repo.add({'title': 'Gone', 'url': 'https://youtu.be/gone', 'speaker': 'Ada', 'tags': ''})
+    state = repo.changes.state()
+    repo.store.store.save([])  # deleted behind the log's back
+
+    class Pinned:
+        def state(self):
+            return state
+
+    repo.changes = Pinned()
+    feed = changes_since(repo, 0)
+    assert feed['seq'] == 1 and feed['changes'] == []
+    assert video['id'] not in repo.store.catalog()
+
+
+def test_publish_changes_writes_static_feed(tmp_path):
+    repo = _repository(tmp_path)
+    videos = repo.put_many([
+        {'title': f'Video {i}', 'url': f'https://youtu.be/v{i}', 'speaker': 'Ada', 'tags': ''} for i in range(5)
+    ])
+    repo.delete(videos[0]['id'])
+
+    target = str(tmp_path / 'public' / 'changes.json')
+    os.makedirs(os.path.dirname(target))
+    assert publish_changes(repo, target, limit=3) == 6
+    feed = json.load(open(target))
+    assert feed['floor'] == 3
+    assert [(c['op'], c['id']) for c in feed['changes']] == [('put', 4), ('put', 5), ('delete', 1)]
+    assert 'more' not in feed
@@ -0,0 +1,39 @@
+import pytest
+
+from columnar import ColumnarEngine
+from conftest import SORTS, walk
+from video_query import VideoQuery, query_videos
+
+pytest.importorskip('numpy')
+
+FILTERS = [{}, {'speaker': 'Grace'}, {'tag': 'ai'}, {'platform': 'Twitter'},
+           {'date_from': '2024-03-01T14:00:00', 'date_to': '2024-03-01T19:00:00'}]
+
+
+@pytest.mark.parametrize('sort', SORTS)
+def test_engine_pages_match_the_repository(ranked, sort):
+    for repo in ranked:
+        engine = ColumnarEngine(repo)
+        for params in FILTERS:
+            assert walk(engine, sort=sort, limit=4, **params) == walk(repo, sort=sort, limit=4, **params)
+
+
+def test_engine_returns_the_repository_records(ranked):
+    for repo in ranked:
+        engine = ColumnarEngine(repo)
+        query = VideoQuery(sort='-view_count', tag='genlayer', limit=1000)
+        assert query_videos(engine, query) == query_videos(repo, query)
+
+
+def test_snapshot_is_rebuilt_after_a_write(ranked):
+    _, files = ranked
+    engine = ColumnarEngine(files)
+    first = engine.snapshot()
+    assert engine.snapshot() is first
+
+    files.update(3, {'title': 'AAA first by title'})
+    files.delete(4)
+    assert engine.snapshot() is not first
+    ids, _ = walk(engine, sort='title', limit=50)
+    assert ids[0] == 3 and 4 not in ids
+    assert walk(engine, sort='title', limit=7) == walk(files, sort='title', limit=7)
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+SCRIPT = """
+import json, sys
+sys.path.insert(0, {admin!r})
+import app, index
+print(json.dumps({{
+    name: [module.video_repo.changes.path, module.video_repo.version.path]
+    for name, module in (('app', app), ('index', index))
+}}))
+"""
+
+
+def test_state_files_default_to_the_database_directory(tmp_path):
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('CHANGELOG_PATH', 'CATALOG_VERSION_PATH')}
+    env['DATABASE_URL'] = f"sqlite:///{tmp_path / 'db' / 'videos.db'}"
+    env['SECRET_KEY'] = 'test'
+    os.makedirs(tmp_path / 'db')
+    output = subprocess.run(
+        [sys.executable, '-c', SCRIPT.format(admin=os.path.join(ROOT, 'admin_dashboard'))],
+        env=env, cwd=str(tmp_path), capture_output=True, text=True, check=True,
+    ).stdout
+
+    paths = json.loads(output.strip().splitlines()[-1])
+    for name in ('app', 'index'):
+        assert paths[name] == [str(tmp_path / 'db' / 'changes.jsonl'), str(tmp_path / 'db' / 'catalog.version')]
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+
+from journal_store import JournalStore
+
+
+def _seed(tmp_path, videos=()):
+    path = tmp_path / 'videos.json'
+    path.write_text(json.dumps(list(videos)))
+    return str(path)
+
+
+def _video(video_id, **fields):
+    return {'id': video_id, 'title': f'Video {video_id}', 'url': f'https://youtu.be/v{video_id}',
+            'date_added': f'2024-01-{video_id:02d}T00:00:00', **fields}
+
+
+def test_seeds_snapshot_from_published_catalog(tmp_path):
+    store = JournalStore(str(tmp_path / 'store'), seed_path=_seed(tmp_path, [_video(1), _video(2)]))
+
+    assert [v['id'] for v in store.load()] == [1, 2]
+    assert store.seq == 0
+    assert os.path.exists(store.snapshot.path)
+
+
+def test_writes_append_and_replay_in_another_instance(tmp_path):
+    data_dir = str(tmp_path / 'store')
+    seed = _seed(tmp_path, [_video(1), _video(2)])
+    writer = JournalStore(data_dir, seed_path=seed)
+    reader = JournalStore(data_dir, seed_path=seed)
+    assert len(reader.load()) == 2
+
+    with writer.edit() as catalog:
+        catalog.update(1, {'title': 'Renamed'})
+        catalog.add({'title': 'New', 'url': 'https://youtu.be/new'})
+    with writer.edit() as catalog:
+        catalog.remove(2)
+
+    lines = [json.loads(line) for line in open(writer.journal_path)]
+    assert [(e['seq'], e['op']) for e in lines] == [(1, 'put'), (2, 'put'), (3, 'delete')]
+
+    # The reader only replays the appended tail on top of what it already has
+    catalog = reader.catalog()
+    assert reader.seq == 3
+    assert sorted(catalog._by_id) == [1, 3]
+    assert catalog.get(1)['title'] == 'Renamed'
+
+
+def test_partial_line_is_not_applied(tmp_path):
+    store = JournalStore(str(tmp_path / 'store'), seed_path=_seed(tmp_path, [_video(1)]))
+    with store.edit() as catalog:
+        catalog.add(_video(2))
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{"seq": 2, "op": "delete", "id"')  # a writer mid-append
+
+    reader = JournalStore(os.path.dirname(store.journal_path), seed_path=store.seed_path)
+    assert reader.seq == 1
+    assert 2 in reader.catalog()
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    data_dir = str(tmp_path / 'store')
+    seed = _seed(tmp_path, [_video(1)])
+    store = JournalStore(data_dir, seed_path=seed)
+    reader = JournalStore(data_dir, seed_path=seed)
+    with store.edit() as catalog:
+        catalog.add(_video(2))
+        catalog.remove(1)
+    before = reader.catalog()
+
+    assert store.compact() is True
+    assert os.path.getsize(store.journal_path) == 0
+    assert store.compact() is False  # nothing left to fold
+
+    snapshot = json.load(open(store.snapshot.path))
+    assert snapshot['seq'] == 2
+    assert [v['id'] for v in snapshot['videos']] == [2]
+    # Readers holding the old journal converge on the same catalog
+    assert sorted(reader.catalog()._by_id) == [2]
+    assert reader.seq == 2
+    assert sorted(before._by_id) == [2]
+
+    with store.edit() as catalog:
+        catalog.add(_video(3))
+    assert reader.seq == 3
+    assert sorted(reader.catalog()._by_id) == [2, 3]
+
+
+def test_compacts_automatically_past_threshold(tmp_path):
+    store = JournalStore(str(tmp_path / 'store'), seed_path=_seed(tmp_path), compact_bytes=400)
+    for i in range(1, 11):
+        with store.edit() as catalog:
+            catalog.add(_video(i))
+
+    assert os.path.getsize(store.journal_path) < 400
+    assert sorted(store.catalog()._by_id) == list(range(1, 11))
+    assert store.seq == 10
+
+
+def _run(target):
+    errors = []
+
+    def guarded():
+        try:
+            target()
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    thread = threading.Thread(target=guarded, daemon=True)
+    thread.start()
+    return thread, errors
+
+
+def test_reader_and_writer_on_empty_store_do_not_deadlock(tmp_path):
+    store = JournalStore(str(tmp_path / 'store'), seed_path=_seed(tmp_path))
+    writer_has_lock, reader_started = threading.Event(), threading.Event()
+
+    def write():
+        # Hold the journal lock until the reader is waiting for the snapshot seed,
+        # then refresh state the way edit() does
+        with store.lock:
+            writer_has_lock.set()
+            reader_started.wait(5)
+            threading.Event().wait(0.2)
+            with store.edit() as catalog:
+                catalog.add(_video(1))
+
+    def read():
+        writer_has_lock.wait(5)
+        reader_started.set()
+        store.catalog()
+
+    writer, writer_errors = _run(write)
+    reader, reader_errors = _run(read)
+    writer.join(10)
+    reader.join(10)
+
+    assert not writer.is_alive() and not reader.is_alive(), 'reader and writer deadlocked'
+    assert writer_errors == [] and reader_errors == []
+    assert 1 in store.catalog()
+
+
+def test_concurrent_readers_and_writers_on_empty_store(tmp_path):
+    store = JournalStore(str(tmp_path / 'store'), seed_path=_seed(tmp_path))
+    start = threading.Barrier(8)
+
+    def write(offset):
+        def run():
+            start.wait(5)
+            for i in range(10):
+                with store.edit() as catalog:
+                    catalog.add({'title': f'Video {offset}-{i}'})
+        return run
+
+    def read():
+        start.wait(5)
+        for _ in range(50):
+            store.load()
+
+    threads = [_run(write(n)) for n in range(4)] + [_run(read) for _ in range(4)]
+    for thread, _ in threads:
+        thread.join(20)
+
+    assert not any(thread.is_alive() for thread, _ in threads), 'threads deadlocked'
+    assert all(errors == [] for _, errors in threads)
+    assert len(store.catalog()) == 40
+    assert store.seq == 40
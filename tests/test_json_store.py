@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from json_store import FileLock, JsonStore
+
+
+def _increment(path, times):
+    store = JsonStore(path, default=dict)
+    for _ in range(times):
+        with store.transaction() as data:
+            data['count'] = data.get('count', 0) + 1
+
+
+def test_file_lock_is_one_reentrant_lock_per_path(tmp_path):
+    path = str(tmp_path / 'videos.json')
+    lock = FileLock(path)
+    assert FileLock(path) is lock
+    assert FileLock(str(tmp_path / 'other.json')) is not lock
+
+    with lock:
+        with lock:  # the same thread may take it again
+            assert lock._depth == 2
+    assert lock._depth == 0 and lock._fd is None
+
+
+def test_transactions_from_threads_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / 'counter.json')
+    threads = [threading.Thread(target=_increment, args=(path, 25)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert JsonStore(path, default=dict).load() == {'count': 200}
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_transactions_from_processes_do_not_lose_updates(tmp_path):
+    path = str(tmp_path / 'counter.json')
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_increment, args=(path, 25)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * 4
+    assert JsonStore(path, default=dict).load() == {'count': 100}
+
+
+def test_readers_never_see_a_partial_document(tmp_path):
+    path = str(tmp_path / 'videos.json')
+    writer = JsonStore(path)
+    writer.save([{'id': 0, 'title': 'x' * 1000}] * 200)
+    done = threading.Event()
+    seen = []
+
+    def write():
+        for i in range(1, 30):
+            writer.save([{'id': i, 'title': 'x' * 1000}] * 200)
+        done.set()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    while not done.is_set():
+        # A separate raw read, bypassing the shared parse cache
+        with open(path, encoding='utf-8') as f:
+            seen.append(len(json.load(f)))
+    thread.join(30)
+    assert set(seen) == {200}
+
+
+def test_failed_transaction_keeps_the_old_document(tmp_path):
+    path = str(tmp_path / 'videos.json')
+    store = JsonStore(path)
+    store.save([{'id': 1}])
+
+    with pytest.raises(RuntimeError):
+        with store.transaction() as data:
+            data.append({'id': 2})
+            raise RuntimeError('validation failed')
+
+    assert store.load() == [{'id': 1}]
+    assert store.lock._depth == 0  # released despite the error
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_failed_write_removes_its_temp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'videos.json')
+    store = JsonStore(path)
+    store.save([{'id': 1}])
+
+    def broken_replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', broken_replace)
+    with pytest.raises(OSError):
+        store.save([{'id': 2}])
+    monkeypatch.undo()
+
+    assert store.load() == [{'id': 1}]
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_load_sees_writes_from_other_instances(tmp_path):
+    path = str(tmp_path / 'videos.json')
+    reader, writer = JsonStore(path), JsonStore(path)
+    writer.save([1])
+    first = reader.load()
+    assert reader.load() is first  # unchanged file, cached parse
+
+    writer.save_text('[1, 2]')
+    assert reader.load() == [1, 2]
+    assert JsonStore(str(tmp_path / 'missing.json')).load() == []
@@ -0,0 +1,58 @@
+import os
+import threading
+
+import pytest
+
+from leader import LeaderElection
+
+
+def test_gives_up_leadership_after_repeated_heartbeat_failures(tmp_path):
+    election = LeaderElection(str(tmp_path / 'scheduler.lock'), interval=0.01, max_failures=3).start()
+    assert election.is_leader
+    failed = threading.Event()
+
+    def broken_heartbeat():
+        failed.set()
+        raise OSError('disk full')
+
+    election._write_heartbeat = broken_heartbeat
+    try:
+        assert failed.wait(5)
+        for _ in range(500):
+            if not election.is_leader:
+                break
+            threading.Event().wait(0.01)
+        assert not election.is_leader
+        assert election._thread.is_alive()  # still running, as a follower
+
+        # Another process can now take over the lock
+        other = LeaderElection(election.lock_path, interval=60)
+        assert other._try_acquire() is True
+        other._release()
+    finally:
+        election.stop()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_forked_child_does_not_inherit_leadership(tmp_path):
+    election = LeaderElection(str(tmp_path / 'scheduler.lock'), interval=60).start()
+    assert election.is_leader
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # child: report what it sees, then leave without running pytest's teardown
+        inherited = election.is_leader or election._thread is not None
+        election.start()
+        os.write(write_fd, b'%d%d' % (inherited, election.is_leader))
+        os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    report = os.read(read_fd, 2)
+    os.close(read_fd)
+
+    try:
+        # Not inherited, and the parent's lock still keeps the child a follower
+        assert report == b'00'
+        assert election.is_leader
+        assert LeaderElection(election.lock_path)._try_acquire() is False
+    finally:
+        election.stop()
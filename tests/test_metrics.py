@@ -0,0 +1,44 @@
+import pytest
+from flask import Flask, session
+
+from metrics import install_metrics
+
+
+def _client(admin):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    install_metrics(app, admin=admin)
+
+    @app.route('/login')
+    def login():
+        session['user_id'] = 1
+        return 'ok'
+
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def no_token(monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+
+
+def test_public_app_serves_metrics_without_token():
+    response = _client(admin=False).get('/metrics')
+    assert response.status_code == 200
+    assert b'gentube_http_requests_total' in response.data
+
+
+def test_admin_app_needs_a_session_without_token():
+    client = _client(admin=True)
+    assert client.get('/metrics').status_code == 401
+    client.get('/login')
+    assert client.get('/metrics').status_code == 200
+
+
+def test_token_is_required_when_set(monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    client = _client(admin=True)
+    client.get('/login')
+    assert client.get('/metrics').status_code == 401  # a session does not replace the token
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+    assert _client(admin=False).get('/metrics').status_code == 401
@@ -0,0 +1,51 @@
+import cProfile
+
+import pytest
+from flask import Flask
+
+import profiler
+from profiler import RequestProfiler
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    RequestProfiler(capture_dir=str(tmp_path), enabled=True).install(app, is_admin=lambda: True)
+
+    @app.route('/items')
+    def items():
+        return 'ok'
+
+    @app.route('/broken')
+    def broken():
+        raise RuntimeError('view failed')
+
+    return app.test_client()
+
+
+def test_busy_profiler_serves_the_request_unprofiled(client):
+    assert 'X-Profile-Capture' in client.get('/items?profile=1').headers
+
+    with profiler._PROFILING:  # another request is being profiled
+        response = client.get('/items?profile=1')
+    assert response.status_code == 200 and 'X-Profile-Capture' not in response.headers
+
+    assert 'X-Profile-Capture' in client.get('/items', headers={'X-Profile': '1'}).headers
+
+
+def test_profiler_that_cannot_start_serves_the_request(client, monkeypatch):
+    class Refused(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError('Another profiling tool is already active')
+
+    monkeypatch.setattr(profiler.cProfile, 'Profile', Refused)
+    response = client.get('/items?profile=1')
+    assert response.status_code == 200 and 'X-Profile-Capture' not in response.headers
+    assert not profiler._PROFILING.locked()
+
+
+def test_failed_request_releases_the_profiler(client):
+    client.application.testing = False
+    assert client.get('/broken?profile=1').status_code == 500
+    assert not profiler._PROFILING.locked()
+    assert 'X-Profile-Capture' in client.get('/items?profile=1').headers
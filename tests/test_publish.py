@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from bulk_operations import BulkOperations
+from catalog import CatalogStore
+from changes import ChangeLog
+from conftest import ROOT
+from json_store import JsonStore
+from publish import INDEX_NAME, INDEX_TEMPLATE_NAME, publish_catalog, render_index
+from repository import FileVideoRepository
+
+TEMPLATE = os.path.join(ROOT, 'public_archive', INDEX_TEMPLATE_NAME)
+
+
+def _videos(count):
+    return [{'id': i, 'title': f'Talk <{i}>', 'url': f'https://youtu.be/v{i}', 'speaker': 'Ada',
+             'platform': 'YouTube', 'tags': ['genlayer'], 'date_added': f'2024-01-{i:02d}T00:00:00'}
+            for i in range(1, count + 1)]
+
+
+def test_renders_index_without_touching_the_template(tmp_path):
+    template = open(TEMPLATE, encoding='utf-8').read()
+    (tmp_path / INDEX_TEMPLATE_NAME).write_text(template, encoding='utf-8')
+
+    assert render_index(str(tmp_path), _videos(20), count=5) is True
+    assert (tmp_path / INDEX_TEMPLATE_NAME).read_text(encoding='utf-8') == template
+    html = (tmp_path / INDEX_NAME).read_text(encoding='utf-8')
+    data = html.split('type="application/json">', 1)[1].split('</script>', 1)[0]
+    assert [video['id'] for video in json.loads(data)] == [20, 19, 18, 17, 16]
+    assert 'Talk &lt;20&gt;' in html and 'Talk <20>' not in html
+
+    # Rendering again starts from the template, not from the last output
+    assert render_index(str(tmp_path), _videos(2)) is True
+    assert (tmp_path / INDEX_NAME).read_text(encoding='utf-8').count('prerendered-videos') == 1
+
+
+def test_copies_template_when_nothing_to_render(tmp_path):
+    (tmp_path / INDEX_TEMPLATE_NAME).write_text('<html>no markers</html>')
+    assert render_index(str(tmp_path), _videos(3)) is False
+    assert (tmp_path / INDEX_NAME).read_text() == '<html>no markers</html>'
+
+    assert render_index(str(tmp_path / 'missing'), _videos(3)) is False
+
+
+def _cli(tmp_path, *prelude):
+    """Run `publish.py index` for tmp_path/videos.json; prelude lines run first (e.g. to hide jinja2)"""
+    script = '; '.join([*prelude, 'import sys', f"sys.argv = ['publish.py', 'index', '--output', {str(tmp_path / 'videos.json')!r}]",
+                        'import runpy', f"runpy.run_path({os.path.join(ROOT, 'admin_dashboard', 'publish.py')!r}, run_name='__main__')"])
+    env = {**os.environ, 'PYTHONPATH': os.path.join(ROOT, 'admin_dashboard')}
+    return subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True)
+
+
+def test_cli_fails_when_it_cannot_prerender(tmp_path):
+    template = open(TEMPLATE, encoding='utf-8').read()
+    (tmp_path / INDEX_TEMPLATE_NAME).write_text(template, encoding='utf-8')
+    assert _cli(tmp_path).returncode == 1  # no catalog yet
+
+    (tmp_path / 'videos.json').write_text(json.dumps(_videos(3)))
+    result = _cli(tmp_path, "import sys", "sys.modules['jinja2'] = None")
+    assert result.returncode == 1 and 'jinja2' in result.stderr
+
+    result = _cli(tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert 'prerendered-videos' in (tmp_path / INDEX_NAME).read_text(encoding='utf-8')
+
+    (tmp_path / INDEX_TEMPLATE_NAME).write_text('<html>no markers</html>')
+    assert _cli(tmp_path).returncode == 1
+
+
+def _published_repo(tmp_path):
+    # The live catalog is not the published file, as with the SQL and journal backends
+    directory = tmp_path / 'public'
+    directory.mkdir()
+    (tmp_path / 'store.json').write_text('[]')
+    repo = FileVideoRepository(CatalogStore(JsonStore(str(tmp_path / 'store.json'))),
+                               ChangeLog(str(tmp_path / 'changes.jsonl')))
+    repo.put_many(_videos(3))
+    return repo, directory
+
+
+def test_pointer_seq_never_runs_ahead_of_the_catalog(tmp_path, monkeypatch):
+    repo, directory = _published_repo(tmp_path)
+    export = BulkOperations.export_to_json
+
+    def export_then_write(repository, slim=False):
+        text = export(repository, slim)
+        repo.add({'title': 'Late', 'url': 'https://youtu.be/late', 'speaker': 'Ada', 'tags': ''})
+        return text
+
+    monkeypatch.setattr(BulkOperations, 'export_to_json', staticmethod(export_then_write))
+    pointer = publish_catalog(repo, str(directory / 'videos.json'))
+
+    # The late write is not in the catalog, so the pointer must not claim it
+    assert pointer['seq'] == 3
+    assert 'Late' not in (directory / pointer['videos']).read_text()
+    feed = json.loads((directory / 'changes.json').read_text())
+    assert [change['seq'] for change in feed['changes'] if change['seq'] > pointer['seq']] == [4]
+
+
+def test_concurrent_publishes_leave_matching_files(tmp_path):
+    repo, directory = _published_repo(tmp_path)
+
+    def write_and_publish(i):
+        repo.add({'title': f'Extra {i}', 'url': f'https://youtu.be/extra{i}', 'speaker': 'Ada', 'tags': ''})
+        publish_catalog(repo, str(directory / 'videos.json'))
+
+    threads = [threading.Thread(target=write_and_publish, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    publish_catalog(repo, str(directory / 'videos.json'))
+    pointer = json.loads((directory / 'catalog.json').read_text())
+    assert (directory / pointer['videos']).read_text() == (directory / 'videos.json').read_text()
+    assert pointer['seq'] == repo.changes.state().seq == 9
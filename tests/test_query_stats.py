@@ -0,0 +1,48 @@
+import pytest
+from flask import Flask, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from query_stats import install_query_instrumentation, statement_shape
+
+
+@pytest.fixture
+def app_db(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'stats.db'}"
+    db = SQLAlchemy(app)
+    install_query_instrumentation(app, db, debug_headers=True)
+
+    @app.route('/items')
+    def items():
+        for _ in range(3):
+            db.session.execute(text('SELECT 1'))
+        return 'ok'
+
+    return app, db
+
+
+def test_counts_statements_per_request(app_db):
+    app, _ = app_db
+    response = app.test_client().get('/items')
+    assert response.headers['X-DB-Query-Count'] == '3'
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app_db):
+    app, db = app_db
+    with app.test_request_context():
+        with db.engine.connect() as conn:
+            for _ in range(5):
+                with pytest.raises(OperationalError):
+                    conn.execute(text('SELECT * FROM missing_table'))
+                conn.rollback()
+            assert not any(key.startswith('query_started') for key in conn.info)
+            conn.execute(text('SELECT 1'))
+        # Only the statement that ran is timed
+        assert g.query_stats.count == 1
+
+
+def test_statement_shape_ignores_literals_and_list_length():
+    assert statement_shape('SELECT * FROM v WHERE id IN (?, ?, ?) LIMIT 10') == \
+        statement_shape('SELECT *  FROM v WHERE id IN (?) LIMIT 20')
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from conftest import START, sample_videos
+from repository import FileVideoRepository, VideoRepository
+
+
+def exported(repo):
+    return sorted(repo.export(), key=lambda video: video['id'])
+
+
+def test_backends_export_the_same_records(repos):
+    sql, files = repos
+    assert exported(sql) == exported(files)
+    assert sql.count() == files.count() == 30
+    assert sql.export_many([1, 5, 99]) == files.export_many([1, 5, 99])
+    assert set(sql.export_many([1, 5, 99])) == {1, 5}
+
+
+def test_backends_agree_after_updates_and_deletes(repos):
+    sql, files = repos
+    for repo in repos:
+        assert repo.update(3, {'title': 'Renamed', 'tags': 'x, y'}) is not None
+        assert repo.update(999, {'title': 'Missing'}) is None
+        repo.put_many([
+            {'id': 4, 'speaker': 'Someone'},
+            {'title': 'Fresh', 'url': 'https://youtu.be/fresh', 'speaker': 'Ada', 'tags': [],
+             'description': '', 'date_added': START},
+        ])
+        assert repo.delete_many([1, 2, 999]) == 2
+        assert repo.delete(5) is True
+        assert repo.delete(5) is False
+
+    assert exported(sql) == exported(files)
+    assert sql.get(999) is None and files.get(999) is None
+    assert sql.count() == files.count() == 28
+
+
+def test_backends_agree_on_lookups(repos):
+    sql, files = repos
+    urls = ['https://vimeo.com/1001', 'https://example.com/none']
+    assert sql.existing_urls(urls) == files.existing_urls(urls) == {'https://vimeo.com/1001'}
+
+    sql_page, file_page = sql.page(2, 7), files.page(2, 7)
+    assert sql_page.total == file_page.total == 30
+    assert sql_page.pages == file_page.pages == 5
+    assert ([v.date_added.isoformat() for v in sql_page.items]
+            == [v['date_added'] for v in file_page.items])
+
+    def ids(records):
+        return [r.id if hasattr(r, 'id') else r['id'] for r in records]
+
+    assert ids(sql.search('VALIDATORS', 5)) == ids(files.search('VALIDATORS', 5))
+    assert len(ids(sql.search('validators', 100))) == 10
+
+
+def test_unpublished_writes_are_not_recorded(sql_repo):
+    recorded = []
+
+    class Log:
+        def record(self, put_ids, deleted_ids):
+            recorded.append((list(put_ids), list(deleted_ids)))
+
+    sql_repo.changes = Log()
+    video_id = sql_repo.add(sample_videos(1)[0]).id
+    sql_repo.update(video_id, {'view_count': 5})
+    sql_repo.update(video_id, {'title': 'New title'})
+    sql_repo.delete(video_id)
+    assert recorded == [([video_id], []), ([video_id], []), ([], [video_id])]
+
+
+def test_update_racing_delete_does_not_recreate(file_repo):
+    video = file_repo.add(sample_videos(1)[0])
+    deleter = threading.Thread(target=file_repo.delete, args=(video['id'],))
+    put = FileVideoRepository._put
+
+    def slow_put(catalog, records):
+        # The delete arrives between the existence check and the write
+        deleter.start()
+        threading.Event().wait(0.2)
+        return put(catalog, records)
+
+    file_repo._put = slow_put
+    assert file_repo.update(video['id'], {'title': 'Edited'})['title'] == 'Edited'
+    deleter.join(10)
+
+    assert file_repo.get(video['id']) is None
+    assert file_repo.count() == 0
+
+
+def test_backend_missing_a_method_fails_at_construction():
+    class Partial(VideoRepository):
+        def get(self, video_id):
+            return None
+
+    with pytest.raises(TypeError, match='abstract'):
+        Partial()
+
+
+def test_deletes_record_tombstones_only_for_existing_ids(repos):
+    for repo in repos:
+        recorded = []
+
+        class Log:
+            def record(self, put_ids, deleted_ids):
+                recorded.append(list(deleted_ids))
+
+        repo.changes = Log()
+        assert repo.delete_many([1, 2, 999, 1000]) == 2
+        assert repo.delete_many([998]) == 0
+        assert recorded == [[1, 2]]
+
+
+def test_concurrent_views_are_all_counted(repos):
+    from flask import current_app
+
+    sql, files = repos
+    app = current_app._get_current_object()
+
+    def view(repo, in_app):
+        for _ in range(10):
+            if in_app:
+                with app.app_context():
+                    repo.increment_views(3)
+            else:
+                repo.increment_views(3)
+
+    threads = [threading.Thread(target=view, args=(repo, repo is sql)) for repo in repos for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    sql.db.session.expire_all()
+    assert sql.get(3).view_count == files.get(3)['view_count'] == 40
+    assert sql.increment_views(999) is None and files.increment_views(999) is None
+
+
+def test_failed_update_rolls_back_the_session(sql_repo):
+    video = sql_repo.add(sample_videos(1)[0])
+    with pytest.raises(Exception):
+        sql_repo.update(video.id, {'title': None})  # NOT NULL
+    # The session is usable again, and the failed change is gone
+    assert sql_repo.get(video.id).title == 'Talk 00 about validators'
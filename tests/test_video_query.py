@@ -0,0 +1,94 @@
+import base64
+import importlib.util
+import json
+import os
+
+import pytest
+
+from conftest import ROOT, SORTS, walk
+from video_query import MAX_LIMIT, QueryError, VideoQuery, query_videos
+
+
+@pytest.mark.parametrize('sort', SORTS)
+def test_cursor_pages_cover_every_video_once_in_order(ranked, sort):
+    sql, files = ranked
+    everything = [video['id'] for video in query_videos(sql, VideoQuery(sort=sort, limit=MAX_LIMIT))[0]]
+    assert sorted(everything) == list(range(1, 31))
+
+    for repo in ranked:
+        ids, pages = walk(repo, sort=sort, limit=7)
+        assert ids == everything
+        assert pages == 5
+
+
+def test_backends_agree_on_filtered_pages(ranked):
+    sql, files = ranked
+    for params in ({'speaker': 'Grace'}, {'tag': 'ai'}, {'platform': 'vimeo'}, {'platform': 'YouTube'},
+                   {'date_from': '2024-03-01T15:00:00', 'date_to': '2024-03-01'},
+                   {'speaker': 'Ada', 'tag': 'ai', 'sort': 'view_count'}):
+        assert walk(sql, limit=4, **params) == walk(files, limit=4, **params)
+    assert len(walk(sql, limit=4, tag='ai')[0]) == 15
+
+
+def test_cursor_is_tied_to_its_sort(ranked):
+    sql, _ = ranked
+    _, cursor = query_videos(sql, VideoQuery(sort='title', limit=5))
+    assert VideoQuery(sort='title', cursor=cursor).after is not None
+    with pytest.raises(QueryError, match='different sort order'):
+        VideoQuery(sort='-title', cursor=cursor)
+
+
+def test_projection_keeps_id_and_requested_fields(ranked):
+    sql, _ = ranked
+    videos, _ = query_videos(sql, VideoQuery.from_args({'fields': 'title,speaker', 'limit': '2'}))
+    assert [sorted(video) for video in videos] == [['id', 'speaker', 'title']] * 2
+
+
+def cursor(*key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('params, message', [
+    ({'sort': 'rating'}, 'sort must be one of'),
+    ({'limit': 'ten'}, 'limit must be an integer'),
+    ({'limit': '0'}, 'limit must be positive'),
+    ({'platform': 'myspace'}, 'unknown platform'),
+    ({'date_from': 'yesterday'}, 'date_from must be an ISO date'),
+    ({'cursor': 'not-a-cursor'}, 'invalid cursor'),
+    ({'cursor': cursor('-date_added', 'not-a-date', 5)}, 'invalid cursor'),
+    ({'sort': 'view_count', 'cursor': cursor('view_count', '12', 5)}, 'invalid cursor'),
+])
+def test_invalid_parameters_raise_query_error(params, message):
+    with pytest.raises(QueryError, match=message):
+        VideoQuery.from_args(params)
+
+
+def test_defaults_and_limits():
+    assert VideoQuery.from_args({}) is None
+    assert VideoQuery.from_args({'limit': str(MAX_LIMIT * 10)}).limit == MAX_LIMIT
+    # A bare date_to includes that whole day
+    assert VideoQuery(date_to='2024-03-01').date_to.isoformat() == '2024-03-02T00:00:00'
+
+
+@pytest.fixture
+def public_client():
+    spec = importlib.util.spec_from_file_location('public_index', os.path.join(ROOT, 'api', 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app.test_client()
+
+
+def test_api_answers_400_for_bad_queries(public_client):
+    for query in ('sort=rating', 'limit=0', 'cursor=%%%', 'platform=myspace', 'date_to=soon',
+                  f"cursor={cursor('-date_added', 'not-a-date', 5)}"):
+        response = public_client.get(f'/api/videos?{query}')
+        assert response.status_code == 400, query
+        assert 'error' in response.get_json()
+    assert public_client.get('/api/videos?limit=5').status_code == 200
+
+
+def test_undated_cursor_pages_on_every_backend(ranked):
+    # '' is what file backends put in a cursor for a record without a date; it sorts first
+    for repo in ranked:
+        assert query_videos(repo, VideoQuery(cursor=cursor('-date_added', '', 5)))[0] == []
+        assert len(query_videos(repo, VideoQuery(sort='date_added', cursor=cursor('date_added', '', 0)))[0]) == 30